@@ -0,0 +1,92 @@
+"""
+Compare the JSON and MessagePack wire encodings on realistic payloads.
+
+Payloads mimic what the services send back: song records with title,
+artist, genre, year, duration and popularity, in list responses of
+increasing size. If data/spotify_data.csv is available (git lfs pull),
+real rows are used; otherwise records are generated.
+
+Run from the project root:
+    python benchmarks/bench_wire_format.py
+"""
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from microservices.common import wire
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "data", "spotify_data.csv")
+SIZES = (10, 1_000, 50_000)
+FIELDS = {
+    "title": "track_name",
+    "artist": "artist_name",
+    "genre": "genre",
+    "year": "year",
+    "duration": "duration_ms",
+    "popularity": "popularity",
+}
+
+
+def _load_records(n):
+    """Real rows from the dataset, or None if it isn't available."""
+    try:
+        import pandas as pd
+        df = pd.read_csv(DATA_PATH, usecols=list(FIELDS.values()), nrows=n)
+    except Exception:
+        return None
+    if len(df) < n:
+        return None
+    return wire.column_records(df, FIELDS, ints=("year", "duration",
+                                                 "popularity"))
+
+
+def _fake_records(n):
+    rng = random.Random(42)
+
+    def word(k):
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(k))
+
+    genres = [word(6) for _ in range(80)]
+    return [{
+        "title": f"{word(rng.randint(4, 10))} {word(rng.randint(3, 8))}",
+        "artist": f"{word(rng.randint(4, 9))} {word(5)}",
+        "genre": rng.choice(genres),
+        "year": rng.randint(2000, 2023),
+        "duration": rng.randint(90_000, 420_000),
+        "popularity": rng.randint(0, 100),
+    } for _ in range(n)]
+
+
+def _time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    encodings = [wire.JSON]
+    if wire.msgpack is not None:
+        encodings.append(wire.MSGPACK)
+    else:
+        print("msgpack is not installed; only JSON will be measured.\n")
+
+    print(f"{'records':>8} {'format':>8} {'bytes':>11} "
+          f"{'encode ms':>10} {'decode ms':>10}")
+    for n in SIZES:
+        records = _load_records(n) or _fake_records(n)
+        payload = {"recommendations": records}
+        repeat = 50 if n <= 1_000 else 5
+
+        for encoding in encodings:
+            frames = wire.encode_frames(payload, encoding)
+            size = sum(len(f) for f in frames)
+            enc = _time(lambda: wire.encode_frames(payload, encoding), repeat)
+            dec = _time(lambda: wire.decode_frames(frames), repeat)
+            print(f"{n:>8} {encoding:>8} {size:>11,} {enc:>10.3f} "
+                  f"{dec:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
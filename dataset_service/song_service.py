@@ -1,31 +1,100 @@
 import os
 import pandas as pd
 
+from dataset_service.track_table import TrackTable
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, "data", "spotify_data.csv")
 
 df = pd.read_csv(DATA_PATH)
 
+# (DataFrame, TrackTable) for the table the track ids were built from
+_track_table = None
+
+
+def get_track_table() -> TrackTable:
+    """The de-duplicated track table of `df`, built on first use."""
+    global _track_table
+    if _track_table is None or _track_table[0] is not df:
+        _track_table = (df, TrackTable(df))
+    return _track_table[1]
+
+
+def get_song_by_id(track_id: int) -> dict:
+    """Song info for a track id (O(1)), or None if there is no such id."""
+    row = get_track_table().get(track_id)
+    return None if row is None else _song_dict(row)
+
 
 def find_song_data(title: str, artist: str) -> dict:
     """
     Search for a song by title and artist (case-insensitive).
-    Returns a dict with song info or None if not found.
+    Returns a dict with song info, including its "track_id", or None if
+    not found.
+    """
+    track_id = get_track_table().id_for(title, artist)
+    return None if track_id is None else get_song_by_id(track_id)
+
+
+def find_songs_data(pairs: list) -> list:
     """
-    filtered = df[
-        (df["track_name"].str.lower() == title.lower()) &
-        (df["artist_name"].str.lower() == artist.lower())
-        ]
+    Batched version of find_song_data for a list of (title, artist)
+    pairs, resolved with one vectorized key lookup. Returns one dict (or
+    None) per pair, in order.
+    """
+    if not pairs:
+        return []
+
+    titles, artists = zip(*pairs)
+    ids = get_track_table().ids_for(titles, artists)
+    return [get_song_by_id(int(track_id)) if track_id >= 0 else None
+            for track_id in ids]
+
 
-    if filtered.empty:
-        return None
+def match_songs(songs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized lookup for many songs at once. `songs` needs "title" and
+    "artist" columns; they are matched case-insensitively against the
+    track table in one pass. Returns `songs` with "track_id", "genre",
+    "year", "duration" and a boolean "matched" column added, in the same
+    order.
+    """
+    table = get_track_table()
+    ids = table.ids_for(songs["title"].to_numpy(), songs["artist"].to_numpy())
+    positions = table.positions(ids)
+    matched = positions >= 0
+    rows = table.tracks.iloc[positions[matched]]
 
-    row = filtered.iloc[0]
-    return {
+    def column(name):
+        values = pd.Series(None, index=songs.index, dtype=object)
+        if name in rows:
+            values[matched] = rows[name].to_numpy()
+        else:
+            values[matched] = "Unknown"
+        return values
+
+    merged = songs.copy()
+    merged["track_id"] = pd.Series(ids, index=songs.index).where(
+        matched).astype("Int64")
+    merged["genre"] = column("genre")
+    merged["year"] = column("year")
+    merged["matched"] = matched
+    # Format durations as ints, the way _song_dict does
+    duration_ms = pd.to_numeric(column("duration_ms"), errors="coerce")
+    merged["duration"] = (duration_ms.round().astype("Int64").astype(str)
+                          + " ms").where(duration_ms.notna(), "Unknown")
+    merged.loc[~matched, "duration"] = None
+    return merged
+
+
+def _song_dict(row) -> dict:
+    song = {
         "title": row["track_name"],
         "artist": row["artist_name"],
         "genre": row.get("genre", "Unknown"),
         "year": row.get("year", "Unknown"),
         "duration": f"{row.get('duration_ms', 'Unknown')} ms"
     }
-
+    if "track_id" in row:
+        song["track_id"] = int(row["track_id"])
+    return song
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from dataset_service import song_service
+from dataset_service.track_table import (TrackTable, assign_track_ids,
+                                         load_id_map)
+
+
+def _dataset():
+    return pd.DataFrame({
+        "track_name": ["Song A", "Song B", "song a", "NA"],
+        "artist_name": ["Band", "Solo", "BAND", "Null"],
+        "genre": ["rock", "pop", "jazz", "folk"],
+        "year": [2001, 2002, 2003, 2004],
+        "duration_ms": [1000, 2000, 3000, 4000],
+    })
+
+
+def test_ids_are_stable_across_reordering_and_new_rows(tmp_path):
+    path = tmp_path / "ids.csv"
+    df = _dataset()
+    provisional = assign_track_ids(df, path)
+    assert list(assign_track_ids(df, path, persist=True)) == \
+        list(provisional) == [0, 1, 0, 2]
+    assert len(load_id_map(path)) == 3
+
+    grown = pd.concat([df.iloc[::-1], pd.DataFrame({
+        "track_name": ["New"], "artist_name": ["Act"]})], ignore_index=True)
+    assert list(assign_track_ids(grown, path, persist=True)) == \
+        [2, 0, 1, 0, 3]
+    assert list(assign_track_ids(df, path)) == [0, 1, 0, 2]
+
+
+def test_track_table_dedupes_and_looks_up(tmp_path):
+    table = TrackTable(_dataset(), tmp_path / "ids.csv")
+    assert len(table) == 3
+    assert table.id_for("SONG A", "band") == 0
+    assert table.id_for("Missing", "Nobody") is None
+    assert table.get(0)["genre"] == "rock"
+    assert table.get(99) is None
+    assert list(table.ids_for(["na", "Song B", "x"], ["null", "solo", "y"])) \
+        == [2, 1, -1]
+    assert list(table.positions([2, -1, 7])) == [2, -1, -1]
+
+
+@pytest.fixture
+def fake_dataset(monkeypatch, tmp_path):
+    monkeypatch.setattr(song_service, "df", _dataset())
+    monkeypatch.setattr(song_service, "_track_table", None)
+    monkeypatch.setattr("dataset_service.track_table.ID_MAP_PATH",
+                        str(tmp_path / "ids.csv"))  # never the real map
+
+
+def test_song_service_lookups_carry_track_id(fake_dataset):
+    song = song_service.find_song_data("song a", "band")
+    assert song["track_id"] == 0 and song["genre"] == "rock"
+    assert song_service.get_song_by_id(1)["title"] == "Song B"
+    assert [s and s["track_id"] for s in song_service.find_songs_data(
+        [("Song B", "Solo"), ("x", "y")])] == [1, None]
+
+    matched = song_service.match_songs(pd.DataFrame(
+        {"title": ["SONG B", "x"], "artist": ["solo", "y"]}))
+    assert matched["track_id"].tolist() == [1, pd.NA]
+    assert matched["duration"][0] == "2000 ms"
+    assert pd.isna(matched["duration"][1])
@@ -0,0 +1,156 @@
+"""
+Canonical track table: the Spotify dataset de-duplicated to one row per
+song, each with a stable integer track id.
+
+A track is identified by its casefolded title and artist. The first
+dataset row for a track is its canonical row, the same tie-break
+find_song_data has always used. Ids are recorded in data/track_ids.csv
+so they survive edits to the dataset and changes in row order. Known
+tracks keep their id, and new tracks are numbered after the largest
+known id, in dataset order. Run the preprocessing step after changing
+the dataset to record the new ids:
+
+    python -m dataset_service.track_table
+
+Readers that meet tracks missing from the id map number them the same
+way without writing. Those provisional ids depend on row order, so two
+readers only agree on them when both number the full, unfiltered
+dataset: dropping rows first shifts the ids of every later new track.
+Readers that filter the table (songRecommenderKNN drops rows with
+missing features) assign ids before filtering and carry them along in a
+track_id column.
+
+TrackTable gives O(1) lookups: id -> canonical row through a dense
+array, and (title, artist) -> id through a hashed pd.Index.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, "data", "spotify_data.csv")
+ID_MAP_PATH = os.path.join(BASE_DIR, "data", "track_ids.csv")
+
+
+def track_keys(titles, artists) -> pd.Index:
+    """Casefolded "title<US>artist" keys."""
+    return pd.Index(pd.Series(titles, dtype=str).str.casefold() + "\x1f" +
+                    pd.Series(artists, dtype=str).str.casefold())
+
+
+def load_id_map(path=None) -> pd.Series:
+    """Track ids indexed by key; empty if no map has been written yet."""
+    path = path or ID_MAP_PATH
+    if not os.path.exists(path):
+        return pd.Series([], index=pd.Index([], dtype=object),
+                         dtype=np.int64)
+    # keep_default_na=False: a song called "NA" or "null" is a title
+    saved = pd.read_csv(path, dtype={"title_key": str, "artist_key": str},
+                        keep_default_na=False)
+    return pd.Series(saved["track_id"].to_numpy(np.int64),
+                     index=pd.Index(saved["title_key"] + "\x1f" +
+                                    saved["artist_key"]))
+
+
+def _assign(df, path=None, persist=False):
+    """(keys, ids) for every row of `df`; see assign_track_ids."""
+    path = path or ID_MAP_PATH
+    titles = df["track_name"].astype(str).str.casefold()
+    artists = df["artist_name"].astype(str).str.casefold()
+    keys = pd.Index(titles + "\x1f" + artists)
+
+    id_map = load_id_map(path)
+    found = id_map.index.get_indexer(keys)
+    ids = np.full(len(keys), -1, dtype=np.int64)
+    ids[found >= 0] = id_map.to_numpy()[found[found >= 0]]
+
+    unknown = np.flatnonzero(found < 0)
+    if len(unknown):
+        new_keys = keys[unknown]
+        first = unknown[~new_keys.duplicated()]
+        next_id = int(id_map.max()) + 1 if len(id_map) else 0
+        codes = pd.Index(keys[first]).get_indexer(new_keys)
+        ids[unknown] = next_id + codes
+
+        if persist:
+            pd.DataFrame({
+                "track_id": next_id + np.arange(len(first)),
+                "title_key": titles.to_numpy()[first],
+                "artist_key": artists.to_numpy()[first],
+            }).to_csv(path, mode="a", index=False,
+                      header=not os.path.exists(path))
+    return keys, ids
+
+
+def assign_track_ids(df, path=None, persist=False) -> np.ndarray:
+    """
+    The track id of every row in `df` (duplicates share one). Tracks
+    missing from the id map at `path` (default ID_MAP_PATH) get the next
+    free ids, and with `persist` those are appended to the map.
+    """
+    return _assign(df, path, persist)[1]
+
+
+class TrackTable:
+    """De-duplicated tracks of a dataset with O(1) id and key lookups."""
+
+    def __init__(self, df, path=None):
+        keys, ids = _assign(df, path)
+        canonical = np.flatnonzero(~pd.Index(ids).duplicated())
+
+        # id of every dataset row, so duplicates resolve to one track
+        self.row_ids = ids
+        self.tracks = df.iloc[canonical].reset_index(drop=True)
+        self.tracks["track_id"] = ids[canonical]
+
+        self._keys = keys[canonical]
+        self._position = np.full(int(ids.max()) + 1 if len(ids) else 0, -1,
+                                 dtype=np.int64)
+        self._position[ids[canonical]] = np.arange(len(canonical))
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def positions(self, track_ids) -> np.ndarray:
+        """Row positions in `tracks` for `track_ids`; -1 if unknown."""
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        if not len(self._position):
+            return np.full(track_ids.shape, -1, dtype=np.int64)
+        valid = (track_ids >= 0) & (track_ids < len(self._position))
+        return np.where(valid,
+                        self._position[np.where(valid, track_ids, 0)], -1)
+
+    def get(self, track_id):
+        """The canonical row for `track_id`, or None."""
+        position = self.positions([track_id])[0]
+        return None if position < 0 else self.tracks.iloc[position]
+
+    def ids_for(self, titles, artists) -> np.ndarray:
+        """Track ids for parallel title/artist sequences; -1 if unknown."""
+        found = self._keys.get_indexer(track_keys(titles, artists))
+        ids = np.full(len(found), -1, dtype=np.int64)
+        ids[found >= 0] = self.tracks["track_id"].to_numpy()[found[found >= 0]]
+        return ids
+
+    def id_for(self, title, artist):
+        """The track id of one song, or None."""
+        try:
+            position = self._keys.get_loc(
+                f"{str(title).casefold()}\x1f{str(artist).casefold()}")
+        except KeyError:
+            return None
+        return int(self.tracks["track_id"].iat[position])
+
+
+def main():
+    df = pd.read_csv(DATA_PATH)
+    before = len(load_id_map())
+    ids = assign_track_ids(df, persist=True)
+    print(f"{len(df)} rows, {len(np.unique(ids))} distinct tracks; "
+          f"{len(load_id_map()) - before} new id(s) written to "
+          f"{ID_MAP_PATH}.")
+
+
+if __name__ == "__main__":
+    main()
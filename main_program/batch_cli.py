@@ -0,0 +1,282 @@
+"""
+Non-interactive batch mode for playlist_manager.
+
+    python -m main_program.playlist_manager --user alice add "Song" "Artist"
+    python -m main_program.playlist_manager --user alice list --genre pop
+    python -m main_program.playlist_manager --user alice lookup hello
+    python -m main_program.playlist_manager recommend --by popular
+    python -m main_program.playlist_manager --user alice duration
+    python -m main_program.playlist_manager --user alice import songs.csv
+
+If a subcommand's arguments are left out they are read from stdin, one
+JSON object per line (e.g. {"title": "...", "artist": "..."} for add).
+`--ops FILE` (or `--ops -` for stdin) runs a file of operations, one per
+line, each naming its subcommand and user:
+
+    {"op": "add", "user": "alice", "title": "Song", "artist": "Artist"}
+    {"op": "delete", "user": "alice", "title": "Old", "artist": "Band"}
+
+Everything runs in one process, so the dataset is loaded once, each
+user's library is loaded once and the service clients reuse their
+connections. Each operation prints one JSON line: {"op": ..., "ok":
+true, ...} or {"op": ..., "ok": false, "error": ...}. The exit status
+is 1 if any operation failed.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from main_program.library import LikedSongs
+from main_program.playlist_import import import_file
+
+OPS = ("add", "delete", "list", "lookup", "recommend", "duration", "import")
+
+# Operations that act on one user's library
+USER_OPS = {"add", "delete", "list", "lookup", "duration", "import"}
+
+
+class BatchSession:
+    """
+    Runs batch operations against `app`, the playlist_manager module,
+    so storage and service calls go through the same functions as the
+    interactive screens.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._libraries = {}
+
+    def library(self, username) -> LikedSongs:
+        if username not in self._libraries:
+            self._libraries[username] = LikedSongs(
+                self.app.load_liked_songs_for_user(username))
+        return self._libraries[username]
+
+    def run(self, op: dict) -> dict:
+        name = None
+        try:
+            if isinstance(op, ValueError):
+                raise op
+            if not isinstance(op, dict):
+                raise ValueError("Operation must be a JSON object")
+            name = op.get("op")
+            if name not in OPS:
+                raise ValueError(f"Unknown op '{name}' "
+                                 f"(expected one of {', '.join(OPS)})")
+            if name in USER_OPS and not op.get("user"):
+                raise ValueError("Missing 'user'")
+            result = getattr(self, f"op_{name}")(op)
+        except Exception as e:
+            return {"op": name, "ok": False, "error": str(e)}
+        return {"op": name, "ok": True, **result}
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+    def op_add(self, op):
+        title, artist = _require(op, "title", "artist")
+        liked = self.library(op["user"])
+        if liked.contains(title, artist):
+            return {"added": False, "reason": "already liked"}
+
+        song_data = self.app.find_song_data(title, artist) or {}
+        song = {
+            "title": title,
+            "artist": artist,
+            "genre": op.get("genre") or song_data.get("genre") or "Unknown",
+            "year": op.get("year") or song_data.get("year") or "Unknown",
+            "date_added": datetime.now().strftime("%Y-%m-%d"),
+            "duration": (op.get("duration") or song_data.get("duration")
+                         or "Unknown"),
+        }
+        song = liked.add(self.app.with_track_id(song, song_data)).to_dict()
+        self.app.add_liked_songs_for_user(op["user"], [song])
+        return {"added": True, "song": song}
+
+    def op_delete(self, op):
+        title, artist = _require(op, "title", "artist")
+        removed = self.library(op["user"]).remove(title, artist)
+        if removed is None:
+            return {"deleted": False, "reason": "not in liked songs"}
+        self.app.delete_liked_song_for_user(op["user"], removed)
+        return {"deleted": True, "song": removed.to_dict()}
+
+    def op_list(self, op):
+        genre, year = op.get("genre"), op.get("year")
+        songs = [
+            song.to_dict() for song in self.library(op["user"])
+            if (genre is None or
+                str(song.get("genre", "")).casefold() == genre.casefold())
+            and (year is None or str(song.get("year", "")) == str(year))
+        ]
+        return {"count": len(songs), "songs": songs}
+
+    def op_lookup(self, op):
+        (query,) = _require(op, "query")
+        field = op.get("field", "title")
+        if field not in LikedSongs.SEARCH_FIELDS:
+            raise ValueError(f"Cannot search by '{field}'")
+        matches = self.library(op["user"]).search(query, field)
+        return {"count": len(matches),
+                "songs": [song.to_dict() for song in matches]}
+
+    def op_recommend(self, op):
+        by = op.get("by", "popular")
+        if by == "artist":
+            (value,) = _require(op, "value")
+            recs = self.app.get_recommendations_by_artist(value)
+        elif by == "genre":
+            (value,) = _require(op, "value")
+            recs = self.app.get_recommendations_by_genre(value)
+        elif by == "popular":
+            recs = self.app.get_popular_recommendations()
+        else:
+            raise ValueError("'by' must be artist, genre or popular")
+        return {"recommendations": recs}
+
+    def op_duration(self, op):
+        response = self.app.send_duration_request(op["user"])
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response
+
+    def op_import(self, op):
+        (path,) = _require(op, "path")
+        username = op["user"]
+        result = import_file(
+            path, self.library(username),
+            lambda songs: self.app.add_liked_songs_for_user(username, songs))
+        return {
+            "read": result["read"],
+            "added": len(result["added"]),
+            "duplicates": result["duplicates"],
+            "unmatched": [{"title": t, "artist": a}
+                          for t, a in result["unmatched"]],
+            "seconds": round(result["seconds"], 3),
+        }
+
+
+def _require(op, *fields) -> tuple:
+    missing = [f for f in fields if not op.get(f)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(repr(f) for f in missing)}")
+    return tuple(op[f] for f in fields)
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="playlist_manager",
+        description="Run playlist operations without the interactive menu. "
+                    "Omitted arguments are read from stdin as JSON lines.")
+    parser.add_argument("--user", help="user whose library to act on")
+    parser.add_argument("--ops", metavar="FILE",
+                        help="run JSON-lines operations from FILE "
+                             "('-' for stdin)")
+    sub = parser.add_subparsers(dest="op")
+
+    add = sub.add_parser("add", help="add a song to liked songs")
+    add.add_argument("title", nargs="?")
+    add.add_argument("artist", nargs="?")
+
+    delete = sub.add_parser("delete", help="delete a liked song")
+    delete.add_argument("title", nargs="?")
+    delete.add_argument("artist", nargs="?")
+
+    list_ = sub.add_parser("list", help="list liked songs")
+    list_.add_argument("--genre")
+    list_.add_argument("--year")
+
+    lookup = sub.add_parser("lookup", help="search liked songs")
+    lookup.add_argument("query", nargs="?")
+    lookup.add_argument("--field", default="title",
+                        choices=LikedSongs.SEARCH_FIELDS)
+
+    recommend = sub.add_parser("recommend", help="get recommendations")
+    recommend.add_argument("--by", default="popular",
+                           choices=("artist", "genre", "popular"))
+    recommend.add_argument("value", nargs="?",
+                           help="artist or genre name")
+
+    sub.add_parser("duration", help="total duration of liked songs")
+
+    import_ = sub.add_parser("import", help="import a CSV/JSON/M3U file")
+    import_.add_argument("path", nargs="?")
+    return parser
+
+
+# Positional arguments per subcommand; if all are missing, read stdin
+POSITIONALS = {
+    "add": ("title", "artist"),
+    "delete": ("title", "artist"),
+    "lookup": ("query",),
+    "import": ("path",),
+}
+
+
+def _read_json_lines(stream):
+    """
+    Parsed JSON values, one per non-blank line. A line that isn't valid
+    JSON is yielded as a ValueError, so that line fails on its own in
+    BatchSession.run and the rest of the stream still runs.
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Line {number} is not valid JSON: {e}")
+
+
+def iter_ops(args, stdin=sys.stdin):
+    """Turn parsed arguments into a stream of operation dicts."""
+    if args.ops:
+        stream = stdin if args.ops == "-" else open(args.ops, "r",
+                                                    encoding="utf-8")
+        try:
+            for op in _read_json_lines(stream):
+                if args.user and isinstance(op, dict) and "user" not in op:
+                    op["user"] = args.user
+                yield op
+        finally:
+            if stream is not stdin:
+                stream.close()
+        return
+
+    base = {k: v for k, v in vars(args).items()
+            if k != "ops" and v is not None}
+    positionals = POSITIONALS.get(args.op, ())
+    if positionals and all(base.get(p) is None for p in positionals):
+        for fields in _read_json_lines(stdin):
+            # anything but an object is passed on for run() to reject
+            yield {**base, **fields} if isinstance(fields, dict) else fields
+    else:
+        yield base
+
+
+def run_batch(argv, app, stdin=sys.stdin, stdout=sys.stdout) -> int:
+    """Parse `argv`, run the operations and print one JSON line each."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.op and not args.ops:
+        parser.error("a subcommand or --ops is required")
+
+    session = BatchSession(app)
+    failed = False
+    try:
+        for op in iter_ops(args, stdin):
+            result = session.run(op)
+            failed = failed or not result["ok"]
+            stdout.write(json.dumps(result, default=str) + "\n")
+            stdout.flush()
+    except (OSError, ValueError) as e:
+        stdout.write(json.dumps({"op": args.op, "ok": False,
+                                 "error": f"Could not read operations: {e}"})
+                     + "\n")
+        return 1
+    return 1 if failed else 0
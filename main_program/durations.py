@@ -0,0 +1,68 @@
+"""
+Parsing of the duration strings stored with liked songs.
+
+Shared by the total duration service, the SQLite backend (which stores
+each song's duration in seconds) and the M3U export, so every total
+counts the same songs.
+"""
+import re
+
+_duration_re_ms = re.compile(r"^\s*(\d+)\s*ms\s*$", re.IGNORECASE)
+_duration_re_colon = re.compile(r"^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*$")
+
+
+def parse_duration_to_seconds(value) -> int | None:
+    """
+    Parse common duration formats into total seconds.
+    Returns None if the value is missing or cannot be parsed.
+
+    Supported:
+      - "242667 ms"  -> 242.667s
+      - "3:30"       -> 210s
+      - "01:02:03"   -> 3723s
+      - 242667       -> assume milliseconds (>= 1000) else seconds
+      - "210"        -> assume seconds
+    """
+    if value is None:
+        return None
+
+    # If it's already numeric
+    if isinstance(value, (int, float)):
+        # Heuristic: large numbers are probably milliseconds
+        if value >= 1000:
+            return int(round(value / 1000))
+        return int(value)
+
+    if not isinstance(value, str):
+        return None
+
+    s = value.strip()
+    if not s or s.lower() == "unknown":
+        return None
+
+    # "123456 ms"
+    m = _duration_re_ms.match(s)
+    if m:
+        ms = int(m.group(1))
+        return ms // 1000
+
+    # "mm:ss" or "hh:mm:ss"
+    m = _duration_re_colon.match(s)
+    if m:
+        hh = m.group(3)
+        if hh is not None:
+            parts = s.split(":")
+            parts = [int(p) for p in parts]
+            if len(parts) == 3:
+                h, m_, sec = parts
+                return h * 3600 + m_ * 60 + sec
+        mm = int(m.group(1))
+        ss = int(m.group(2))
+        return mm * 60 + ss
+
+    # Plain integer string — assume seconds
+    if s.isdigit():
+        val = int(s)
+        return val
+
+    return None
@@ -0,0 +1,260 @@
+"""
+In-memory view of a user's liked songs.
+
+LikedSongs keeps the songs in the order they were added, plus a set of
+casefolded (title, artist) keys and a genre -> songs index that are
+updated on every add and delete. Duplicate checks are O(1) and listing
+one genre is O(k) in the size of that genre, instead of scanning the
+whole library each time.
+
+The genre index doubles as the user's genre list: its keys are the
+genres in first-added order and each bucket's length is that genre's
+count, so both are rebuilt in the same pass that loads the library.
+
+Title, artist and genre are also covered by trigram inverted indexes, so
+a substring search only verifies the songs that share every trigram of
+the query instead of lowercasing the whole library on each lookup. The
+search indexes are built on the first search (so logging in stays fast)
+and then kept up to date on every add and delete.
+
+Songs are stored as SongRecord objects, which use __slots__ but still
+support song["title"] / song.get("year") like the dicts they replace.
+"""
+
+from collections import defaultdict
+
+_MISSING = object()
+
+# Genre placeholder for songs missing from the dataset; not listed
+UNKNOWN_GENRE = "Unknown"
+
+
+def song_key(title, artist) -> tuple:
+    return (str(title).casefold(), str(artist).casefold())
+
+
+def _trigrams(text) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Maps each casefolded trigram to the ids of songs containing it."""
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+
+    def add(self, song_id, text):
+        for gram in _trigrams(text):
+            self._postings[gram].add(song_id)
+
+    def remove(self, song_id, text):
+        for gram in _trigrams(text):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(song_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def candidates(self, query):
+        """
+        Ids of songs that may contain `query` (already casefolded), or
+        None if the query is shorter than a trigram and can't be narrowed.
+        """
+        grams = _trigrams(query)
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(g, set()) for g in grams),
+                          key=len)
+        return set.intersection(*postings)
+
+
+class SongRecord:
+    """One liked song. Fields outside FIELDS are kept in `extra`."""
+
+    FIELDS = ("title", "artist", "genre", "year", "date_added", "duration")
+    __slots__ = FIELDS + ("extra", "uid")
+
+    def __init__(self, song: dict):
+        for field in self.FIELDS:
+            setattr(self, field, song.get(field, _MISSING))
+        self.extra = {k: v for k, v in song.items() if k not in self.FIELDS}
+        self.uid = None
+
+    @property
+    def key(self) -> tuple:
+        return song_key(self.title, self.artist)
+
+    def __getitem__(self, field):
+        if field in self.FIELDS:
+            value = getattr(self, field)
+            if value is _MISSING:
+                raise KeyError(field)
+            return value
+        return self.extra[field]
+
+    def __contains__(self, field) -> bool:
+        return self.get(field, _MISSING) is not _MISSING
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def search_text(self, field) -> str:
+        value = self.get(field)
+        return "" if value is None else str(value).casefold()
+
+    def to_dict(self) -> dict:
+        song = {field: getattr(self, field) for field in self.FIELDS
+                if getattr(self, field) is not _MISSING}
+        song.update(self.extra)
+        return song
+
+    def __eq__(self, other):
+        if isinstance(other, SongRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self):
+        return f"SongRecord({self.to_dict()!r})"
+
+
+class LikedSongs:
+    """Ordered liked songs with duplicate, genre and search indexes."""
+
+    SEARCH_FIELDS = ("title", "artist", "genre")
+
+    def __init__(self, songs=()):
+        self._songs = []
+        self._keys = set()
+        self._by_genre = {}
+        self._by_uid = {}
+        self._next_uid = 0
+        self._search = None
+        for song in songs:
+            self.add(song)
+
+    # ------------------------------------------------------------------
+    # Sequence behaviour
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._songs)
+
+    def __iter__(self):
+        return iter(self._songs)
+
+    def __getitem__(self, index):
+        return self._songs[index]
+
+    def __repr__(self):
+        return f"LikedSongs({len(self)} songs)"
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def contains(self, title, artist) -> bool:
+        """Case-insensitive check for a (title, artist) pair."""
+        return song_key(title, artist) in self._keys
+
+    def keys(self) -> set:
+        """A copy of the casefolded (title, artist) keys."""
+        return set(self._keys)
+
+    def by_genre(self, genre) -> list:
+        return list(self._by_genre.get(genre, ()))
+
+    def search(self, query, field="title") -> list:
+        """
+        Songs whose `field` contains `query` (case-insensitive), in the
+        order they were added.
+        """
+        q = str(query).casefold()
+        ids = self._search_indexes()[field].candidates(q)
+        if ids is None:
+            candidates = self._songs
+        else:
+            candidates = [self._by_uid[uid] for uid in sorted(ids)]
+        return [song for song in candidates if q in song.search_text(field)]
+
+    def _search_indexes(self) -> dict:
+        if self._search is None:
+            self._search = {field: TrigramIndex()
+                            for field in self.SEARCH_FIELDS}
+            for record in self._songs:
+                self._index_text(record)
+        return self._search
+
+    def _index_text(self, record):
+        for field, index in self._search.items():
+            index.add(record.uid, record.search_text(field))
+
+    def genre_counts(self) -> dict:
+        """Number of songs per known genre, in first-added order."""
+        return {genre: len(bucket) for genre, bucket in self._by_genre.items()
+                if genre and genre != UNKNOWN_GENRE}
+
+    def genres(self) -> list:
+        """Known genres with at least one song, in first-added order."""
+        return list(self.genre_counts())
+
+    def has_genre(self, genre) -> bool:
+        return bool(genre) and genre != UNKNOWN_GENRE and \
+            genre in self._by_genre
+
+    def to_dicts(self) -> list:
+        return [song.to_dict() for song in self._songs]
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add(self, song):
+        """
+        Append `song` (a dict or SongRecord). Returns the stored record,
+        or None if the same title and artist are already liked.
+        """
+        record = song if isinstance(song, SongRecord) else SongRecord(song)
+        key = record.key
+        if key in self._keys:
+            return None
+        self._keys.add(key)
+        self._songs.append(record)
+        self._by_genre.setdefault(record.get("genre"), []).append(record)
+
+        # uids increase with insertion order, so sorting by uid keeps it
+        record.uid = self._next_uid
+        self._next_uid += 1
+        self._by_uid[record.uid] = record
+        if self._search is not None:
+            self._index_text(record)
+        return record
+
+    def pop(self, index=-1) -> SongRecord:
+        record = self._songs.pop(index)
+        self._unindex(record)
+        return record
+
+    def remove(self, title, artist):
+        """Remove and return the song matching title/artist, or None."""
+        key = song_key(title, artist)
+        if key not in self._keys:
+            return None
+        for i, record in enumerate(self._songs):
+            if record.key == key:
+                return self.pop(i)
+        return None
+
+    def _unindex(self, record):
+        self._keys.discard(record.key)
+        self._by_uid.pop(record.uid, None)
+        if self._search is not None:
+            for field, index in self._search.items():
+                index.remove(record.uid, record.search_text(field))
+        genre = record.get("genre")
+        bucket = self._by_genre.get(genre, [])
+        for i, other in enumerate(bucket):
+            if other is record:
+                del bucket[i]
+                break
+        if not bucket:
+            self._by_genre.pop(genre, None)
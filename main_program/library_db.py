@@ -0,0 +1,264 @@
+"""
+SQLite storage backend for user accounts and liked songs.
+
+Enabled with PLAYLIST_STORAGE=sqlite (the default is the JSON files under
+liked_songs/ and users.json). The database lives at main_program/library.db
+unless PLAYLIST_DB points elsewhere.
+
+Liked songs are one row each, with a unique index on (user, title,
+artist): inserts skip songs that are already liked, and deletes and the
+per-user duration total are indexed. Durations are also stored in
+seconds, so the total is a single SUM. Titles and artists are keyed
+with library.song_key, so duplicate checks match the JSON store and the
+CLI.
+
+The CLI still loads the whole library at login. Its genre views, lookups
+and duplicate checks are answered from the in-memory LikedSongs indexes
+(see main_program.library), so this module has no queries for them.
+
+Migrate existing JSON data with:
+    python -m main_program.library_db migrate [--liked-dir DIR] [--users FILE]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+from main_program.durations import parse_duration_to_seconds
+from main_program.library import song_key
+
+STORAGE_BACKEND = os.environ.get("PLAYLIST_STORAGE", "json").lower()
+DB_PATH = os.environ.get(
+    "PLAYLIST_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "library.db"))
+
+# Columns stored directly; any other song fields go into `extra` as JSON
+SONG_FIELDS = ("title", "artist", "genre", "year", "date_added", "duration")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS liked_songs (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    genre TEXT,
+    year,
+    date_added TEXT,
+    duration,
+    duration_seconds INTEGER,
+    extra TEXT
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_liked_user_title_artist
+    ON liked_songs (user, title_key, artist_key);
+"""
+
+_connections = {}
+_lock = threading.RLock()
+
+
+def _plain(value):
+    """numpy scalars -> Python values so sqlite3 can bind them."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def enabled() -> bool:
+    """True when PLAYLIST_STORAGE selects this backend."""
+    return STORAGE_BACKEND == "sqlite"
+
+
+def get_connection(path=None) -> sqlite3.Connection:
+    """Return the process-wide connection for `path`, creating the schema."""
+    path = path or DB_PATH
+    with _lock:
+        conn = _connections.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _connections[path] = conn
+        return conn
+
+
+def close_all():
+    with _lock:
+        for conn in _connections.values():
+            conn.close()
+        _connections.clear()
+
+
+def _row_to_song(row) -> dict:
+    song = {field: row[field] for field in SONG_FIELDS}
+    if row["extra"]:
+        song.update(json.loads(row["extra"]))
+    return song
+
+
+def _song_params(username, song) -> tuple:
+    extra = {k: _plain(v) for k, v in song.items() if k not in SONG_FIELDS}
+    return (
+        username,
+        str(song["title"]),
+        str(song["artist"]),
+        *song_key(song["title"], song["artist"]),
+        _plain(song.get("genre")),
+        _plain(song.get("year")),
+        _plain(song.get("date_added")),
+        _plain(song.get("duration")),
+        parse_duration_to_seconds(_plain(song.get("duration"))),
+        json.dumps(extra) if extra else None,
+    )
+
+
+_INSERT_SONG = """
+INSERT OR IGNORE INTO liked_songs (user, title, artist, title_key,
+    artist_key, genre, year, date_added, duration, duration_seconds, extra)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+# ----------------------------------------------------------------------
+# Liked songs (same interface as liked_songs_store)
+# ----------------------------------------------------------------------
+def load_liked_songs(username, path=None) -> list:
+    """All of a user's liked songs, in the order they were added."""
+    rows = get_connection(path).execute(
+        "SELECT * FROM liked_songs WHERE user = ? ORDER BY id", (username,))
+    return [_row_to_song(row) for row in rows]
+
+
+def iter_songs(username, path=None):
+    """Stream a user's liked songs from the database, one row at a time."""
+    rows = get_connection(path).execute(
+        "SELECT * FROM liked_songs WHERE user = ? ORDER BY id", (username,))
+    for row in rows:
+        yield _row_to_song(row)
+
+
+def write_snapshot(username, songs, path=None):
+    """Replace a user's whole library with `songs`."""
+    conn = get_connection(path)
+    with _lock, conn:
+        conn.execute("DELETE FROM liked_songs WHERE user = ?", (username,))
+        conn.executemany(_INSERT_SONG,
+                         (_song_params(username, s) for s in songs))
+
+
+def append_added_songs(username, songs, path=None):
+    """Insert new songs; songs already liked (any case) are ignored."""
+    conn = get_connection(path)
+    with _lock, conn:
+        conn.executemany(_INSERT_SONG,
+                         (_song_params(username, s) for s in songs))
+
+
+def append_deleted_song(username, song, path=None):
+    conn = get_connection(path)
+    with _lock, conn:
+        conn.execute(
+            "DELETE FROM liked_songs "
+            "WHERE user = ? AND title_key = ? AND artist_key = ?",
+            (username, *song_key(song["title"], song["artist"])))
+
+
+# ----------------------------------------------------------------------
+# Queries
+# ----------------------------------------------------------------------
+def total_duration(username, path=None) -> dict:
+    """Summed duration and counts, in the total duration service's terms."""
+    row = get_connection(path).execute(
+        "SELECT COALESCE(SUM(duration_seconds), 0) AS total, "
+        "COUNT(duration_seconds) AS counted, COUNT(*) AS songs "
+        "FROM liked_songs WHERE user = ?", (username,)).fetchone()
+    return {
+        "total_seconds": row["total"],
+        "count_songs": row["counted"],
+        "skipped": row["songs"] - row["counted"],
+    }
+
+
+def has_user_library(username, path=None) -> bool:
+    row = get_connection(path).execute(
+        "SELECT 1 FROM liked_songs WHERE user = ? LIMIT 1",
+        (username,)).fetchone()
+    return row is not None
+
+
+# ----------------------------------------------------------------------
+# Users
+# ----------------------------------------------------------------------
+def load_users(path=None) -> dict:
+    rows = get_connection(path).execute("SELECT username, password FROM users")
+    return {row["username"]: row["password"] for row in rows}
+
+
+def add_user(username, password, path=None):
+    conn = get_connection(path)
+    with _lock, conn:
+        conn.execute("INSERT OR REPLACE INTO users VALUES (?, ?)",
+                     (username, password))
+
+
+# ----------------------------------------------------------------------
+# Migration from the JSON files
+# ----------------------------------------------------------------------
+def migrate_from_json(liked_dir="liked_songs", users_file="users.json",
+                      path=None) -> dict:
+    """
+    Import users.json and every liked_songs/<user>.json (plus journal)
+    into the database. Existing rows are kept; duplicates are skipped.
+    """
+    from main_program import liked_songs_store
+
+    conn = get_connection(path)
+    summary = {"users": 0, "libraries": 0, "songs": 0}
+
+    if os.path.exists(users_file):
+        with open(users_file, "r") as f:
+            users = json.load(f)
+        with _lock, conn:
+            conn.executemany("INSERT OR REPLACE INTO users VALUES (?, ?)",
+                             users.items())
+        summary["users"] = len(users)
+
+    if os.path.isdir(liked_dir):
+        usernames = sorted({
+            os.path.splitext(name)[0] for name in os.listdir(liked_dir)
+            if name.endswith((".json", ".journal"))
+        })
+        for username in usernames:
+            songs = liked_songs_store.load_liked_songs(
+                username, liked_dir, compact=False)
+            before = conn.total_changes
+            append_added_songs(username, songs, path)
+            summary["libraries"] += 1
+            summary["songs"] += conn.total_changes - before
+
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Liked songs database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="import the JSON files")
+    migrate.add_argument("--liked-dir", default="liked_songs")
+    migrate.add_argument("--users", default="users.json")
+    migrate.add_argument("--db", default=None, help=f"default: {DB_PATH}")
+    args = parser.parse_args(argv)
+
+    summary = migrate_from_json(args.liked_dir, args.users, args.db)
+    print(f"Imported {summary['users']} user(s) and {summary['songs']} "
+          f"song(s) from {summary['libraries']} library file(s).")
+
+
+if __name__ == "__main__":
+    main()
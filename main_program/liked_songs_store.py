@@ -0,0 +1,284 @@
+"""
+Journaled storage for a user's liked songs.
+
+Each user has a snapshot, liked_songs/<username>.json (a JSON list, one
+song per line), plus an append-only journal, liked_songs/<username>.journal,
+with one JSON operation per line:
+
+    {"op": "add", "song": {...}}
+    {"op": "delete", "title": "...", "artist": "..."}
+
+Adding or deleting a song appends a single line and fsyncs it, so an edit
+costs a few hundred bytes regardless of library size. Loading reads the
+snapshot and replays the journal; once the journal grows past
+COMPACT_EVERY operations it is folded into a fresh snapshot.
+
+Songs are keyed by case-insensitive (title, artist). An add of a key that
+is already present is ignored and a delete of a missing key is a no-op,
+so the final state of each key only depends on its last operation. That
+makes replay idempotent: if compaction is interrupted after the new
+snapshot is in place but before the journal is cleared, replaying the
+old journal over the new snapshot gives the same library. A torn last
+line from a crash mid-append is skipped.
+"""
+import json
+import os
+import threading
+
+from main_program import library
+
+LIKED_SONGS_DIR = "liked_songs"
+COMPACT_EVERY = 500
+
+# Journal operations written since the last compaction, per file
+_pending_ops = {}
+_pending_lock = threading.Lock()
+
+
+def song_key(song) -> tuple:
+    return library.song_key(song["title"], song["artist"])
+
+
+def _to_builtin(item):
+    """Convert numpy scalars left over from pandas lookups."""
+    if hasattr(item, "item"):
+        return item.item()
+    raise TypeError(f"Object of type {type(item).__name__} "
+                    f"is not JSON serializable")
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, default=_to_builtin, separators=(",", ":"))
+
+
+def snapshot_path(username, directory=LIKED_SONGS_DIR) -> str:
+    return os.path.join(directory, f"{username}.json")
+
+
+def journal_path(username, directory=LIKED_SONGS_DIR) -> str:
+    return os.path.join(directory, f"{username}.journal")
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+def read_journal(username, directory=LIKED_SONGS_DIR):
+    """Yield the valid operations in a user's journal, in order."""
+    path = journal_path(username, directory)
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue  # torn write at the end of the file
+            if isinstance(op, dict) and op.get("op") in ("add", "delete"):
+                yield op
+
+
+def replay(songs, ops) -> list:
+    """Apply journal operations to a list of songs and return the result."""
+    index = {}
+    for i, song in enumerate(songs):
+        index.setdefault(song_key(song), i)
+    result = list(songs)
+
+    for op in ops:
+        if op["op"] == "add":
+            song = op.get("song")
+            if not isinstance(song, dict):
+                continue
+            key = song_key(song)
+            if key not in index:
+                index[key] = len(result)
+                result.append(song)
+        else:
+            i = index.pop(song_key(op), None)
+            if i is not None:
+                result[i] = None
+
+    return [song for song in result if song is not None]
+
+
+def _iter_snapshot(path):
+    """
+    Yield the songs in a snapshot one at a time. Snapshots written by
+    write_snapshot hold one song per line; anything else (e.g. an older
+    indented file) is parsed whole.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if f.readline().strip() == "[":
+            streamed = False
+            for line in f:
+                line = line.strip().rstrip(",")
+                if line == "]":
+                    return
+                try:
+                    song = json.loads(line)
+                except ValueError:
+                    if streamed:
+                        raise
+                    break  # not one song per line
+                streamed = True
+                yield song
+            else:
+                return
+        f.seek(0)
+        yield from json.load(f)
+
+
+def iter_songs(username, directory=LIKED_SONGS_DIR):
+    """
+    Yield the same songs, in the same order, as load_liked_songs without
+    holding the library in memory: the snapshot is streamed and only the
+    journal (at most COMPACT_EVERY operations) is read up front.
+    """
+    ops = list(read_journal(username, directory))
+
+    # Journal operations grouped by key, in order
+    key_ops = {}
+    for i, op in enumerate(ops):
+        if op["op"] == "add":
+            if not isinstance(op.get("song"), dict):
+                continue
+            key_ops.setdefault(song_key(op["song"]), []).append((i, op))
+        else:
+            key_ops.setdefault(song_key(op), []).append((i, op))
+
+    in_snapshot = set()
+    path = snapshot_path(username, directory)
+    if os.path.exists(path):
+        for song in _iter_snapshot(path):
+            key = song_key(song)
+            if key not in key_ops:
+                yield song
+                continue
+            if key in in_snapshot:
+                yield song  # duplicate row; replay keeps it as well
+                continue
+            in_snapshot.add(key)
+            if not any(op["op"] == "delete" for _, op in key_ops[key]):
+                yield song
+
+    # Songs (re-)added by the journal go last, in the order replay
+    # would append them
+    appended = []
+    for key, entries in key_ops.items():
+        present = key in in_snapshot
+        added_at = None
+        for i, op in entries:
+            if op["op"] == "add" and not present:
+                present, added_at = True, (i, op["song"])
+            elif op["op"] == "delete" and present:
+                present, added_at = False, None
+        if present and added_at is not None:
+            appended.append(added_at)
+    for _, song in sorted(appended, key=lambda entry: entry[0]):
+        yield song
+
+
+def load_liked_songs(username, directory=LIKED_SONGS_DIR,
+                     compact=True) -> list:
+    """
+    Return the user's liked songs: snapshot plus replayed journal.
+    Readers in other processes (e.g. the total duration service) should
+    pass compact=False and leave compaction to the owning CLI.
+    """
+    path = snapshot_path(username, directory)
+    songs = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            songs = json.load(f)
+
+    ops = list(read_journal(username, directory))
+    if ops:
+        songs = replay(songs, ops)
+    if not compact:
+        return songs
+
+    with _pending_lock:
+        _pending_ops[journal_path(username, directory)] = len(ops)
+    if len(ops) >= COMPACT_EVERY:
+        write_snapshot(username, songs, directory)
+    return songs
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+def write_snapshot(username, songs, directory=LIKED_SONGS_DIR):
+    """
+    Atomically replace the snapshot with `songs` and clear the journal.
+    Also used to compact the journal.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(username, directory)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        f.write(",\n".join(_dumps(song) for song in songs))
+        f.write("\n]\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(directory)
+
+    # Safe to crash before this point: replaying the old journal over
+    # the new snapshot is idempotent
+    journal = journal_path(username, directory)
+    if os.path.exists(journal):
+        os.remove(journal)
+    with _pending_lock:
+        _pending_ops[journal] = 0
+
+
+def _append(username, ops, directory):
+    os.makedirs(directory, exist_ok=True)
+    path = journal_path(username, directory)
+    data = "".join(_dumps(op) + "\n" for op in ops).encode("utf-8")
+
+    with open(path, "a+b") as f:
+        # Start on a fresh line if a previous append was torn by a crash
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    with _pending_lock:
+        pending = _pending_ops.get(path, 0) + len(ops)
+        _pending_ops[path] = pending
+
+    if pending >= COMPACT_EVERY:
+        songs = load_liked_songs(username, directory, compact=False)
+        write_snapshot(username, songs, directory)
+
+
+def append_added_songs(username, songs, directory=LIKED_SONGS_DIR):
+    """Journal one or more newly liked songs in a single write."""
+    if songs:
+        _append(username, [{"op": "add", "song": song} for song in songs],
+                directory)
+
+
+def append_deleted_song(username, song, directory=LIKED_SONGS_DIR):
+    """Journal the removal of `song` (matched by title and artist)."""
+    title, artist = song["title"], song["artist"]
+    _append(username, [{"op": "delete", "title": title, "artist": artist}],
+            directory)
@@ -0,0 +1,90 @@
+"""
+Streaming export of a user's liked songs to CSV, JSONL or M3U.
+
+The export is a generator pipeline: the storage backend's iter_songs()
+streams the stored library one song at a time, filter_songs() drops
+songs outside the requested genre/year, and the format writer writes
+each song as it arrives. Memory use stays flat however large the
+library is.
+"""
+import csv
+import json
+import os
+
+from main_program.durations import parse_duration_to_seconds
+
+CSV_FIELDS = ("title", "artist", "genre", "year", "date_added", "duration")
+
+
+def filter_songs(songs, genre=None, year=None):
+    """Yield the songs matching `genre` (case-insensitive) and `year`."""
+    genre = genre.casefold() if genre else None
+    year = str(year) if year is not None else None
+    for song in songs:
+        if genre is not None and \
+                str(song.get("genre", "")).casefold() != genre:
+            continue
+        if year is not None and str(song.get("year", "")) != year:
+            continue
+        yield song
+
+
+# ----------------------------------------------------------------------
+# Format writers: each writes `songs` to the text file `out` and
+# returns the number of songs written
+# ----------------------------------------------------------------------
+def write_csv(songs, out) -> int:
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS,
+                            extrasaction="ignore", restval="")
+    writer.writeheader()
+    count = 0
+    for song in songs:
+        writer.writerow(song)
+        count += 1
+    return count
+
+
+def write_jsonl(songs, out) -> int:
+    count = 0
+    for song in songs:
+        out.write(json.dumps(song, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_m3u(songs, out) -> int:
+    """
+    Extended M3U. There are no audio files, so each entry's location
+    line repeats "Artist - Title"; playlist_import reads it back.
+    """
+    out.write("#EXTM3U\n")
+    count = 0
+    for song in songs:
+        seconds = parse_duration_to_seconds(song.get("duration"))
+        name = f"{song['artist']} - {song['title']}"
+        out.write(f"#EXTINF:{seconds if seconds is not None else -1},"
+                  f"{name}\n{name}\n")
+        count += 1
+    return count
+
+
+WRITERS = {
+    ".csv": write_csv,
+    ".jsonl": write_jsonl,
+    ".m3u": write_m3u,
+    ".m3u8": write_m3u,
+}
+
+
+def export_songs(songs, path, genre=None, year=None) -> int:
+    """
+    Write `songs` (any iterable, typically a store's iter_songs) to
+    `path` in the format given by its extension. Returns the number of
+    songs written.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported file type '{ext}' "
+                         f"(use {', '.join(sorted(WRITERS))})")
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        return WRITERS[ext](filter_songs(songs, genre, year), out)
@@ -0,0 +1,163 @@
+"""
+Bulk import of songs from a file into a user's liked songs.
+
+Supported formats, picked by file extension:
+    .csv          "title" and "artist" columns (or the dataset's
+                  "track_name" / "artist_name")
+    .json         a list of {"title", "artist"} objects, or {"songs": [...]}
+    .jsonl        one {"title", "artist"} object per line
+    .m3u / .m3u8  "#EXTINF:<secs>,Artist - Title" entries (their location
+                  line is skipped), or plain "Artist - Title" lines
+
+Every row is enriched with genre, year and duration in one vectorized
+merge against the dataset (see song_service.match_songs), de-duplicated
+against itself and the existing library, and persisted with a single
+storage call. Rows that aren't in the dataset are reported, not added.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from dataset_service.song_service import match_songs
+
+CSV_ALIASES = {"track_name": "title", "artist_name": "artist"}
+
+
+# ----------------------------------------------------------------------
+# Readers
+# ----------------------------------------------------------------------
+def _read_csv(path) -> pd.DataFrame:
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    frame.columns = [c.strip().lower() for c in frame.columns]
+    return frame.rename(columns=CSV_ALIASES)
+
+
+def _read_json(path) -> pd.DataFrame:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("songs", [])
+    return pd.DataFrame([row for row in data if isinstance(row, dict)])
+
+
+def _read_jsonl(path) -> pd.DataFrame:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return pd.DataFrame(rows)
+
+
+def _read_m3u(path) -> pd.DataFrame:
+    rows = []
+    after_extinf = False
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                line = line.partition(",")[2]
+                after_extinf = True
+            elif not line or line.startswith("#"):
+                continue
+            elif after_extinf:
+                # Location line of the #EXTINF entry we already read
+                after_extinf = False
+                continue
+            artist, sep, title = line.partition(" - ")
+            if sep:
+                rows.append({"title": title.strip(), "artist": artist.strip()})
+    return pd.DataFrame(rows, columns=["title", "artist"])
+
+
+READERS = {
+    ".csv": _read_csv,
+    ".json": _read_json,
+    ".jsonl": _read_jsonl,
+    ".m3u": _read_m3u,
+    ".m3u8": _read_m3u,
+}
+
+
+def read_import_file(path) -> pd.DataFrame:
+    """Read title/artist pairs from `path` into a two-column DataFrame."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"Unsupported file type '{ext}' "
+                         f"(use {', '.join(sorted(READERS))})")
+    frame = READERS[ext](path)
+    if not {"title", "artist"} <= set(frame.columns):
+        raise ValueError("Import file needs 'title' and 'artist' fields")
+
+    frame = frame[["title", "artist"]].fillna("").astype(str)
+    frame["title"] = frame["title"].str.strip()
+    frame["artist"] = frame["artist"].str.strip()
+    return frame[(frame["title"] != "") & (frame["artist"] != "")]
+
+
+# ----------------------------------------------------------------------
+# Import
+# ----------------------------------------------------------------------
+def _plain(value):
+    """numpy scalars -> Python values, NaN -> "Unknown"."""
+    if pd.isna(value):
+        return "Unknown"
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return value
+
+
+def import_rows(frame, liked_songs, persist) -> dict:
+    """
+    Enrich and add the rows of `frame` to `liked_songs` (a LikedSongs).
+    `persist(songs)` is called once with all newly added songs.
+
+    Returns a summary dict: rows "read", the "added" songs, the number
+    of "duplicates" skipped, "unmatched" (title, artist) pairs, and the
+    elapsed "seconds".
+    """
+    start = time.perf_counter()
+    result = {"read": len(frame), "added": [], "duplicates": 0}
+
+    enriched = match_songs(frame)
+    unmatched = enriched[~enriched["matched"]]
+    result["unmatched"] = list(zip(unmatched["title"], unmatched["artist"]))
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    matched = enriched[enriched["matched"]]
+    for title, artist, genre, year, duration, track_id in zip(
+            matched["title"], matched["artist"], matched["genre"],
+            matched["year"], matched["duration"], matched["track_id"]):
+        song = liked_songs.add({
+            "title": title,
+            "artist": artist,
+            "genre": _plain(genre),
+            "year": _plain(year),
+            "date_added": today,
+            "duration": duration,
+            "track_id": int(track_id),
+        })
+        if song is None:
+            result["duplicates"] += 1
+        else:
+            result["added"].append(song.to_dict())
+
+    if result["added"]:
+        persist(result["added"])
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def import_file(path, liked_songs, persist) -> dict:
+    """Read `path` and import it; see import_rows."""
+    start = time.perf_counter()
+    frame = read_import_file(path)
+    result = import_rows(frame, liked_songs, persist)
+    result["seconds"] = time.perf_counter() - start
+    return result
@@ -3,14 +3,20 @@
 import sys
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dataset_service.song_service import find_song_data
+from dataset_service.song_service import find_song_data, find_songs_data
 from microservices.recommendation_service.zeroMQClient import send_request
 from microservices.random_song_service.zeroMQClient import request_random_song
 from microservices.song_by_year_service.zeroMQClient import send_year_request
 from microservices.total_duration_service.zeroMQClient import (
     send_duration_request
 )
+from main_program.song_prefetch import SongPrefetcher
+from main_program import library_db, liked_songs_store
+from main_program.library import LikedSongs, song_key
+from main_program.playlist_export import export_songs
+from main_program.playlist_import import import_file
 
 
 APP_DATA_FILE = "app_data.json"
@@ -18,34 +24,28 @@ APP_DATA_FILE = "app_data.json"
 # ----------------------------------------------------------------------
 # Liked Songs Storage
 # ----------------------------------------------------------------------
+# Edits are appended to a per-user journal (see liked_songs_store), or
+# go to SQLite when PLAYLIST_STORAGE=sqlite (see library_db).
+liked_store = library_db if library_db.enabled() else liked_songs_store
+
+
 def load_liked_songs_for_user(username):
-    filepath = os.path.join("liked_songs", f"{username}.json")
-    if os.path.exists(filepath):
-        with open(filepath, "r") as f:
-            return json.load(f)
-    return []
+    return liked_store.load_liked_songs(username)
 
 
 def save_liked_songs_for_user(username, songs):
-    directory = "liked_songs"
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-
-    filepath = os.path.join("liked_songs", f"{username}.json")
-
-    # Convert all data to built-in Python types
-    def convert(item):
-        if isinstance(item, dict):
-            return {k: convert(v) for k, v in item.items()}
-        elif isinstance(item, list):
-            return [convert(i) for i in item]
-        elif hasattr(item, "item"):  # handles numpy types
-            return item.item()
-        else:
-            return item
+    """Rewrite the user's whole library as a fresh snapshot."""
+    liked_store.write_snapshot(username, songs)
 
-    with open(filepath, "w") as f:
-        json.dump(convert(songs), f, indent=2)
+
+def add_liked_songs_for_user(username, songs):
+    """Persist newly added songs without rewriting the library."""
+    liked_store.append_added_songs(username, songs)
+
+
+def delete_liked_song_for_user(username, song):
+    """Persist the removal of one song without rewriting the library."""
+    liked_store.append_deleted_song(username, song)
 
 
 # ----------------------------------------------------------------------
@@ -54,6 +54,8 @@ def save_liked_songs_for_user(username, songs):
 USERS_FILE = "users.json"
 
 def load_users():
+    if library_db.enabled():
+        return library_db.load_users()
     if os.path.exists(USERS_FILE):
         with open(USERS_FILE, "r") as f:
             return json.load(f)
@@ -63,15 +65,94 @@ def save_users(data):
     with open(USERS_FILE, "w") as f:
         json.dump(data, f, indent=2)
 
+def register_user(username, password):
+    users[username] = password
+    if library_db.enabled():
+        library_db.add_user(username, password)
+    else:
+        save_users(users)
+
 users = load_users()
 
-genres = []
+# Random and by-year songs are fetched ahead of time in the background.
+# The lambdas look the client functions up at call time.
+song_prefetcher = SongPrefetcher(
+    fetch_random=lambda: request_random_song(),
+    fetch_by_year=lambda year: send_year_request(year),
+)
+
+# The discovery screen's requests (popular, random, artist, genre and
+# the precomputed lookup) run on these long-lived threads, so each
+# thread's service clients are opened once and then reused.
+DISCOVERY_THREADS = 5
+_discovery_executor = None
+
+
+def _get_discovery_executor():
+    global _discovery_executor
+    if _discovery_executor is None:
+        _discovery_executor = ThreadPoolExecutor(
+            max_workers=DISCOVERY_THREADS, thread_name_prefix="discovery")
+    return _discovery_executor
+
 
 def _safe_input(prompt: str) -> str:
     """Wrapper for input() for testing suite."""
     return input(prompt)
 
 
+def with_track_id(song: dict, song_data) -> dict:
+    """Store the dataset's track id with a new liked song, when known."""
+    if song_data and song_data.get("track_id") is not None:
+        song["track_id"] = song_data["track_id"]
+    return song
+
+
+# ----------------------------------------------------------------------
+# Paged song lists
+# ----------------------------------------------------------------------
+PAGE_SIZE = max(1, int(os.environ.get("PLAYLIST_PAGE_SIZE", "20")))
+
+PAGE_HELP = "[N] Next page, [P] Previous page, [G #] Go to page"
+
+
+def _page_count(total: int, page_size: int = PAGE_SIZE) -> int:
+    return max(1, -(-total // page_size))
+
+
+def _render_page(songs, page: int, describe, page_size: int = PAGE_SIZE):
+    """
+    Write one page of `songs` in a single buffered write. Only the page's
+    slice is formatted; numbering stays global so song numbers don't
+    change between pages.
+    """
+    start = page * page_size
+    lines = [f"{i}. {describe(song)}"
+             for i, song in enumerate(songs[start:start + page_size],
+                                      start + 1)]
+    pages = _page_count(len(songs), page_size)
+    if pages > 1:
+        lines.append(f"-- Page {page + 1} of {pages} "
+                     f"({len(songs)} songs) | {PAGE_HELP} --")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _page_command(choice: str, page: int, total: int,
+                  page_size: int = PAGE_SIZE):
+    """
+    Return the new page index if `choice` is a paging command, else None.
+    """
+    pages = _page_count(total, page_size)
+    if choice == "N":
+        return min(page + 1, pages - 1)
+    if choice == "P":
+        return max(page - 1, 0)
+    parts = choice.split()
+    if len(parts) == 2 and parts[0] == "G" and parts[1].isdigit():
+        return min(max(int(parts[1]) - 1, 0), pages - 1)
+    return None
+
+
 # ----------------------------------------------------------------------
 # Recommendation Features/Screen For Sending To Microservice A
 # ----------------------------------------------------------------------
@@ -95,6 +176,27 @@ def get_recommendations_by_genre(genre: str):
     return response.get("recommendations", [])
 
 
+def get_popular_recommendations():
+    """Request the most popular songs overall."""
+    response = send_request({"type": "recommend_popular"})
+    return response.get("recommendations", [])
+
+
+def get_precomputed_recommendations(username: str):
+    """
+    The user's nightly precomputed {kind: songs} recommendations, or None
+    if there are none or the library changed since they were computed.
+    """
+    try:
+        response = send_request({"type": "recommend_for_user",
+                                 "username": username})
+    except Exception:
+        return None
+    if "error" in response or response.get("stale"):
+        return None
+    return response.get("recommendations")
+
+
 def recommendation_screen(username, liked_songs):
     """
     Main screen to show all 3 recommendation types for sending to the
@@ -119,6 +221,7 @@ def recommendation_screen(username, liked_songs):
 
         recs = get_recommendations_by_artist(artist)
     elif choice == "2":
+        genres = liked_songs.genres()
         if not genres:
             print("No genres available yet. Add songs first.\n")
             return
@@ -131,14 +234,13 @@ def recommendation_screen(username, liked_songs):
         genre_input = _safe_input("Enter a genre from the "
                                   "list above: ").strip()
 
-        if genre_input not in genres:
+        if not liked_songs.has_genre(genre_input):
             print("Genre not recognized or not in your playlist.\n")
             return
 
         recs = get_recommendations_by_genre(genre_input)
     elif choice == "3":
-        recs = send_request({"type": "recommend_popular"}).get(
-            "recommendations", [])
+        recs = get_popular_recommendations()
     else:
         print("Invalid input.\n")
         return
@@ -152,6 +254,14 @@ def recommendation_screen(username, liked_songs):
     for i, song in enumerate(recs, 1):
         print(f"{i}. {song['title']} - {song['artist']} ({song['genre']})")
 
+    add_selected_songs_screen(username, liked_songs, recs)
+
+
+def add_selected_songs_screen(username, liked_songs, recs):
+    """
+    Ask which of the listed `recs` to add (by number) and add them to the
+    user's liked songs, skipping any that are already liked.
+    """
     add_choice = _safe_input(
         "Add one or more songs to liked? Enter number(s) separated by "
         "commas or [N] to skip: ").strip().upper()
@@ -177,41 +287,138 @@ def recommendation_screen(username, liked_songs):
         print("No valid song selections made.\n")
         return
 
-    for idx in indices_to_add:
+    # Look up year/duration for every selected song in one dataset pass
+    selected_data = find_songs_data(
+        [(recs[idx]["title"], recs[idx]["artist"]) for idx in indices_to_add])
+
+    added = []
+
+    for idx, song_data in zip(indices_to_add, selected_data):
         song = recs[idx]
 
         # Prevent adding duplicates
-        already_liked = any(
-            s["title"].lower() == song["title"].lower() and
-            s["artist"].lower() == song["artist"].lower()
-            for s in liked_songs
-        )
-
-        if already_liked:
+        if liked_songs.contains(song["title"], song["artist"]):
             print(
                 f"'{song['title']}' by {song['artist']} is "
                 f"already in your liked songs. Skipping.\n")
             continue
 
-        song_data = find_song_data(song["title"], song["artist"])
         year = song_data["year"] if song_data and song_data.get(
             "year") else "Unknown"
         duration = song_data["duration"] if song_data and song_data.get(
             "duration") else "Unknown"
-        liked_songs.append({
+        new_song = with_track_id({
             "title": song["title"],
             "artist": song["artist"],
             "genre": song["genre"],
             "year": year,
             "date_added": datetime.now().strftime("%Y-%m-%d"),
             "duration": duration
-        })
+        }, song_data)
+        liked_songs.add(new_song)
+        added.append(new_song)
+
+    add_liked_songs_for_user(username, added)
+    print(f"{len(added)} song(s) added to your playlist.\n")
+
+
+def _discovery_seeds(liked_songs):
+    """Artist of the most recently added song and the top liked genre."""
+    artist = liked_songs[-1]["artist"] if liked_songs else None
+    genre_counts = liked_songs.genre_counts()
+    genre = max(genre_counts, key=genre_counts.get) if genre_counts else None
+    return artist, genre
+
+
+# Discovery source label per precomputed recommendation kind
+PRECOMPUTED_SOURCES = {"artist": "For you: artists",
+                       "genre": "For you: genres",
+                       "profile": "For you: your sound"}
+
+
+def fetch_discovery_results(liked_songs, username=None):
+    """
+    Request artist, genre, popular and random-song results concurrently.
+    Each request runs on its own pool thread (and so its own socket), so
+    the total wait is the slowest call rather than the sum of all of them.
+    The lookup of `username`'s precomputed recommendations runs
+    alongside them; if those are fresh they replace the live artist and
+    genre results.
+    Returns (songs, errors): the merged songs, de-duplicated against each
+    other and the user's liked songs, and a {source: message} dict of
+    requests that failed.
+    """
+    artist, genre = _discovery_seeds(liked_songs)
+
+    requests = {"Popular": get_popular_recommendations,
+                "Random": lambda: [song_prefetcher.get_random_song()]}
+    live = {}
+    if artist:
+        live[f"Artist: {artist}"] = (
+            lambda: get_recommendations_by_artist(artist))
+    if genre:
+        live[f"Genre: {genre}"] = (
+            lambda: get_recommendations_by_genre(genre))
+
+    executor = _get_discovery_executor()
+    pending = executor.submit(get_precomputed_recommendations, username) \
+        if username else None
+    futures = {source: executor.submit(fetch)
+               for source, fetch in {**requests, **live}.items()}
+    precomputed = pending.result() if pending else None
+
+    results, errors = {}, {}
+    if precomputed:
+        for kind, source in PRECOMPUTED_SOURCES.items():
+            results[source] = precomputed.get(kind) or []
+        # the live artist and genre results are not needed
+        futures = {source: future for source, future in futures.items()
+                   if source not in live}
+    sources = list(results) + list(futures)
+    for source, future in futures.items():
+        try:
+            results[source] = future.result()
+        except Exception as e:
+            errors[source] = str(e)
+
+    seen = liked_songs.keys()
+    merged = []
+    for source in sources:
+        for song in results.get(source) or []:
+            if not song or "title" not in song:
+                continue
+            key = song_key(song["title"], song["artist"])
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append({**song, "source": source})
+    return merged, errors
+
+
+def discovery_screen(username, liked_songs):
+    """
+    Show artist, genre, popular and random picks side by side, fetched
+    in parallel, and let the user add any of them.
+    """
+    print("\n=== Discover Songs ===")
+    print("Fetching recommendations...")
+
+    recs, errors = fetch_discovery_results(liked_songs, username)
+
+    for source, message in errors.items():
+        print(f"{source} recommendations unavailable: {message}")
+
+    if not recs:
+        print("No new songs to discover right now.\n")
+        return
 
-        if song["genre"] not in genres and song["genre"] != "Unknown":
-            genres.append(song["genre"])
+    print("\nDiscovered Songs:")
+
+    for i, song in enumerate(recs, 1):
+        print(f"{i}. {song['title']} - {song['artist']} "
+              f"({song.get('genre', 'Unknown')}) [{song['source']}]")
 
-    save_liked_songs_for_user(username, liked_songs)
-    print(f"{len(indices_to_add)} song(s) added to your playlist.\n")
+    add_selected_songs_screen(username, liked_songs, recs)
 
 
 # ----------------------------------------------------------------------
@@ -270,8 +477,7 @@ def register_screen():
             print("Password too short.\n")
             continue
 
-        users[username] = password
-        save_users(users)
+        register_user(username, password)
 
         print(f"Account '{username}' registered successfully! "
               f"You can now log in.\n")
@@ -316,7 +522,8 @@ def home_screen(username):
     Home menu after login. User can choose from a list of navigation
     options or quit the program.
     """
-    liked_songs = load_liked_songs_for_user(username)
+    liked_songs = LikedSongs(load_liked_songs_for_user(username))
+    song_prefetcher.start()
 
     while True:
         print("=== Home Menu ===")
@@ -329,7 +536,10 @@ def home_screen(username):
         print("[6] Add a Random Song")
         print("[7] Add Song by Year")
         print("[8] Show Total Playlist Duration")
-        print("[9] Logout")
+        print("[9] Discover Songs (All Recommendation Types)")
+        print("[10] Import Songs from File")
+        print("[11] Export Songs to File")
+        print("[12] Logout")
 
         print("[Q] Quit Program\n")
 
@@ -351,6 +561,12 @@ def home_screen(username):
         elif choice == "8":
             total_duration_screen(username)
         elif choice == "9":
+            discovery_screen(username, liked_songs)
+        elif choice == "10":
+            import_songs_screen(username, liked_songs)
+        elif choice == "11":
+            export_songs_screen(username)
+        elif choice == "12":
             if confirm_logout_screen():
                 return
         elif choice == "Q":
@@ -396,7 +612,10 @@ def confirm_add_song_screen(title, artist, username, liked_songs):
     data from our dataset to fill in genre, release year, and duration
     in milliseconds.
     """
-    global genres
+    if liked_songs.contains(title, artist):
+        print(f"'{title}' by {artist} is already in your liked songs.\n")
+        return
+
     song_data = find_song_data(title, artist)
 
     year = song_data["year"] if song_data and song_data.get(
@@ -421,20 +640,16 @@ def confirm_add_song_screen(title, artist, username, liked_songs):
                              "[R] = Reenter info): ").strip().upper()
 
         if choice == "Y":
-            liked_songs.append({
+            new_song = with_track_id({
                 "title": title,
                 "artist": artist,
                 "genre": genre,
                 "year": year,
                 "date_added": datetime.now().strftime("%Y-%m-%d"),
                 "duration": duration,
-            })
-
-            # Add genre if not already in list
-            if genre not in genres and genre != "Unknown":
-                genres.append(genre)
-
-            save_liked_songs_for_user(username, liked_songs)
+            }, song_data)
+            liked_songs.add(new_song)
+            add_liked_songs_for_user(username, [new_song])
             print(f"'{title}' added to your liked songs.\n")
             return
         elif choice == "N":
@@ -454,7 +669,12 @@ def add_random_song_screen(username, liked_songs):
     """
     print("\n=== Add a Random Song ===")
 
-    song = request_random_song()
+    try:
+        song = song_prefetcher.get_random_song()
+    except TimeoutError as e:
+        print(f"Random song service timed out: {e}\n")
+        return
+
     if not song:
         print("Could not retrieve a random song.\n")
         return
@@ -474,29 +694,20 @@ def add_random_song_screen(username, liked_songs):
         return
 
     # Prevent duplicates
-    already_liked = any(
-        s["title"].lower() == song["title"].lower() and
-        s["artist"].lower() == song["artist"].lower()
-        for s in liked_songs
-    )
-
-    if already_liked:
+    if liked_songs.contains(song["title"], song["artist"]):
         print("This song is already in your playlist. Skipping.\n")
         return
 
-    liked_songs.append({
+    new_song = with_track_id({
         "title": song["title"],
         "artist": song["artist"],
         "genre": song["genre"],
         "year": song.get("year", "Unknown"),
         "date_added": datetime.now().strftime("%Y-%m-%d"),
         "duration": song.get("duration", "Unknown")
-    })
-
-    if song["genre"] not in genres and song["genre"] != "Unknown":
-        genres.append(song["genre"])
-
-    save_liked_songs_for_user(username, liked_songs)
+    }, find_song_data(song["title"], song["artist"]))
+    liked_songs.add(new_song)
+    add_liked_songs_for_user(username, [new_song])
     print(f"'{song['title']}' added to your liked songs!\n")
 
 
@@ -519,7 +730,7 @@ def add_song_by_year_screen(username, liked_songs):
         return
 
     try:
-        response = send_year_request(year)
+        response = song_prefetcher.get_song_by_year(year)
         songs = response.get("songs", [])
     except TimeoutError as e:
         print(f"Year song service timed out: {e}\n")
@@ -532,9 +743,7 @@ def add_song_by_year_screen(username, liked_songs):
     song = songs[0]
 
     # Prevent duplicates
-    if any(s["title"].lower() == song["title"].lower()
-           and s["artist"].lower() == song["artist"].lower()
-           for s in liked_songs):
+    if liked_songs.contains(song["title"], song["artist"]):
         print(f"'{song['title']}' by {song['artist']} "
               f"is already in liked songs.\n")
         return
@@ -551,23 +760,84 @@ def add_song_by_year_screen(username, liked_songs):
                       else (song_data.get("genre")
                             if song_data else "Unknown"))
 
-    liked_songs.append({
+    new_song = with_track_id({
         "title": song["title"],
         "artist": song["artist"],
         "genre": genre_resolved,
         "year": year_resolved,
         "date_added": datetime.now().strftime("%Y-%m-%d"),
         "duration": duration_resolved,
-    })
-
-    if genre_resolved not in genres and genre_resolved != "Unknown":
-        genres.append(genre_resolved)
-
-    save_liked_songs_for_user(username, liked_songs)
+    }, song_data)
+    liked_songs.add(new_song)
+    add_liked_songs_for_user(username, [new_song])
     print(f"Added song from {year}: {song['title']} - "
           f"{song['artist']} ({genre_resolved})\n")
 
 
+def import_songs_screen(username, liked_songs):
+    """
+    Import a CSV, JSON or M3U list of songs. Every row is matched against
+    the dataset at once and the new songs are saved in a single write.
+    """
+    print("\n=== Import Songs from File ===")
+    print("Supported: .csv (title, artist columns), .json, .jsonl, "
+          ".m3u/.m3u8 ('Artist - Title' entries)")
+    path = _safe_input("Enter file path (or [B] Back): ").strip()
+
+    if path.upper() == "B" or not path:
+        return
+
+    path = os.path.expanduser(path.strip("\"'"))
+    try:
+        result = import_file(path, liked_songs,
+                             lambda songs: add_liked_songs_for_user(
+                                 username, songs))
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}\n")
+        return
+
+    seconds = result["seconds"]
+    rate = result["read"] / seconds if seconds > 0 else 0
+    print(f"\nRead {result['read']} row(s) in {seconds:.2f}s "
+          f"({rate:,.0f} rows/s).")
+    print(f"Added: {len(result['added'])}  "
+          f"Already liked: {result['duplicates']}  "
+          f"Not found in dataset: {len(result['unmatched'])}")
+
+    unmatched = result["unmatched"]
+    for title, artist in unmatched[:10]:
+        print(f"  not found: {title} - {artist}")
+    if len(unmatched) > 10:
+        print(f"  ...and {len(unmatched) - 10} more")
+    print()
+
+
+def export_songs_screen(username):
+    """
+    Export the user's liked songs to CSV, JSONL or M3U, optionally only
+    one genre or year. Songs are streamed from storage to the file.
+    """
+    print("\n=== Export Songs to File ===")
+    path = _safe_input("Enter output path ending in .csv, .jsonl or .m3u "
+                       "(or [B] Back): ").strip()
+
+    if path.upper() == "B" or not path:
+        return
+
+    genre = _safe_input("Only this genre (Enter for all): ").strip() or None
+    year = _safe_input("Only this year (Enter for all): ").strip() or None
+
+    path = os.path.expanduser(path.strip("\"'"))
+    try:
+        count = export_songs(liked_store.iter_songs(username), path,
+                             genre=genre, year=year)
+    except (OSError, ValueError) as e:
+        print(f"Export failed: {e}\n")
+        return
+
+    print(f"Exported {count} song(s) to {path}.\n")
+
+
 def total_duration_screen(username):
     """
     Get the total duration of the user's playlist by requesting it
@@ -601,8 +871,10 @@ def view_playlist_by_genre_screen(liked_songs):
         print("\n=== View Playlist by Genre ===")
         print("Tip: Enter the number of the genre to see its songs, "
               "or [B] to return to Home.\n")
+        genre_counts = liked_songs.genre_counts()
+        genres = list(genre_counts)
         for i, g in enumerate(genres, 1):
-            print(f"{i}. {g}")
+            print(f"{i}. {g} ({genre_counts[g]})")
         genre_choice = _safe_input("Select genre number "
                                    "(or [B] Back): ").strip().upper()
         if genre_choice == "B":
@@ -618,10 +890,12 @@ def view_playlist_by_genre_screen(liked_songs):
 
 
 def display_genre_playlist_screen(genre, liked_songs):
-    """Display songs for a specific genre."""
+    """Display songs for a specific genre, one page at a time."""
+    songs = liked_songs.by_genre(genre)
+    page = 0
+
     while True:
         print(f"\n=== {genre} Playlist ===")
-        songs = [s for s in liked_songs if s["genre"] == genre]
 
         if not songs:
             print(f"No songs in {genre} playlist.")
@@ -633,8 +907,8 @@ def display_genre_playlist_screen(genre, liked_songs):
                 print("Invalid input.\n")
                 continue
 
-        for i, song in enumerate(songs, 1):
-            print(f"{i}. {song['title']} - {song['artist']} [I] for info")
+        _render_page(songs, page,
+                     lambda s: f"{s['title']} - {s['artist']} [I] for info")
 
         choice = _safe_input("Select song number + I (e.g., '1 I'), "
                              "or [B] Back: ").strip().upper()
@@ -642,6 +916,11 @@ def display_genre_playlist_screen(genre, liked_songs):
         if choice == "B":
             return
 
+        new_page = _page_command(choice, page, len(songs))
+        if new_page is not None:
+            page = new_page
+            continue
+
         if choice:
             parts = choice.split()
 
@@ -656,26 +935,34 @@ def display_genre_playlist_screen(genre, liked_songs):
                 print("Invalid input.\n")
 
 
+def _parse_lookup_query(query):
+    """Split 'artist: name' / 'genre: name' prefixes; default is title."""
+    field, sep, rest = query.partition(":")
+    if sep and field.strip().lower() in ("title", "artist", "genre"):
+        return field.strip().lower(), rest.strip()
+    return "title", query
+
+
 def song_lookup_screen(liked_songs):
-    """Allow user to search for songs info by title."""
+    """
+    Allow user to search for songs info by title, or by artist or genre
+    with an 'artist:' / 'genre:' prefix.
+    """
     while True:
         print("\n=== Song Lookup ===")
+        print("Tip: prefix with 'artist:' or 'genre:' to search those.")
         query = _safe_input("Enter song title to search "
                             "(or [B] Back): ").strip()
 
         if query.upper() == "B":
             return
 
-        if not query:
+        field, text = _parse_lookup_query(query)
+        if not text:
             print("Please enter a song title or [B] to go back.\n")
             continue
 
-        q_lower = query.lower()
-        matches = [
-            song
-            for song in liked_songs
-            if q_lower in song["title"].lower()
-        ]
+        matches = liked_songs.search(text, field)
 
         if not matches:
             print(f"No songs found matching '{query}'.")
@@ -718,7 +1005,12 @@ def song_lookup_screen(liked_songs):
 
 
 def delete_song_screen(username, liked_songs):
-    """List all liked songs and let the user choose one to delete."""
+    """
+    List liked songs a page at a time and let the user choose one to
+    delete.
+    """
+    page = 0
+
     while True:
         print("\n=== Delete a Song ===")
         if not liked_songs:
@@ -731,8 +1023,9 @@ def delete_song_screen(username, liked_songs):
                 print("Invalid input.\n")
                 continue
 
-        for i, song in enumerate(liked_songs, 1):
-            print(f"{i}. {song['title']} - {song['artist']} ({song['genre']})")
+        page = min(page, _page_count(len(liked_songs)) - 1)
+        _render_page(liked_songs, page,
+                     lambda s: f"{s['title']} - {s['artist']} ({s['genre']})")
 
         choice = _safe_input("Select song number to delete, "
                              "or [B] Back: ").strip().upper()
@@ -740,6 +1033,11 @@ def delete_song_screen(username, liked_songs):
         if choice == "B":
             return
 
+        new_page = _page_command(choice, page, len(liked_songs))
+        if new_page is not None:
+            page = new_page
+            continue
+
         if choice.isdigit():
             idx = int(choice) - 1
 
@@ -752,7 +1050,7 @@ def delete_song_screen(username, liked_songs):
             print("Invalid input.\n")
 
 
-def confirm_delete_song_screen(song_index: int, liked_songs: list,
+def confirm_delete_song_screen(song_index: int, liked_songs: LikedSongs,
                                username: str):
     """Confirm deletion of a song and warn about the cost."""
     if not (0 <= song_index < len(liked_songs)):
@@ -779,7 +1077,7 @@ def confirm_delete_song_screen(song_index: int, liked_songs: list,
 
         if choice == "Y":
             removed = liked_songs.pop(song_index)
-            save_liked_songs_for_user(username, liked_songs)
+            delete_liked_song_for_user(username, removed)
             print(
                 f"'{removed['title']}' was deleted from your music "
                 f"collection.\n")
@@ -846,7 +1144,16 @@ def confirm_quit_screen():
 # Main Entry Point
 # ----------------------------------------------------------------------
 
-def main():
+def main(argv=None):
+    """
+    Run the interactive menu, or with command line arguments run batch
+    operations and exit (see batch_cli).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from main_program.batch_cli import run_batch
+        sys.exit(run_batch(argv, sys.modules[__name__]))
+
     while True:
         username = welcome_screen()
         home_screen(username)
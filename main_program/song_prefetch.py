@@ -0,0 +1,139 @@
+"""
+Background prefetch buffers for the random song and song-by-year screens.
+
+Songs are fetched ahead of time on a single long-lived daemon thread so
+the screens can render from memory. When a buffer drops to the refill
+threshold its key is queued and the worker tops it back up to its depth;
+if a buffer is empty the caller falls back to a normal synchronous
+request. Keeping one worker means the service clients it opens (one per
+endpoint, see microservices.common.client) are reused for the whole
+session instead of being opened again by every refill.
+
+Buffer sizes can be tuned with environment variables:
+    PREFETCH_DEPTH        random songs kept ready (0 disables prefetch)
+    PREFETCH_REFILL_AT    refill once this many or fewer are left
+    PREFETCH_YEAR_DEPTH   songs kept ready per requested year
+"""
+import os
+import queue
+import threading
+from collections import deque
+
+DEFAULT_DEPTH = int(os.environ.get("PREFETCH_DEPTH", "5"))
+DEFAULT_REFILL_AT = int(os.environ.get("PREFETCH_REFILL_AT", "2"))
+DEFAULT_YEAR_DEPTH = int(os.environ.get("PREFETCH_YEAR_DEPTH", "2"))
+
+RANDOM_KEY = "random"
+
+
+class SongPrefetcher:
+    """
+    Keeps a queue of random songs and one small bucket per year.
+
+    `fetch_random()` must return a song dict (empty if none) and
+    `fetch_by_year(year)` a response dict with a "songs" list, i.e. the
+    same shapes as the microservice client functions.
+    """
+
+    def __init__(self, fetch_random, fetch_by_year, depth=DEFAULT_DEPTH,
+                 refill_at=DEFAULT_REFILL_AT, year_depth=DEFAULT_YEAR_DEPTH):
+        self.fetch_random = fetch_random
+        self.fetch_by_year = fetch_by_year
+        self.depth = depth
+        self.refill_at = min(refill_at, max(depth - 1, 0))
+        self.year_depth = year_depth
+        self._buffers = {RANDOM_KEY: deque()}
+        self._refilling = set()
+        self._lock = threading.Lock()
+        # Keys waiting for the refill worker, which starts on first use
+        self._pending = queue.Queue()
+        self._worker = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def start(self):
+        """Begin filling the random song queue in the background."""
+        if self.depth > 0:
+            self._schedule_refill(RANDOM_KEY)
+
+    def get_random_song(self) -> dict:
+        """Return a prefetched random song, or fetch one synchronously."""
+        song = self._pop(RANDOM_KEY)
+        if song is None:
+            song = self.fetch_random()
+        if self.depth > 0:
+            self._maybe_refill(RANDOM_KEY, self.depth)
+        return song
+
+    def get_song_by_year(self, year: int) -> dict:
+        """
+        Return {"songs": [song]} for `year` from its bucket, or the
+        service's own response if the bucket is empty.
+        """
+        song = self._pop(year)
+        if song is not None:
+            response = {"songs": [song]}
+        else:
+            response = self.fetch_by_year(year)
+        if self.year_depth > 0:
+            self._maybe_refill(year, self.year_depth)
+        return response
+
+    def buffered(self, key=RANDOM_KEY) -> int:
+        """Number of songs currently buffered for `key`."""
+        with self._lock:
+            return len(self._buffers.get(key, ()))
+
+    # ------------------------------------------------------------------
+    # Buffer management
+    # ------------------------------------------------------------------
+    def _pop(self, key):
+        with self._lock:
+            buffer = self._buffers.get(key)
+            return buffer.popleft() if buffer else None
+
+    def _maybe_refill(self, key, depth):
+        with self._lock:
+            remaining = len(self._buffers.setdefault(key, deque()))
+        # Year buckets are small, so keep them topped up
+        threshold = self.refill_at if key == RANDOM_KEY else depth - 1
+        if remaining <= threshold and remaining < depth:
+            self._schedule_refill(key)
+
+    def _schedule_refill(self, key):
+        with self._lock:
+            if key in self._refilling:
+                return
+            self._refilling.add(key)
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="prefetch", daemon=True)
+                self._worker.start()
+        self._pending.put(key)
+
+    def _run(self):
+        while True:
+            self._refill(self._pending.get())
+
+    def _fetch_one(self, key):
+        if key == RANDOM_KEY:
+            return self.fetch_random() or None
+        songs = self.fetch_by_year(key).get("songs", [])
+        return songs[0] if songs else None
+
+    def _refill(self, key):
+        depth = self.depth if key == RANDOM_KEY else self.year_depth
+        try:
+            while self.buffered(key) < depth:
+                song = self._fetch_one(key)
+                if song is None:
+                    break
+                with self._lock:
+                    self._buffers.setdefault(key, deque()).append(song)
+        except Exception:
+            # Prefetch is best effort; the next caller fetches directly
+            pass
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
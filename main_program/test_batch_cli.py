@@ -0,0 +1,82 @@
+import io
+import json
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import playlist_manager
+from main_program.batch_cli import run_batch
+
+
+def _run(argv, stdin=""):
+    out = io.StringIO()
+    code = run_batch(argv, playlist_manager, stdin=io.StringIO(stdin),
+                     stdout=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+@patch("playlist_manager.find_song_data", return_value={
+    "genre": "Pop", "year": 2020, "duration": "1000 ms"})
+def test_add_from_args_and_stdin_then_list(mock_find, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    code, results = _run(["--user", "u", "add", "Song", "Band"])
+    assert code == 0
+    assert results[0]["added"] and results[0]["song"]["genre"] == "Pop"
+
+    code, results = _run(["--user", "u", "add"],
+                         '{"title": "Other", "artist": "Band"}\n'
+                         '{"title": "song", "artist": "band"}\n')
+    assert [r["added"] for r in results] == [True, False]
+
+    code, results = _run(["--user", "u", "list", "--genre", "pop"])
+    assert results[0]["count"] == 2
+
+
+def test_ops_file_reports_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    playlist_manager.save_liked_songs_for_user("u", [
+        {"title": "Hello", "artist": "A", "genre": "Pop"}])
+    ops = tmp_path / "ops.jsonl"
+    ops.write_text(
+        '{"op": "lookup", "query": "ell"}\n'
+        '{"op": "delete", "title": "HELLO", "artist": "a"}\n'
+        '{"op": "lookup"}\n'
+        '{"op": "bogus"}\n')
+
+    code, results = _run(["--user", "u", "--ops", str(ops)])
+
+    assert code == 1
+    assert results[0]["count"] == 1
+    assert results[1]["deleted"] is True
+    assert [r["ok"] for r in results] == [True, True, False, False]
+    assert playlist_manager.load_liked_songs_for_user("u") == []
+
+
+def test_non_object_lines_fail_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ops = tmp_path / "ops.jsonl"
+    ops.write_text('[1]\n"x"\n3\n{"op": "list"}\n')
+
+    code, results = _run(["--user", "u", "--ops", str(ops)])
+    assert code == 1
+    assert [r["ok"] for r in results] == [False, False, False, True]
+    assert "JSON object" in results[0]["error"]
+
+    code, results = _run(["--user", "u", "add"], '["Song", "Band"]\n')
+    assert [r["ok"] for r in results] == [False]
+
+
+def test_invalid_json_line_fails_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ops = tmp_path / "ops.jsonl"
+    ops.write_text('{"op": "list"}\n{"op": "list"\n\n{"op": "list"}\n')
+
+    code, results = _run(["--user", "u", "--ops", str(ops)])
+    assert code == 1
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert "Line 2 is not valid JSON" in results[1]["error"]
+
+    code, results = _run(["--user", "u", "lookup"],
+                         'nope\n{"query": "x"}\n')
+    assert [r["ok"] for r in results] == [False, True]
@@ -0,0 +1,58 @@
+from main_program.library import LikedSongs, SongRecord
+
+
+def _song(title, artist="Artist", genre="Pop"):
+    return {"title": title, "artist": artist, "genre": genre}
+
+
+def test_add_rejects_case_insensitive_duplicates():
+    songs = LikedSongs([_song("Song")])
+    assert songs.add(_song("SONG", "artist")) is None
+    assert songs.contains("song", "ARTIST")
+    assert len(songs) == 1
+
+
+def test_genre_index_follows_adds_and_deletes():
+    songs = LikedSongs([_song("A", genre="Rock"), _song("B"),
+                        _song("C", genre="Rock")])
+    assert [s["title"] for s in songs.by_genre("Rock")] == ["A", "C"]
+
+    songs.pop(0)
+    songs.remove("b", "artist")
+    assert [s["title"] for s in songs.by_genre("Rock")] == ["C"]
+    assert songs.genre_counts() == {"Rock": 1}
+    assert not songs.contains("A", "Artist")
+
+
+def test_song_record_behaves_like_a_dict():
+    record = SongRecord({"title": "T", "artist": "A", "album": "X"})
+    assert record["album"] == "X"
+    assert record.get("year", "Unknown") == "Unknown"
+    assert "year" not in record
+    assert record.to_dict() == {"title": "T", "artist": "A", "album": "X"}
+
+
+def test_genres_rebuilt_from_loaded_library():
+    songs = LikedSongs([_song("A", genre="Rock"), _song("B", genre="Unknown"),
+                        _song("C"), _song("D", genre="Rock")])
+    assert songs.genres() == ["Rock", "Pop"]
+    assert songs.genre_counts() == {"Rock": 2, "Pop": 1}
+    assert not songs.has_genre("Unknown")
+
+    songs.remove("C", "Artist")
+    assert songs.genres() == ["Rock"]
+
+
+def test_search_matches_substrings_and_tracks_deletes():
+    songs = LikedSongs([_song("Hello World", "Adele"), _song("Yellow"),
+                        _song("Hell", "Band", genre="Metal")])
+    assert [s["title"] for s in songs.search("ELLO")] == ["Hello World",
+                                                         "Yellow"]
+    assert [s["title"] for s in songs.search("he")] == ["Hello World", "Hell"]
+    assert [s["title"] for s in songs.search("ade", "artist")] == \
+        ["Hello World"]
+    assert [s["title"] for s in songs.search("met", "genre")] == ["Hell"]
+
+    songs.remove("Yellow", "Artist")
+    songs.add(_song("Mellow"))
+    assert [s["title"] for s in songs.search("ellow")] == ["Mellow"]
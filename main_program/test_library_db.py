@@ -0,0 +1,59 @@
+import json
+
+from main_program import library_db, liked_songs_store
+from main_program.library import LikedSongs
+
+
+def _song(title, artist="Artist", genre="Pop", duration="200000 ms"):
+    return {"title": title, "artist": artist, "genre": genre,
+            "date_added": "2024-01-01", "duration": duration}
+
+
+def test_add_delete_and_case_insensitive_duplicates(tmp_path):
+    db = str(tmp_path / "lib.db")
+    library_db.append_added_songs("u", [_song("A"), _song("B")], db)
+    library_db.append_added_songs("u", [_song("a", "ARTIST")], db)
+    library_db.append_deleted_song("u", _song("b", "artist"), db)
+
+    assert [s["title"] for s in library_db.load_liked_songs("u", db)] == ["A"]
+    assert library_db.load_liked_songs("other", db) == []
+
+
+def test_keys_agree_with_the_json_store_and_the_cli(tmp_path):
+    songs = [_song("Straße"), _song("STRASSE", "artist")]
+    db = str(tmp_path / "lib.db")
+    library_db.append_added_songs("u", songs, db)
+    liked_songs_store.append_added_songs("u", songs, str(tmp_path))
+
+    assert len(library_db.load_liked_songs("u", db)) == 1
+    assert len(liked_songs_store.load_liked_songs("u", str(tmp_path))) == 1
+    assert len(LikedSongs(songs)) == 1
+
+
+def test_duration_total(tmp_path):
+    db = str(tmp_path / "lib.db")
+    library_db.write_snapshot("u", [
+        _song("One", genre="Rock", duration="3:30"),
+        _song("Two", genre="Pop"),
+        _song("Three", genre="Rock", duration="Unknown"),
+    ], db)
+
+    assert library_db.has_user_library("u", db)
+    assert library_db.total_duration("u", db) == {
+        "total_seconds": 410, "count_songs": 2, "skipped": 1}
+
+
+def test_migrate_from_json(tmp_path):
+    liked_dir = str(tmp_path / "liked_songs")
+    users_file = tmp_path / "users.json"
+    users_file.write_text(json.dumps({"u": "secret"}))
+    liked_songs_store.write_snapshot("u", [_song("A")], liked_dir)
+    liked_songs_store.append_added_songs("u", [_song("B")], liked_dir)
+    db = str(tmp_path / "lib.db")
+
+    summary = library_db.migrate_from_json(liked_dir, str(users_file), db)
+
+    assert summary == {"users": 1, "libraries": 1, "songs": 2}
+    assert library_db.load_users(db) == {"u": "secret"}
+    assert [s["title"] for s in library_db.load_liked_songs("u", db)] \
+        == ["A", "B"]
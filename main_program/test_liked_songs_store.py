@@ -0,0 +1,66 @@
+import json
+
+from main_program import liked_songs_store as store
+
+
+def _song(title, artist="Artist"):
+    return {"title": title, "artist": artist, "genre": "Pop"}
+
+
+def test_add_writes_one_small_journal_line(tmp_path):
+    library = [_song(f"Song{i}") for i in range(2000)]
+    store.write_snapshot("u", library, str(tmp_path))
+
+    store.append_added_songs("u", [_song("New")], str(tmp_path))
+
+    journal = tmp_path / "u.journal"
+    assert journal.stat().st_size < 300
+    assert store.load_liked_songs("u", str(tmp_path))[-1]["title"] == "New"
+
+
+def test_replay_applies_adds_and_deletes_in_order(tmp_path):
+    d = str(tmp_path)
+    store.append_added_songs("u", [_song("A"), _song("B")], d)
+    store.append_deleted_song("u", _song("a", "ARTIST"), d)
+    store.append_added_songs("u", [_song("C")], d)
+
+    titles = [s["title"] for s in store.load_liked_songs("u", d)]
+    assert titles == ["B", "C"]
+
+
+def test_torn_last_line_is_ignored_and_next_append_survives(tmp_path):
+    d = str(tmp_path)
+    store.append_added_songs("u", [_song("A")], d)
+    with open(tmp_path / "u.journal", "a") as f:
+        f.write('{"op": "add", "song": {"tit')  # crash mid-write
+
+    assert [s["title"] for s in store.load_liked_songs("u", d)] == ["A"]
+
+    store.append_added_songs("u", [_song("B")], d)
+    assert [s["title"] for s in store.load_liked_songs("u", d)] == ["A", "B"]
+
+
+def test_replaying_journal_over_compacted_snapshot_is_idempotent(tmp_path):
+    d = str(tmp_path)
+    store.write_snapshot("u", [_song("A"), _song("B")], d)
+    store.append_deleted_song("u", _song("A"), d)
+    store.append_added_songs("u", [_song("C")], d)
+    journal = (tmp_path / "u.journal").read_text()
+
+    # Compact, then simulate a crash before the journal was removed
+    store.write_snapshot("u", store.load_liked_songs("u", d), d)
+    (tmp_path / "u.journal").write_text(journal)
+
+    titles = [s["title"] for s in store.load_liked_songs("u", d)]
+    assert titles == ["B", "C"]
+
+
+def test_journal_is_compacted_after_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "COMPACT_EVERY", 3)
+    d = str(tmp_path)
+    for title in ("A", "B", "C"):
+        store.append_added_songs("u", [_song(title)], d)
+
+    assert not (tmp_path / "u.journal").exists()
+    snapshot = json.loads((tmp_path / "u.json").read_text())
+    assert [s["title"] for s in snapshot] == ["A", "B", "C"]
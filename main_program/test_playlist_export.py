@@ -0,0 +1,47 @@
+import csv
+import json
+
+from main_program import liked_songs_store as store
+from main_program.playlist_export import export_songs
+from main_program.playlist_import import read_import_file
+
+
+def _song(title, genre="Pop", year=2020):
+    return {"title": title, "artist": "Band", "genre": genre, "year": year,
+            "date_added": "2024-01-01", "duration": "200000 ms"}
+
+
+def test_iter_songs_matches_load_with_journal(tmp_path):
+    d = str(tmp_path)
+    store.write_snapshot("u", [_song("A"), _song("B"), _song("C")], d)
+    store.append_deleted_song("u", _song("a"), d)
+    store.append_added_songs("u", [_song("D"), _song("b")], d)
+    store.append_deleted_song("u", _song("C"), d)
+    store.append_added_songs("u", [_song("c"), _song("A")], d)
+
+    streamed = list(store.iter_songs("u", d))
+    assert streamed == store.load_liked_songs("u", d, compact=False)
+    assert [s["title"] for s in streamed] == ["B", "D", "c", "A"]
+
+
+def test_iter_songs_reads_indented_snapshot(tmp_path):
+    (tmp_path / "u.json").write_text(json.dumps([_song("A")], indent=2))
+    assert list(store.iter_songs("u", str(tmp_path))) == [_song("A")]
+
+
+def test_export_formats_and_filters(tmp_path):
+    songs = [_song("A"), _song("B", genre="Rock"), _song("C", year=2001)]
+
+    csv_path = str(tmp_path / "out.csv")
+    assert export_songs(iter(songs), csv_path, genre="pop", year=2020) == 1
+    with open(csv_path, newline="") as f:
+        assert [row["title"] for row in csv.DictReader(f)] == ["A"]
+
+    jsonl_path = tmp_path / "out.jsonl"
+    assert export_songs(iter(songs), str(jsonl_path)) == 3
+    assert json.loads(jsonl_path.read_text().splitlines()[1]) == songs[1]
+
+    m3u_path = str(tmp_path / "out.m3u")
+    export_songs(iter(songs), m3u_path)
+    assert read_import_file(m3u_path).values.tolist() == [
+        ["A", "Band"], ["B", "Band"], ["C", "Band"]]
@@ -0,0 +1,63 @@
+import json
+
+import pandas as pd
+import pytest
+
+from dataset_service import song_service
+from main_program.library import LikedSongs
+from main_program.playlist_import import import_file, read_import_file
+
+
+@pytest.fixture(autouse=True)
+def fake_dataset(monkeypatch):
+    monkeypatch.setattr(song_service, "df", pd.DataFrame({
+        "track_name": ["Song A", "Song B", "Song A"],
+        "artist_name": ["Band", "Solo", "Band"],
+        "genre": ["rock", "pop", "jazz"],
+        "year": [2001, 2002, 2003],
+        "duration_ms": [1000, 2000, 3000],
+    }))
+    monkeypatch.setattr(song_service, "_track_table", None)
+
+
+def test_csv_import_enriches_dedupes_and_persists_once(tmp_path):
+    path = tmp_path / "songs.csv"
+    path.write_text("Title,Artist\n"
+                    "song a,BAND\n"
+                    "Song B,Solo\n"
+                    "Song A,Band\n"
+                    "Missing,Nobody\n")
+    liked = LikedSongs([{"title": "Song B", "artist": "Solo",
+                         "genre": "pop"}])
+    calls = []
+
+    result = import_file(str(path), liked, calls.append)
+
+    assert result["read"] == 4
+    assert result["duplicates"] == 2
+    assert result["unmatched"] == [("Missing", "Nobody")]
+    assert len(calls) == 1
+    assert calls[0] == result["added"]
+    assert result["added"][0]["genre"] == "rock"
+    assert result["added"][0]["year"] == 2001
+    assert result["added"][0]["duration"] == "1000 ms"
+    assert len(liked) == 2
+
+
+def test_readers_for_json_and_m3u(tmp_path):
+    json_path = tmp_path / "songs.json"
+    json_path.write_text(json.dumps({"songs": [
+        {"title": "Song A", "artist": "Band", "genre": "ignored"}]}))
+    m3u_path = tmp_path / "songs.m3u"
+    m3u_path.write_text("#EXTM3U\n#EXTINF:123,Solo - Song B\nsong_b.mp3\n"
+                        "Band - Song A\n")
+
+    assert read_import_file(str(json_path)).values.tolist() == [
+        ["Song A", "Band"]]
+    assert read_import_file(str(m3u_path)).values.tolist() == [
+        ["Song B", "Solo"], ["Song A", "Band"]]
+
+
+def test_unsupported_extension(tmp_path):
+    with pytest.raises(ValueError):
+        read_import_file(str(tmp_path / "songs.txt"))
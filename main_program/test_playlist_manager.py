@@ -1,5 +1,6 @@
 import sys
 import os
+import threading
 import pytest
 from unittest.mock import patch, mock_open
 
@@ -10,6 +11,7 @@ from microservices.random_song_service.zeroMQClient import request_random_song
 # Add root to path so playlist_manager can be imported
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import playlist_manager
+from main_program.library import LikedSongs
 
 # ---------------- File operations ----------------
 
@@ -22,17 +24,33 @@ def test_load_liked_songs(mock_file, mock_exists):
     assert songs[0]["title"] == "Song1"
 
 
-@patch("builtins.open", new_callable=mock_open)
-def test_save_liked_songs(mock_file):
+def test_save_liked_songs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     test_data = [{"title": "SongX", "artist": "ArtistX", "genre": "Rock"}]
     playlist_manager.save_liked_songs_for_user("user1", test_data)
-    mock_file().write.assert_called()
+    assert (tmp_path / "liked_songs" / "user1.json").exists()
+    assert playlist_manager.load_liked_songs_for_user("user1") == test_data
+
+
+def test_add_and_delete_are_journaled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    song_a = {"title": "A", "artist": "X", "genre": "Rock"}
+    song_b = {"title": "B", "artist": "Y", "genre": "Pop"}
+    playlist_manager.save_liked_songs_for_user("user1", [song_a])
+    snapshot = (tmp_path / "liked_songs" / "user1.json").read_text()
+
+    playlist_manager.add_liked_songs_for_user("user1", [song_b])
+    playlist_manager.delete_liked_song_for_user("user1", song_a)
+
+    # The snapshot is untouched; edits only append to the journal
+    assert (tmp_path / "liked_songs" / "user1.json").read_text() == snapshot
+    assert playlist_manager.load_liked_songs_for_user("user1") == [song_b]
 
 # ---------------- Song add/delete/lookup ----------------
 
 @patch("playlist_manager._safe_input")
 @patch("playlist_manager.find_song_data")
-@patch("playlist_manager.save_liked_songs_for_user")
+@patch("playlist_manager.add_liked_songs_for_user")
 @patch("playlist_manager.load_liked_songs_for_user")
 def test_add_song_and_confirm(mock_load, mock_save, mock_find_song, mock_input):
     username = "user1"
@@ -42,7 +60,7 @@ def test_add_song_and_confirm(mock_load, mock_save, mock_find_song, mock_input):
     }
     mock_load.return_value = []
 
-    liked_songs = []
+    liked_songs = LikedSongs()
     playlist_manager.add_song_screen(username, liked_songs)
 
     mock_save.assert_called_once()
@@ -51,20 +69,37 @@ def test_add_song_and_confirm(mock_load, mock_save, mock_find_song, mock_input):
 
 
 @patch("playlist_manager._safe_input")
-@patch("playlist_manager.save_liked_songs_for_user")
+@patch("playlist_manager.delete_liked_song_for_user")
 @patch("playlist_manager.load_liked_songs_for_user")
-def test_delete_song_screen_confirm(mock_load, mock_save, mock_input):
+def test_delete_song_screen_confirm(mock_load, mock_delete, mock_input):
     username = "user1"
     mock_input.side_effect = ["1", "Y"]
     mock_load.return_value = [{"title": "ToDelete", "artist":
         "Artist", "genre": "Rock"}]
 
-    liked_songs = [{"title": "ToDelete", "artist": "Artist", "genre": "Rock"}]
+    liked_songs = LikedSongs(
+        [{"title": "ToDelete", "artist": "Artist", "genre": "Rock"}])
     playlist_manager.delete_song_screen(username, liked_songs)
 
-    mock_save.assert_called_once()
-    saved_songs = mock_save.call_args[0][1]
-    assert len(saved_songs) == 0
+    mock_delete.assert_called_once()
+    deleted_song = mock_delete.call_args[0][1]
+    assert deleted_song["title"] == "ToDelete"
+    assert len(liked_songs) == 0
+
+
+@patch("playlist_manager._safe_input")
+@patch("playlist_manager.delete_liked_song_for_user")
+def test_delete_song_screen_pages(mock_delete, mock_input, capsys):
+    liked_songs = LikedSongs([{"title": f"Song{i}", "artist": "A",
+                               "genre": "Rock"} for i in range(1, 46)])
+    mock_input.side_effect = ["N", "G 3", "41", "Y"]
+    playlist_manager.delete_song_screen("user1", liked_songs)
+
+    out = capsys.readouterr().out
+    assert "Page 2 of 3" in out and "Page 3 of 3" in out
+    assert "45. Song45" in out
+    assert mock_delete.call_args[0][1]["title"] == "Song41"
+    assert len(liked_songs) == 44
 
 
 @patch("playlist_manager._safe_input")
@@ -78,9 +113,30 @@ def test_song_lookup_multiple_and_select(mock_load, mock_input):
          "duration": "4:00"}
     ]
     mock_input.side_effect = ["Hello", "1", "B", "B"]
-    liked_songs = mock_load.return_value
+    liked_songs = LikedSongs(mock_load.return_value)
     playlist_manager.song_lookup_screen(liked_songs)
 
+@patch("playlist_manager.song_info_screen")
+@patch("playlist_manager._safe_input")
+def test_song_lookup_by_artist_prefix(mock_input, mock_info):
+    liked_songs = LikedSongs([
+        {"title": "One", "artist": "The Band", "genre": "Pop"},
+        {"title": "Band Song", "artist": "Solo", "genre": "Rock"},
+    ])
+    mock_input.side_effect = ["artist: band", "B"]
+    playlist_manager.song_lookup_screen(liked_songs)
+    mock_info.assert_called_once()
+    assert mock_info.call_args[0][0]["title"] == "One"
+
+@patch("playlist_manager.add_liked_songs_for_user")
+@patch("playlist_manager.request_random_song",
+       side_effect=TimeoutError("no reply"))
+def test_add_random_song_screen_timeout(mock_random, mock_save):
+    liked_songs = LikedSongs()
+    playlist_manager.add_random_song_screen("user1", liked_songs)
+    mock_save.assert_not_called()
+    assert len(liked_songs) == 0
+
 # ---------------- Auth (Register/Login) ----------------
 
 @patch("playlist_manager._safe_input")
@@ -161,6 +217,143 @@ def test_get_recommendations_by_genre(mock_send):
     assert len(recs) == 1
     assert recs[0]["genre"] == "Pop"
 
+
+@patch("playlist_manager._safe_input")
+@patch("playlist_manager.find_songs_data")
+@patch("playlist_manager.add_liked_songs_for_user")
+@patch("playlist_manager.send_request")
+def test_recommendation_screen_adds_with_one_lookup(mock_send, mock_save,
+                                                   mock_find, mock_input):
+    mock_send.return_value = {"recommendations": [
+        {"title": "Rec1", "artist": "A", "genre": "Pop"},
+        {"title": "Rec2", "artist": "B", "genre": "Rock"},
+    ]}
+    mock_find.return_value = [
+        {"year": 2001, "duration": "1000 ms"},
+        None,
+    ]
+    mock_input.side_effect = ["3", "1,2"]
+
+    liked_songs = LikedSongs()
+    playlist_manager.recommendation_screen("user1", liked_songs)
+
+    mock_find.assert_called_once_with([("Rec1", "A"), ("Rec2", "B")])
+    assert [s["title"] for s in liked_songs] == ["Rec1", "Rec2"]
+    assert liked_songs[0]["year"] == 2001
+    assert liked_songs[1]["duration"] == "Unknown"
+
+
+@patch("playlist_manager._safe_input")
+@patch("playlist_manager.find_song_data")
+@patch("playlist_manager.add_liked_songs_for_user")
+def test_confirm_add_song_screen_skips_duplicate(mock_save, mock_find,
+                                                 mock_input):
+    liked_songs = LikedSongs([{"title": "Song", "artist": "Band",
+                               "genre": "Pop"}])
+    playlist_manager.confirm_add_song_screen("SONG", "band", "user1",
+                                             liked_songs)
+    mock_find.assert_not_called()
+    mock_save.assert_not_called()
+    assert len(liked_songs) == 1
+
+@patch("playlist_manager.song_prefetcher")
+@patch("playlist_manager.send_request")
+def test_fetch_discovery_results_merges_and_dedupes(mock_send,
+                                                    mock_prefetcher):
+    def fake_send(payload):
+        if payload["type"] == "recommend_by_artist":
+            return {"recommendations": [
+                {"title": "Liked", "artist": "A", "genre": "Pop"},
+                {"title": "Shared", "artist": "A", "genre": "Pop"}]}
+        if payload["type"] == "recommend_by_genre":
+            raise TimeoutError("no reply")
+        return {"recommendations": [
+            {"title": "shared", "artist": "a", "genre": "Pop"},
+            {"title": "Top", "artist": "C", "genre": "Rock"}]}
+
+    mock_send.side_effect = fake_send
+    mock_prefetcher.get_random_song.return_value = {
+        "title": "Rand", "artist": "D", "genre": "Jazz"}
+    liked_songs = LikedSongs([{"title": "Liked", "artist": "A", "genre": "Pop"}])
+
+    recs, errors = playlist_manager.fetch_discovery_results(liked_songs)
+
+    assert [s["title"] for s in recs] == ["shared", "Top", "Rand"]
+    assert recs[2]["source"] == "Random"
+    assert list(errors) == ["Genre: Pop"]
+
+@patch("playlist_manager.song_prefetcher")
+@patch("playlist_manager.send_request")
+def test_fetch_discovery_results_uses_precomputed(mock_send,
+                                                  mock_prefetcher):
+    def fake_send(payload):
+        if payload["type"] == "recommend_for_user":
+            return {"recommendations": {
+                "artist": [{"title": "Mine", "artist": "A"}],
+                "genre": [], "profile": [{"title": "Near", "artist": "E"}]},
+                "stale": False}
+        if payload["type"] == "recommend_popular":
+            return {"recommendations": [{"title": "Top", "artist": "C"}]}
+        # live artist/genre results are dropped when precomputed ones exist
+        raise TimeoutError("no reply")
+
+    mock_send.side_effect = fake_send
+    mock_prefetcher.get_random_song.return_value = None
+    liked_songs = LikedSongs([{"title": "Liked", "artist": "A", "genre": "Pop"}])
+
+    recs, errors = playlist_manager.fetch_discovery_results(liked_songs,
+                                                            "user1")
+
+    assert [s["title"] for s in recs] == ["Mine", "Near", "Top"]
+    assert recs[0]["source"] == "For you: artists"
+    assert errors == {}
+
+@patch("playlist_manager.song_prefetcher")
+@patch("playlist_manager.send_request")
+def test_precomputed_lookup_runs_alongside_live_requests(mock_send,
+                                                         mock_prefetcher):
+    popular_sent = threading.Event()
+
+    def fake_send(payload):
+        if payload["type"] == "recommend_for_user":
+            # would time out if the live requests waited for this one
+            assert popular_sent.wait(2)
+            return {"error": "No precomputed recommendations"}
+        if payload["type"] == "recommend_popular":
+            popular_sent.set()
+        return {"recommendations": [
+            {"title": payload["type"], "artist": "X"}]}
+
+    mock_send.side_effect = fake_send
+    mock_prefetcher.get_random_song.return_value = None
+    liked_songs = LikedSongs([{"title": "Liked", "artist": "A", "genre": "Pop"}])
+
+    recs, errors = playlist_manager.fetch_discovery_results(liked_songs,
+                                                            "user1")
+
+    assert errors == {}
+    assert [s["source"] for s in recs] == ["Popular", "Artist: A",
+                                           "Genre: Pop"]
+
+@patch("playlist_manager.song_prefetcher")
+@patch("playlist_manager.send_request")
+def test_discovery_visits_reuse_the_same_threads(mock_send, mock_prefetcher):
+    threads = set()
+
+    def fake_send(payload):
+        threads.add(threading.get_ident())
+        return {"recommendations": []}
+
+    mock_send.side_effect = fake_send
+    mock_prefetcher.get_random_song.return_value = None
+    liked_songs = LikedSongs([{"title": "Liked", "artist": "A", "genre": "Pop"}])
+
+    for _ in range(5):
+        playlist_manager.fetch_discovery_results(liked_songs)
+
+    assert mock_send.call_count == 15
+    assert len(threads) <= playlist_manager.DISCOVERY_THREADS
+
 # ---------------- Integration Tests (Live Servers Required) ----------------
 # These require all microservice servers to be running before executing.
 
@@ -214,10 +407,3 @@ def test_live_total_duration_service():
     assert "readable" in response
     assert "count_songs" in response
     assert "skipped" in response
-
-
-
-
-
-
-
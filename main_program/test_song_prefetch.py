@@ -0,0 +1,92 @@
+import threading
+import time
+import itertools
+
+from main_program.song_prefetch import SongPrefetcher
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _fake_fetchers():
+    counter = itertools.count(1)
+    calls = {"random": 0, "year": 0}
+
+    def fetch_random():
+        calls["random"] += 1
+        return {"title": f"Song{next(counter)}", "artist": "A"}
+
+    def fetch_by_year(year):
+        calls["year"] += 1
+        return {"songs": [{"title": f"Y{year}-{next(counter)}",
+                           "artist": "B", "year": year}]}
+
+    return fetch_random, fetch_by_year, calls
+
+
+def test_start_fills_random_queue_and_serves_from_memory():
+    fetch_random, fetch_by_year, calls = _fake_fetchers()
+    prefetcher = SongPrefetcher(fetch_random, fetch_by_year, depth=3,
+                                refill_at=1)
+    prefetcher.start()
+    assert _wait_for(lambda: prefetcher.buffered() == 3)
+
+    song = prefetcher.get_random_song()
+    assert song["title"] == "Song1"
+    assert calls["random"] == 3  # no synchronous fetch was needed
+
+
+def test_empty_queue_falls_back_to_direct_fetch():
+    fetch_random, fetch_by_year, calls = _fake_fetchers()
+    prefetcher = SongPrefetcher(fetch_random, fetch_by_year, depth=0)
+
+    song = prefetcher.get_random_song()
+    assert song["title"] == "Song1"
+    assert prefetcher.buffered() == 0
+
+
+def test_year_bucket_is_filled_after_first_request():
+    fetch_random, fetch_by_year, calls = _fake_fetchers()
+    prefetcher = SongPrefetcher(fetch_random, fetch_by_year, depth=0,
+                                year_depth=2)
+
+    first = prefetcher.get_song_by_year(2010)
+    assert first["songs"][0]["year"] == 2010
+    assert _wait_for(lambda: prefetcher.buffered(2010) == 2)
+
+    second = prefetcher.get_song_by_year(2010)
+    assert second["songs"][0]["year"] == 2010
+    assert second["songs"][0]["title"] != first["songs"][0]["title"]
+
+
+def test_refills_share_one_worker_thread():
+    threads = set()
+
+    def fetch_random():
+        threads.add(threading.get_ident())
+        return {"title": "R", "artist": "A"}
+
+    def fetch_by_year(year):
+        threads.add(threading.get_ident())
+        return {"songs": [{"title": f"Y{year}", "artist": "B"}]}
+
+    prefetcher = SongPrefetcher(fetch_random, fetch_by_year, depth=2,
+                                refill_at=1, year_depth=2)
+    prefetcher.start()
+    assert _wait_for(lambda: prefetcher.buffered() == 2)
+    for year in (2001, 2002, 2003):
+        prefetcher.get_song_by_year(year)
+    for _ in range(4):
+        prefetcher.get_random_song()
+    assert _wait_for(lambda: all(prefetcher.buffered(y) == 2
+                                 for y in (2001, 2002, 2003)))
+    assert _wait_for(lambda: prefetcher.buffered() == 2)
+
+    threads.discard(threading.get_ident())  # direct fetches on a miss
+    assert threads == {prefetcher._worker.ident}
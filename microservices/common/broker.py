@@ -0,0 +1,183 @@
+"""
+Shared request loop for the ZeroMQ microservices.
+
+Every service describes itself as a dict of handlers keyed by the
+request "type" field. `serve` then runs those handlers either on a
+single REP socket (the original one-request-at-a-time mode) or, when
+`workers` > 0, in broker mode: a ROUTER frontend on the public port
+feeding N worker threads through a DEALER/inproc backend. The JSON wire
+protocol is identical in both modes, so clients don't need to change.
+Requests may also be sent MessagePack-encoded; see `wire`.
+
+Any service also accepts a batch envelope, {"type": "batch", "requests":
+[...]}, answered with {"responses": [...]} in the same order after
+running the sub-requests concurrently.
+"""
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import zmq
+
+from microservices.common import wire
+
+
+# {"type": "batch", "requests": [...]} -> {"responses": [...]}, in order
+BATCH_TYPE = "batch"
+MAX_BATCH_SIZE = 100
+BATCH_THREADS = 8
+
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+
+def batch_requests(request: dict) -> list:
+    """Validate a batch envelope and return its sub-requests."""
+    requests = request.get("requests")
+    if not isinstance(requests, list):
+        raise ValueError("Batch request needs a 'requests' list")
+    if len(requests) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch too large (max {MAX_BATCH_SIZE} requests)")
+    return requests
+
+
+def dispatch_one(handlers: dict, request) -> dict:
+    """Dispatch a sub-request of a batch; errors become error replies."""
+    try:
+        if isinstance(request, dict) and request.get("type") == BATCH_TYPE:
+            return {"error": "Nested batch requests are not supported"}
+        return dispatch(handlers, request)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _get_batch_executor():
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(
+                max_workers=BATCH_THREADS, thread_name_prefix="batch")
+        return _batch_executor
+
+
+def dispatch(handlers: dict, request: dict) -> dict:
+    """Route a decoded request to the handler registered for its type."""
+    if not isinstance(request, dict):
+        return {"error": "Request must be a JSON object"}
+
+    if request.get("type") == BATCH_TYPE and BATCH_TYPE not in handlers:
+        requests = batch_requests(request)
+        if len(requests) <= 1:
+            responses = [dispatch_one(handlers, r) for r in requests]
+        else:
+            # Sub-requests are independent, so run them concurrently
+            responses = list(_get_batch_executor().map(
+                lambda r: dispatch_one(handlers, r), requests))
+        return {"responses": responses}
+
+    handler = handlers.get(request.get("type"))
+    if handler is None:
+        return {"error": "Invalid request type"}
+    return handler(request)
+
+
+def _reply_loop(socket, handlers: dict, verbose: bool):
+    """Receive, dispatch and reply forever on a REP socket."""
+    while True:
+        frames = socket.recv_multipart()
+        encoding = wire.JSON
+        try:
+            request, encoding = wire.decode_frames(frames)
+            if verbose:
+                print(f"Received request: {request}")
+            reply = dispatch(handlers, request)
+        except Exception as e:
+            # never crash the loop; always respond
+            reply = {"error": str(e)}
+        try:
+            socket.send_multipart(wire.encode_frames(reply, encoding))
+        except Exception as e:
+            socket.send_multipart(wire.encode_frames({"error": str(e)}))
+
+
+def _worker(context, backend_url: str, handlers: dict, verbose: bool):
+    socket = context.socket(zmq.REP)
+    socket.connect(backend_url)
+    try:
+        _reply_loop(socket, handlers, verbose)
+    except zmq.ContextTerminated:
+        pass
+    finally:
+        socket.close(0)
+
+
+def serve(handlers: dict, port: int, workers: int = 0, name: str = "Server",
+          verbose: bool = True):
+    """
+    Serve `handlers` on tcp://*:<port> until interrupted.
+
+    workers <= 0 keeps the classic single REP socket; workers > 0 starts
+    a ROUTER/DEALER broker with that many worker threads.
+    """
+    context = zmq.Context()
+    sockets = []
+
+    try:
+        if workers <= 0:
+            socket = context.socket(zmq.REP)
+            socket.bind(f"tcp://*:{port}")
+            sockets.append(socket)
+            print(f"{name} listening on port {port}... (Ctrl+C to stop)")
+            _reply_loop(socket, handlers, verbose)
+        else:
+            backend_url = f"inproc://workers-{port}"
+            frontend = context.socket(zmq.ROUTER)
+            frontend.bind(f"tcp://*:{port}")
+            backend = context.socket(zmq.DEALER)
+            backend.bind(backend_url)
+            sockets.extend([frontend, backend])
+
+            for i in range(workers):
+                thread = threading.Thread(
+                    target=_worker,
+                    args=(context, backend_url, handlers, verbose),
+                    name=f"{name}-worker-{i}",
+                    daemon=True,
+                )
+                thread.start()
+
+            print(f"{name} listening on port {port} with {workers} "
+                  f"workers... (Ctrl+C to stop)")
+            zmq.proxy(frontend, backend)
+
+    except KeyboardInterrupt:
+        print(f"\nShutting down {name}...")
+
+    except zmq.ContextTerminated:
+        pass
+
+    finally:
+        for socket in sockets:
+            socket.close(0)
+        context.term()
+        print("Server stopped.")
+
+
+def parse_server_args(description: str, argv=None):
+    """
+    Common command line options for the service entry points.
+    --workers defaults to $SERVICE_WORKERS, or 0 (single REP socket);
+    --async can also be enabled with SERVICE_ASYNC=1.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--workers", type=int,
+        default=int(os.environ.get("SERVICE_WORKERS", "0")),
+        help="run in broker mode with this many worker threads "
+             "(0 = single REP socket); with --async, the size of the "
+             "executor thread pool")
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        default=os.environ.get("SERVICE_ASYNC", "") == "1",
+        help="run on the asyncio runtime (many requests in flight)")
+    return parser.parse_args(argv)
@@ -0,0 +1,142 @@
+"""
+Shared ZeroMQ client layer for talking to the microservices.
+
+One process-wide context, and one persistent REQ socket per endpoint
+(per thread, since ZeroMQ sockets must not be shared between threads).
+Timeouts follow the "lazy pirate" pattern: a REQ socket that didn't get
+its reply is stuck in the wrong state, so it is closed and reconnected
+before the request is retried, up to a bounded number of attempts.
+
+Per-thread clients live until their thread calls `close_thread_clients`
+(or the process exits), so `get_client` is meant for long-lived threads:
+the main thread and fixed worker pools. A short-lived thread that makes
+requests must call `close_thread_clients` in a `finally` before it ends.
+"""
+import atexit
+import os
+import threading
+import zmq
+
+from microservices.common import wire
+
+DEFAULT_TIMEOUT_MS = 5000
+DEFAULT_ATTEMPTS = 3
+# "json" (default) or "msgpack"; see `wire`
+DEFAULT_ENCODING = os.environ.get("SERVICE_ENCODING", wire.JSON)
+# When set (e.g. tcp://localhost:5559), every request goes to the
+# single-process gateway instead of the per-service ports
+GATEWAY_ADDRESS = os.environ.get("SERVICE_GATEWAY")
+
+_local = threading.local()
+_all_clients = []
+_all_clients_lock = threading.Lock()
+
+
+class ServiceClient:
+    """A reconnecting REQ client bound to a single service address."""
+
+    def __init__(self, address: str, timeout_ms: int = DEFAULT_TIMEOUT_MS,
+                 attempts: int = DEFAULT_ATTEMPTS, context=None,
+                 encoding: str = DEFAULT_ENCODING):
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        if encoding not in wire.ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding!r}")
+        self.address = address
+        self.encoding = encoding
+        self.timeout_ms = timeout_ms
+        self.attempts = attempts
+        self.context = context or zmq.Context.instance()
+        self.socket = None
+
+    def _connect(self):
+        self.socket = self.context.socket(zmq.REQ)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.connect(self.address)
+
+    def _reset(self):
+        if self.socket is not None:
+            self.socket.close(0)
+            self.socket = None
+
+    def request(self, payload: dict, timeout_ms: int = None) -> dict:
+        """
+        Send `payload` and return the decoded reply. Raises TimeoutError
+        when every attempt times out.
+        """
+        timeout_ms = self.timeout_ms if timeout_ms is None else timeout_ms
+
+        for _ in range(self.attempts):
+            if self.socket is None:
+                self._connect()
+            self.socket.send_multipart(
+                wire.encode_frames(payload, self.encoding))
+            if self.socket.poll(timeout_ms, zmq.POLLIN):
+                reply, _ = wire.decode_frames(self.socket.recv_multipart())
+                return reply
+            # No reply: the REQ socket is wedged, so start over
+            self._reset()
+
+        raise TimeoutError(f"No response from {self.address} within "
+                           f"{timeout_ms} ms after {self.attempts} attempts")
+
+    def request_batch(self, requests: list, timeout_ms: int = None) -> list:
+        """
+        Send several requests in one round trip and return their replies
+        in the same order.
+        """
+        if not requests:
+            return []
+        reply = self.request({"type": "batch", "requests": list(requests)},
+                             timeout_ms=timeout_ms)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply.get("responses", [])
+
+    def close(self):
+        self._reset()
+
+
+def get_client(address: str, **kwargs) -> ServiceClient:
+    """
+    Return the calling thread's persistent client for `address`,
+    creating it on first use. Keyword arguments only apply on creation.
+    If a gateway is configured, its address replaces `address`. Only
+    long-lived threads should call this; see `close_thread_clients`.
+    """
+    address = GATEWAY_ADDRESS or address
+    clients = getattr(_local, "clients", None)
+    if clients is None:
+        clients = _local.clients = {}
+
+    client = clients.get(address)
+    if client is None:
+        client = clients[address] = ServiceClient(address, **kwargs)
+        with _all_clients_lock:
+            _all_clients.append(client)
+    return client
+
+
+def close_thread_clients():
+    """
+    Close the calling thread's clients and forget them. Worker threads
+    call this when they finish so their sockets don't outlive them.
+    """
+    clients = getattr(_local, "clients", None)
+    if not clients:
+        return
+    with _all_clients_lock:
+        for client in clients.values():
+            client.close()
+            _all_clients.remove(client)
+    clients.clear()
+
+
+@atexit.register
+def close_all():
+    """Close every client socket created through `get_client`."""
+    with _all_clients_lock:
+        for client in _all_clients:
+            client.close()
+        _all_clients.clear()
+    _local.__dict__.clear()
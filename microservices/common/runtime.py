@@ -0,0 +1,158 @@
+"""
+asyncio service runtime built on zmq.asyncio.
+
+Handlers are registered by request "type", exactly like the dicts the
+services pass to `broker.serve`. Plain functions run in a thread pool
+executor, so file, pandas and SQLite work never blocks the event loop;
+coroutine functions are awaited directly. A single ROUTER socket
+accepts requests from ordinary REQ clients and keeps many of them in
+flight at once, replying to each as soon as its handler finishes.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import zmq
+import zmq.asyncio
+
+from microservices.common import wire
+from microservices.common.broker import (
+    BATCH_TYPE, batch_requests, dispatch, serve
+)
+
+
+def split_envelope(frames: list):
+    """
+    Split a ROUTER message into (envelope, body). REQ peers send
+    [identity, b"", body...]; the envelope is everything up to and
+    including the empty delimiter, and is sent back in front of the reply.
+    """
+    split = frames.index(b"") + 1 if b"" in frames else 1
+    return frames[:split], frames[split:]
+
+
+class ServiceRuntime:
+    """Dispatches requests by type to registered sync or async handlers."""
+
+    def __init__(self, name: str = "Server", executor_workers: int = None,
+                 max_in_flight: int = 256, verbose: bool = True):
+        self.name = name
+        self.handlers = {}
+        self.verbose = verbose
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(
+            max_workers=executor_workers,
+            thread_name_prefix=f"{name}-executor")
+
+    def register(self, request_type: str, handler=None):
+        """
+        Register `handler` for `request_type`. Can also be used as a
+        decorator: @runtime.register("random_song").
+        """
+        if handler is None:
+            def decorator(func):
+                self.handlers[request_type] = func
+                return func
+            return decorator
+        self.handlers[request_type] = handler
+        return handler
+
+    def register_all(self, handlers: dict):
+        for request_type, handler in handlers.items():
+            self.register(request_type, handler)
+
+    async def handle(self, request) -> dict:
+        """Run the handler for one decoded request and return its reply."""
+        if (isinstance(request, dict) and
+                request.get("type") == BATCH_TYPE and
+                BATCH_TYPE not in self.handlers):
+            requests = batch_requests(request)
+            responses = await asyncio.gather(
+                *(self._handle_one(r) for r in requests))
+            return {"responses": list(responses)}
+
+        handler = (self.handlers.get(request.get("type"))
+                   if isinstance(request, dict) else None)
+        if handler is None:
+            return dispatch(self.handlers, request)
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(request)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, handler, request)
+
+    async def _handle_one(self, request) -> dict:
+        """Handle a sub-request of a batch; errors become error replies."""
+        try:
+            if isinstance(request, dict) and request.get("type") == BATCH_TYPE:
+                return {"error": "Nested batch requests are not supported"}
+            return await self.handle(request)
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _respond(self, socket, envelope, body, limit):
+        try:
+            encoding = wire.JSON
+            try:
+                request, encoding = wire.decode_frames(body)
+                if self.verbose:
+                    print(f"Received request: {request}")
+                reply = await self.handle(request)
+            except Exception as e:
+                # never crash the loop; always respond
+                reply = {"error": str(e)}
+            try:
+                frames = wire.encode_frames(reply, encoding)
+            except Exception as e:
+                frames = wire.encode_frames({"error": str(e)})
+            await socket.send_multipart(envelope + frames)
+        finally:
+            limit.release()
+
+    async def serve(self, port: int):
+        """Accept requests on tcp://*:<port> until cancelled."""
+        context = zmq.asyncio.Context()
+        socket = context.socket(zmq.ROUTER)
+        socket.bind(f"tcp://*:{port}")
+        limit = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+        print(f"{self.name} listening on port {port} (asyncio)... "
+              f"(Ctrl+C to stop)")
+
+        try:
+            while True:
+                envelope, body = split_envelope(
+                    await socket.recv_multipart())
+                await limit.acquire()
+                task = asyncio.create_task(
+                    self._respond(socket, envelope, body, limit))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            socket.close(0)
+            context.term()
+
+    def run(self, port: int):
+        """Blocking entry point used by the service scripts."""
+        try:
+            asyncio.run(self.serve(port))
+        except KeyboardInterrupt:
+            print(f"\nShutting down {self.name}...")
+        finally:
+            self._executor.shutdown(wait=False)
+            print("Server stopped.")
+
+
+def run_service(handlers: dict, port: int, args, name: str = "Server",
+                verbose: bool = True):
+    """
+    Start a service in the mode selected on the command line: the asyncio
+    runtime with --async, otherwise the REP/broker loop from `serve`.
+    """
+    if args.use_async:
+        runtime = ServiceRuntime(name, executor_workers=args.workers or None,
+                                 verbose=verbose)
+        runtime.register_all(handlers)
+        runtime.run(port)
+    else:
+        serve(handlers, port, workers=args.workers, name=name,
+              verbose=verbose)
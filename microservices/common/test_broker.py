@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+import zmq
+
+from microservices.common import broker, wire
+
+
+def _handlers():
+    def fail(request):
+        raise RuntimeError("boom")
+
+    return {
+        "echo": lambda request: {"echo": request.get("value")},
+        "fail": fail,
+    }
+
+
+def test_dispatch_routes_by_type():
+    handlers = _handlers()
+    assert broker.dispatch(handlers, {"type": "echo", "value": 3}) == \
+        {"echo": 3}
+    assert broker.dispatch(handlers, {"type": "nope"}) == \
+        {"error": "Invalid request type"}
+    assert "error" in broker.dispatch(handlers, ["not", "a", "dict"])
+
+
+def test_batch_keeps_order_and_isolates_errors():
+    reply = broker.dispatch(_handlers(), {"type": "batch", "requests": [
+        {"type": "echo", "value": 1},
+        {"type": "fail"},
+        {"type": "batch", "requests": []},
+        "x",
+        {"type": "echo", "value": 2},
+    ]})
+    responses = reply["responses"]
+    assert responses[0] == {"echo": 1}
+    assert responses[1] == {"error": "boom"}
+    assert "Nested" in responses[2]["error"]
+    assert "error" in responses[3]
+    assert responses[4] == {"echo": 2}
+
+
+def test_batch_envelope_is_validated():
+    handlers = _handlers()
+    assert broker.dispatch(handlers, {"type": "batch", "requests": []}) == \
+        {"responses": []}
+    with pytest.raises(ValueError, match="requests"):
+        broker.dispatch(handlers, {"type": "batch", "requests": "x"})
+
+
+def test_worker_answers_through_dealer_envelope():
+    # The DEALER stands in for the broker's backend: it forwards the
+    # ROUTER envelope ([b""] for a REQ peer) and gets it back unchanged
+    context = zmq.Context()
+    backend = context.socket(zmq.DEALER)
+    backend.setsockopt(zmq.LINGER, 0)
+    backend.bind("inproc://test-workers")
+    thread = threading.Thread(
+        target=broker._worker,
+        args=(context, "inproc://test-workers", _handlers(), False),
+        daemon=True)
+    thread.start()
+    try:
+        backend.send_multipart(
+            [b""] + wire.encode_frames({"type": "echo", "value": "hi"}))
+        assert backend.poll(2000, zmq.POLLIN)
+        frames = backend.recv_multipart()
+        assert frames[0] == b""
+        assert wire.decode_frames(frames[1:]) == ({"echo": "hi"}, wire.JSON)
+
+        backend.send_multipart([b"", b"not json"])
+        assert backend.poll(2000, zmq.POLLIN)
+        reply, _ = wire.decode_frames(backend.recv_multipart()[1:])
+        assert "error" in reply
+    finally:
+        backend.close(0)
+        context.term()
+        thread.join(2)
+    assert not thread.is_alive()
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+import zmq
+
+from microservices.common import client as client_module
+from microservices.common import wire
+from microservices.common.client import (ServiceClient, close_thread_clients,
+                                         get_client)
+
+
+@pytest.fixture
+def context():
+    context = zmq.Context()
+    yield context
+    context.term()
+
+
+def _server(context, address, drop, seen, total):
+    """
+    ROUTER that ignores its first `drop` requests and echoes the rest,
+    recording the identity of every peer that sent one; it stops after
+    `total` requests.
+    """
+    socket = context.socket(zmq.ROUTER)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.bind(address)
+
+    def run():
+        try:
+            while len(seen) < total and socket.poll(2000, zmq.POLLIN):
+                identity, empty, *body = socket.recv_multipart()
+                seen.append(identity)
+                if len(seen) <= drop:
+                    continue
+                request, encoding = wire.decode_frames(body)
+                socket.send_multipart([identity, empty] + wire.encode_frames(
+                    {"echo": request["value"]}, encoding))
+        finally:
+            socket.close(0)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_retry_reconnects_after_a_lost_reply(context):
+    seen = []
+    server = _server(context, "inproc://retry", drop=1, seen=seen,
+                     total=3)
+    client = ServiceClient("inproc://retry", timeout_ms=100, attempts=3,
+                           context=context)
+    try:
+        assert client.request({"value": 7}) == {"echo": 7}
+        # the second attempt came from a fresh REQ socket
+        assert len(seen) == 2 and seen[0] != seen[1]
+        assert client.request({"value": 8}, timeout_ms=1000) == {"echo": 8}
+        assert seen[2] == seen[1]  # and that socket is kept
+    finally:
+        client.close()
+    server.join(5)
+
+
+def test_timeout_after_every_attempt_resets_socket(context):
+    seen = []
+    server = _server(context, "inproc://timeout", drop=2, seen=seen,
+                     total=2)
+    client = ServiceClient("inproc://timeout", timeout_ms=50, attempts=2,
+                           context=context)
+    with pytest.raises(TimeoutError):
+        client.request({"value": 1})
+    assert len(seen) == 2
+    assert client.socket is None
+    server.join(5)
+
+
+def test_msgpack_client_round_trip(context):
+    pytest.importorskip("msgpack")
+    server = _server(context, "inproc://msgpack", drop=0, seen=[],
+                     total=1)
+    client = ServiceClient("inproc://msgpack", timeout_ms=1000,
+                           context=context, encoding=wire.MSGPACK)
+    try:
+        assert client.request({"value": [1, "b"]}) == {"echo": [1, "b"]}
+    finally:
+        client.close()
+    server.join(5)
+
+
+def test_thread_clients_are_closed_when_the_thread_ends(monkeypatch):
+    monkeypatch.setattr(client_module, "GATEWAY_ADDRESS", None)
+    created = []
+
+    def worker():
+        try:
+            client = get_client("tcp://localhost:1")
+            assert get_client("tcp://localhost:1") is client
+            client._connect()
+            created.append(client)
+        finally:
+            close_thread_clients()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert created[0].socket is None
+    assert created[0] not in client_module._all_clients
@@ -0,0 +1,57 @@
+import asyncio
+
+from microservices.common.runtime import ServiceRuntime, split_envelope
+
+
+def test_split_envelope():
+    assert split_envelope([b"id", b"", b"{}"]) == ([b"id", b""], [b"{}"])
+    assert split_envelope([b"id", b"", b"msgpack", b"\x80"]) == \
+        ([b"id", b""], [b"msgpack", b"\x80"])
+    # a proxy in front adds its own identity frame
+    assert split_envelope([b"proxy", b"id", b"", b"{}"]) == \
+        ([b"proxy", b"id", b""], [b"{}"])
+    # DEALER peers send no delimiter
+    assert split_envelope([b"id", b"{}"]) == ([b"id"], [b"{}"])
+
+
+def _runtime():
+    runtime = ServiceRuntime("Test", executor_workers=2, verbose=False)
+
+    @runtime.register("sync")
+    def sync(request):
+        return {"sync": request["value"]}
+
+    @runtime.register("async")
+    async def run_async(request):
+        await asyncio.sleep(0)
+        return {"async": request["value"]}
+
+    @runtime.register("fail")
+    def fail(request):
+        raise RuntimeError("boom")
+
+    return runtime
+
+
+def test_handle_sync_async_and_unknown():
+    runtime = _runtime()
+    assert asyncio.run(runtime.handle({"type": "sync", "value": 1})) == \
+        {"sync": 1}
+    assert asyncio.run(runtime.handle({"type": "async", "value": 2})) == \
+        {"async": 2}
+    assert asyncio.run(runtime.handle({"type": "nope"})) == \
+        {"error": "Invalid request type"}
+
+
+def test_batch_runs_in_order_with_errors_isolated():
+    reply = asyncio.run(_runtime().handle({"type": "batch", "requests": [
+        {"type": "async", "value": 1},
+        {"type": "fail"},
+        {"type": "batch", "requests": []},
+        {"type": "sync", "value": 2},
+    ]}))
+    responses = reply["responses"]
+    assert responses[0] == {"async": 1}
+    assert responses[1] == {"error": "boom"}
+    assert "Nested" in responses[2]["error"]
+    assert responses[3] == {"sync": 2}
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from microservices.common import wire
+
+MESSAGE = {"type": "song", "title": "Straße", "year": 1999,
+           "score": 0.5, "tags": ["a", None], "nested": {"ok": True}}
+
+
+def test_json_is_a_single_frame():
+    frames = wire.encode_frames(MESSAGE)
+    assert len(frames) == 1
+    assert wire.decode_frames(frames) == (MESSAGE, wire.JSON)
+
+
+def test_msgpack_uses_a_header_frame():
+    pytest.importorskip("msgpack")
+    frames = wire.encode_frames(MESSAGE, wire.MSGPACK)
+    assert frames[0] == b"msgpack"
+    assert wire.decode_frames(frames) == (MESSAGE, wire.MSGPACK)
+
+
+@pytest.mark.parametrize("encoding", wire.ENCODINGS)
+def test_numpy_values_are_converted(encoding):
+    if encoding == wire.MSGPACK:
+        pytest.importorskip("msgpack")
+    frames = wire.encode_frames(
+        {"n": np.int64(3), "x": np.float32(0.5), "a": np.arange(3)}, encoding)
+    assert wire.decode_frames(frames)[0] == {"n": 3, "x": 0.5, "a": [0, 1, 2]}
+
+
+def test_malformed_frames_are_rejected():
+    with pytest.raises(ValueError, match="Unsupported encoding"):
+        wire.decode_frames([b"xml", b"<a/>"])
+    with pytest.raises(ValueError, match="Malformed"):
+        wire.decode_frames([b"json", b"{}", b"extra"])
+
+
+def test_column_records():
+    frame = pd.DataFrame({
+        "track_name": ["a", None, "c"],
+        "popularity": [10.0, np.nan, 30.0],
+        "tempo": [120.5, np.nan, 99.0],
+    })
+    records = wire.column_records(
+        frame, {"title": "track_name", "popularity": "popularity",
+                "tempo": "tempo", "genre": "genre"}, ints=("popularity",))
+    assert records == [
+        {"title": "a", "popularity": 10, "tempo": 120.5, "genre": None},
+        {"title": None, "popularity": None, "tempo": None, "genre": None},
+        {"title": "c", "popularity": 30, "tempo": 99.0, "genre": None},
+    ]
+    assert type(records[0]["popularity"]) is int
+    assert wire.column_records(frame.iloc[:0], {"title": "track_name"}) == []
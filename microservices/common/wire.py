@@ -0,0 +1,104 @@
+"""
+Wire encodings for the microservices.
+
+JSON stays the default: a request sent as a single frame is decoded as
+JSON and answered in JSON, exactly like the original send_json/recv_json
+protocol. A client can opt into MessagePack by prefixing the body with a
+header frame naming the encoding ([b"msgpack", body]); the server then
+answers with the same two-frame layout.
+
+`msgpack` is listed in requirements.txt, but the import stays optional:
+without it the services keep answering JSON and reject MessagePack.
+"""
+import json
+import math
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+ENCODINGS = (JSON, MSGPACK)
+
+
+def _default(obj):
+    """Convert NumPy/pandas values that the encoders don't know about."""
+    if hasattr(obj, "tolist"):  # numpy arrays and scalars
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} "
+                    f"is not serializable")
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ValueError("MessagePack encoding requested but the 'msgpack' "
+                         "package is not installed")
+
+
+def encode(obj, encoding: str = JSON) -> bytes:
+    if encoding == JSON:
+        return json.dumps(obj, default=_default).encode("utf-8")
+    if encoding == MSGPACK:
+        _require_msgpack()
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    raise ValueError(f"Unsupported encoding: {encoding!r}")
+
+
+def decode(data: bytes, encoding: str = JSON):
+    if encoding == JSON:
+        return json.loads(data)
+    if encoding == MSGPACK:
+        _require_msgpack()
+        return msgpack.unpackb(data, raw=False)
+    raise ValueError(f"Unsupported encoding: {encoding!r}")
+
+
+def decode_frames(frames: list):
+    """
+    Decode a request's frames. Returns (request, encoding); the encoding
+    is the one the reply should use.
+    """
+    if len(frames) == 1:
+        return decode(frames[0], JSON), JSON
+    if len(frames) == 2:
+        encoding = frames[0].decode("ascii", errors="replace")
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding!r}")
+        return decode(frames[1], encoding), encoding
+    raise ValueError("Malformed request: expected 1 or 2 frames")
+
+
+def encode_frames(obj, encoding: str = JSON) -> list:
+    """Encode a message using the frame layout that matches `encoding`."""
+    if encoding == JSON:
+        return [encode(obj, JSON)]
+    return [encoding.encode("ascii"), encode(obj, encoding)]
+
+
+def column_records(frame, fields: dict, ints=()) -> list:
+    """
+    Build a list of JSON/MessagePack-ready dicts from a DataFrame one
+    column at a time. `fields` maps output keys to column names; missing
+    values become None and keys listed in `ints` are returned as int.
+    Columns are converted with a single tolist() call instead of
+    converting every cell of every row.
+    """
+    columns = {}
+    for key, column in fields.items():
+        if column not in frame.columns:
+            columns[key] = [None] * len(frame)
+            continue
+        values = frame[column].tolist()
+        if frame[column].dtype.kind == "f":
+            values = [None if math.isnan(v) else v for v in values]
+        elif frame[column].dtype.kind == "O":
+            values = [None if v is None or v != v else v for v in values]
+        if key in ints:
+            values = [None if v is None else int(v) for v in values]
+        columns[key] = values
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+import pytest
+
+from microservices.gateway import zeroMQServer as gateway
+
+
+def _fake_services(recommendation_handlers):
+    def service(handlers):
+        return SimpleNamespace(prepare_dataframe=lambda df: df,
+                               build_handlers=lambda df: handlers,
+                               HANDLERS=handlers)
+
+    services = {
+        "random_song_service": service({"random_song": print}),
+        "song_by_year_service": service({"song_by_year": print}),
+        "total_duration_service": service({"total_duration": print}),
+        "recommendation_service": service(recommendation_handlers),
+    }
+    return services.__getitem__
+
+
+def test_build_handlers_mounts_every_service(monkeypatch):
+    monkeypatch.setattr(gateway, "_service",
+                        _fake_services({"recommend": print}))
+    assert sorted(gateway.build_handlers(None)) == [
+        "random_song", "recommend", "song_by_year", "total_duration"]
+
+
+def test_build_handlers_rejects_duplicate_types(monkeypatch):
+    monkeypatch.setattr(gateway, "_service",
+                        _fake_services({"random_song": len}))
+    with pytest.raises(ValueError, match="random_song"):
+        gateway.build_handlers(None)
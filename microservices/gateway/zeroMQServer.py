@@ -0,0 +1,66 @@
+"""
+ZeroMQ Gateway — all microservices in one process (port 5559)
+
+Mounts the random-song, song-by-year, total-duration and recommendation
+handlers behind a single endpoint. The dataset is read once and every
+service builds its handlers from that shared table; requests are routed
+on the existing "type" field, so the wire protocol is unchanged. The
+per-port servers remain available for running services separately.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+# The recommendation service imports its helpers as top-level modules
+sys.path.append(str(PROJECT_ROOT / "microservices" / "recommendation_service"))
+from microservices.common.broker import parse_server_args
+from microservices.common.runtime import run_service
+
+PORT = 5559
+
+
+def _service(name: str):
+    return importlib.import_module(f"microservices.{name}.zeroMQServer")
+
+
+def build_handlers(df) -> dict:
+    """Combine every service's handlers, all built on the shared `df`."""
+    random_song = _service("random_song_service")
+    song_by_year = _service("song_by_year_service")
+    total_duration = _service("total_duration_service")
+    recommendation = _service("recommendation_service")
+
+    return merge_handlers([
+        random_song.build_handlers(random_song.prepare_dataframe(df)),
+        song_by_year.build_handlers(song_by_year.prepare_dataframe(df)),
+        total_duration.HANDLERS,
+        recommendation.build_handlers(df),
+    ])
+
+
+def merge_handlers(handler_sets) -> dict:
+    """One handler dict from several; a request type may only appear once."""
+    handlers = {}
+    for handler_set in handler_sets:
+        for request_type, handler in handler_set.items():
+            if request_type in handlers:
+                raise ValueError(f"Duplicate handler for '{request_type}'")
+            handlers[request_type] = handler
+    return handlers
+
+
+def main():
+    args = parse_server_args("Microservice Gateway")
+
+    print("Loading shared song table...")
+    from dataset_service.song_service import df
+
+    run_service(build_handlers(df), PORT, args, name="Gateway",
+                verbose=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,13 @@
-import zmq
+from microservices.common.client import get_client
 
+ADDRESS = "tcp://localhost:5556"
 
-def request_random_song() -> dict:
+
+def request_random_song(timeout_ms: int = 5000) -> dict:
     """
     Sends a request to the random song microservice and returns one
-    random song.
+    random song. Raises TimeoutError if the service doesn't respond.
     """
-    context = zmq.Context()
-    socket = context.socket(zmq.REQ)
-    socket.connect("tcp://localhost:5556")
-
-    # Send request
     payload = {"type": "random_song"}
-    socket.send_json(payload)
-
-    # Receive response
-    response = socket.recv_json()
+    response = get_client(ADDRESS).request(payload, timeout_ms=timeout_ms)
     return response.get("song", {})
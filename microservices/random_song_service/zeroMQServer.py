@@ -5,8 +5,12 @@ Returns one random song from spotify_data.csv
 
 import os
 import sys
+from pathlib import Path
 import pandas as pd
-import zmq
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from microservices.common.broker import parse_server_args
+from microservices.common.runtime import run_service
 
 PORT = 5556
 DATA_FILE = os.path.join(os.path.dirname(__file__), "spotify_data.csv")
@@ -16,8 +20,10 @@ def _load_dataframe(path: str) -> pd.DataFrame:
     if not os.path.exists(path):
         raise FileNotFoundError(f"CSV not found at: {path}")
 
-    df = pd.read_csv(path)
+    return prepare_dataframe(pd.read_csv(path))
+
 
+def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     # Keep only columns we care about; be robust to different names
     def pick_col(possible):
         for c in possible:
@@ -82,7 +88,30 @@ def _str_or_unknown(val):
     return str(val) if val is not None else "Unknown"
 
 
+def build_handlers(df: pd.DataFrame) -> dict:
+    """Request handlers for this service, keyed by request type."""
+
+    def random_song(req):
+        # Sample one random row
+        row = df.sample(1).iloc[0]
+
+        song = {
+            "title": _str_or_unknown(row.get("track_name")),
+            "artist": _str_or_unknown(row.get("artist_name")),
+            "genre": _str_or_unknown(row.get("genre")),
+            # optional fields
+            "year": _int_or_none(row.get("year")),
+            "duration": _int_or_none(row.get("duration")),
+            "popularity": _int_or_none(row.get("popularity")),
+        }
+        return {"song": song}
+
+    return {"random_song": random_song}
+
+
 def main():
+    args = parse_server_args("Random Song Microservice")
+
     # Load data upfront; crash early if it’s missing
     try:
         df = _load_dataframe(DATA_FILE)
@@ -90,49 +119,9 @@ def main():
         print(f"Failed to load dataset: {e}")
         sys.exit(1)
 
-    context = zmq.Context()
-    socket = context.socket(zmq.REP)
-    socket.bind(f"tcp://*:{PORT}")
-    print(f"Starting Random Song Microservice on port {PORT}...")
-
-    try:
-        while True:
-            try:
-                req = socket.recv_json()
-                print(f"Received request: {req}")
-
-                if req.get("type") != "random_song":
-                    socket.send_json({"error": "Invalid request type"})
-                    continue
-
-                # Sample one random row
-                row = df.sample(1).iloc[0]
-
-                song = {
-                    "title": _str_or_unknown(row.get("track_name")),
-                    "artist": _str_or_unknown(row.get("artist_name")),
-                    "genre": _str_or_unknown(row.get("genre")),
-                    # optional fields
-                    "year": _int_or_none(row.get("year")),
-                    "duration": _int_or_none(row.get("duration")),
-                    "popularity": _int_or_none(row.get("popularity")),
-                }
-
-                socket.send_json({"song": song})
-
-            except Exception as e:
-                # never crash the loop; always respond
-                socket.send_json({"error": str(e)})
-
-    except KeyboardInterrupt:
-        print("\nShutting down random song server...")
-
-    finally:
-        socket.close(0)
-        context.term()
-        print("Server stopped.")
+    run_service(build_handlers(df), PORT, args,
+                name="Random Song Microservice")
 
 
 if __name__ == "__main__":
     main()
-
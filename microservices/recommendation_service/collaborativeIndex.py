@@ -0,0 +1,344 @@
+"""
+Item-item collaborative filtering index built from every user's liked
+songs (main_program/liked_songs/<user>.json plus journal).
+
+Two songs co-occur once for every user who likes both. The offline job
+counts co-occurrences over all libraries and keeps, for every song, its
+TOP_K neighbours by cosine score count / sqrt(users_i * users_j) in
+CSR form (indptr / indices / scores arrays). Everything is NumPy; no
+scipy needed:
+
+- libraries are read in parallel on a process pool, one task per file;
+- each library's pairs are the upper triangle of its sorted item ids,
+  packed into one int64 per pair ((i << 32) | j), and counts are merged
+  with np.unique + np.bincount;
+- top-k per row comes from one lexsort and a rank-within-row mask.
+
+The result, including the raw pair counts and each user's item ids and
+library mtime, is saved with np.savez. Re-running the job only re-reads
+libraries whose files changed (or disappeared), subtracts their old
+pairs, adds the new ones and re-derives the top-k lists.
+
+Run it from this folder:
+    python collaborativeIndex.py            # incremental update
+    python collaborativeIndex.py --full     # rebuild from scratch
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from main_program.liked_songs_store import load_liked_songs
+
+SERVICE_DIR = Path(__file__).resolve().parent
+LIKED_SONGS_DIR = Path(__file__).resolve().parents[2] / "main_program" / \
+    "liked_songs"
+INDEX_PATH = SERVICE_DIR / "collaborative_index.npz"
+
+TOP_K = 50
+# Most recently added songs used per library; bounds the pairs per user
+MAX_ITEMS_PER_USER = 2000
+# Pending pair keys merged into the running counts at this size
+MERGE_EVERY = 5_000_000
+
+
+def item_key(title, artist) -> str:
+    return f"{str(title).casefold()}\x1f{str(artist).casefold()}"
+
+
+# ----------------------------------------------------------------------
+# Reading libraries
+# ----------------------------------------------------------------------
+def list_libraries(directory) -> dict:
+    """{username: mtime} for every library in `directory`."""
+    mtimes = {}
+    if not os.path.isdir(directory):
+        return mtimes
+    for entry in os.scandir(directory):
+        stem, ext = os.path.splitext(entry.name)
+        if ext in (".json", ".journal"):
+            mtime = entry.stat().st_mtime
+            mtimes[stem] = max(mtimes.get(stem, 0.0), mtime)
+    return mtimes
+
+
+def read_library(task):
+    """Worker: (directory, username) -> (username, [(key, title, artist, genre)])."""
+    directory, username = task
+    try:
+        songs = load_liked_songs(username, str(directory), compact=False)
+    except (OSError, ValueError):
+        songs = []
+    items = []
+    for song in songs[-MAX_ITEMS_PER_USER:]:
+        if isinstance(song, dict) and song.get("title") and \
+                song.get("artist"):
+            items.append((item_key(song["title"], song["artist"]),
+                          str(song["title"]), str(song["artist"]),
+                          str(song.get("genre") or "Unknown")))
+    return username, items
+
+
+def _read_all(directory, usernames, workers):
+    tasks = [(str(directory), name) for name in usernames]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(read_library, tasks, chunksize=8)
+    else:
+        yield from map(read_library, tasks)
+
+
+# ----------------------------------------------------------------------
+# Pair counting
+# ----------------------------------------------------------------------
+def pair_keys(ids) -> np.ndarray:
+    """Packed (i << 32) | j keys for every i < j pair of unique ids."""
+    ids = np.unique(ids).astype(np.int64)
+    i, j = np.triu_indices(len(ids), 1)
+    return (ids[i] << 32) | ids[j]
+
+
+def merge_counts(keys, counts, new_keys, new_counts):
+    """Add (new_keys, new_counts) into sorted (keys, counts); drop zeros."""
+    all_keys = np.concatenate([keys, new_keys])
+    if not len(all_keys):
+        return keys, counts
+    merged, inverse = np.unique(all_keys, return_inverse=True)
+    summed = np.bincount(inverse, weights=np.concatenate(
+        [counts, new_counts]), minlength=len(merged))
+    keep = summed > 0
+    return merged[keep], summed[keep].astype(np.int64)
+
+
+class _PairAccumulator:
+    """Collects +1/-1 pair keys and folds them in batches."""
+
+    def __init__(self, keys, counts):
+        self.keys, self.counts = keys, counts
+        self._pending, self._signs, self._size = [], [], 0
+
+    def add(self, ids, sign):
+        keys = pair_keys(ids)
+        if len(keys):
+            self._pending.append(keys)
+            self._signs.append(np.full(len(keys), sign, dtype=np.int64))
+            self._size += len(keys)
+            if self._size >= MERGE_EVERY:
+                self.flush()
+
+    def flush(self):
+        if self._pending:
+            self.keys, self.counts = merge_counts(
+                self.keys, self.counts, np.concatenate(self._pending),
+                np.concatenate(self._signs))
+            self._pending, self._signs, self._size = [], [], 0
+        return self.keys, self.counts
+
+
+def top_k_csr(keys, counts, item_users, k=TOP_K):
+    """
+    Symmetric top-k neighbour lists as CSR arrays (indptr, indices,
+    scores), scored by count / sqrt(users_i * users_j).
+    """
+    n = len(item_users)
+    hi = (keys >> 32).astype(np.int64)
+    lo = (keys & 0xFFFFFFFF).astype(np.int64)
+    rows = np.concatenate([hi, lo])
+    cols = np.concatenate([lo, hi])
+    cnt = np.concatenate([counts, counts]).astype(np.float64)
+    denom = np.sqrt(item_users[rows].astype(np.float64) * item_users[cols])
+    scores = cnt / np.where(denom > 0, denom, 1.0)
+
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    per_row = np.bincount(rows, minlength=n)
+    starts = np.concatenate([[0], np.cumsum(per_row)[:-1]])
+    keep = (np.arange(len(rows)) - starts[rows]) < k
+
+    rows, cols, scores = rows[keep], cols[keep], scores[keep]
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))])
+    return indptr.astype(np.int64), cols.astype(np.int32), \
+        scores.astype(np.float32)
+
+
+# ----------------------------------------------------------------------
+# Build / incremental update
+# ----------------------------------------------------------------------
+def _empty_state() -> dict:
+    return {"items": {}, "titles": [], "artists": [], "genres": [],
+            "pair_keys": np.empty(0, np.int64),
+            "pair_counts": np.empty(0, np.int64),
+            "users": {}}
+
+
+def load_state(path=INDEX_PATH) -> dict:
+    """Load a saved index back into the mutable build state."""
+    data = np.load(path)
+    keys = data["item_keys"].tolist()
+    state = {
+        "items": {key: i for i, key in enumerate(keys)},
+        "titles": data["titles"].tolist(),
+        "artists": data["artists"].tolist(),
+        "genres": data["genres"].tolist(),
+        "pair_keys": data["pair_keys"],
+        "pair_counts": data["pair_counts"],
+        "users": {},
+    }
+    indptr, user_items = data["user_indptr"], data["user_items"]
+    for n, (name, mtime) in enumerate(zip(data["users"].tolist(),
+                                          data["user_mtimes"].tolist())):
+        state["users"][name] = (mtime, user_items[indptr[n]:indptr[n + 1]])
+    return state
+
+
+def save_state(state, path=INDEX_PATH, k=TOP_K):
+    n_items = len(state["titles"])
+    names = sorted(state["users"])
+    user_ids = [state["users"][name][1] for name in names]
+    user_items = np.concatenate(user_ids).astype(np.int32) if user_ids \
+        else np.empty(0, np.int32)
+    user_indptr = np.concatenate(
+        [[0], np.cumsum([len(ids) for ids in user_ids])]).astype(np.int64)
+    item_users = np.bincount(user_items, minlength=n_items)
+    indptr, indices, scores = top_k_csr(state["pair_keys"],
+                                        state["pair_counts"], item_users, k)
+
+    tmp_path = Path(str(path) + ".tmp.npz")
+    np.savez(tmp_path,
+             item_keys=np.array(list(state["items"]), dtype=str),
+             titles=np.array(state["titles"], dtype=str),
+             artists=np.array(state["artists"], dtype=str),
+             genres=np.array(state["genres"], dtype=str),
+             item_users=item_users,
+             pair_keys=state["pair_keys"],
+             pair_counts=state["pair_counts"],
+             indptr=indptr, indices=indices, scores=scores,
+             users=np.array(names, dtype=str),
+             user_mtimes=np.array([state["users"][u][0] for u in names],
+                                  dtype=np.float64),
+             user_indptr=user_indptr, user_items=user_items)
+    os.replace(tmp_path, path)
+
+
+def update_index(liked_dir=LIKED_SONGS_DIR, path=INDEX_PATH, workers=None,
+                 full=False) -> dict:
+    """
+    Bring the index at `path` up to date with the libraries in
+    `liked_dir`, re-reading only changed libraries unless `full`.
+    Returns a summary dict.
+    """
+    start = time.perf_counter()
+    state = load_state(path) if os.path.exists(path) and not full \
+        else _empty_state()
+    current = list_libraries(liked_dir)
+
+    changed = [u for u, mtime in current.items()
+               if u not in state["users"] or state["users"][u][0] != mtime]
+    removed = [u for u in state["users"] if u not in current]
+
+    acc = _PairAccumulator(state["pair_keys"], state["pair_counts"])
+    for username in removed:
+        acc.add(state["users"].pop(username)[1], -1)
+
+    workers = workers or os.cpu_count() or 1
+    for username, items in _read_all(liked_dir, changed, workers):
+        ids = []
+        for key, title, artist, genre in items:
+            item_id = state["items"].get(key)
+            if item_id is None:
+                item_id = state["items"][key] = len(state["titles"])
+                state["titles"].append(title)
+                state["artists"].append(artist)
+                state["genres"].append(genre)
+            ids.append(item_id)
+        ids = np.unique(np.array(ids, dtype=np.int64))
+
+        if username in state["users"]:
+            acc.add(state["users"][username][1], -1)
+        acc.add(ids, +1)
+        state["users"][username] = (current[username], ids)
+
+    state["pair_keys"], state["pair_counts"] = acc.flush()
+    save_state(state, path)
+    return {
+        "users": len(state["users"]),
+        "changed": len(changed),
+        "removed": len(removed),
+        "items": len(state["titles"]),
+        "pairs": int(len(state["pair_keys"])),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# ----------------------------------------------------------------------
+# Serving
+# ----------------------------------------------------------------------
+class CollaborativeModel:
+    """Read-only top-k neighbour lists loaded from a saved index."""
+
+    def __init__(self, path=INDEX_PATH):
+        data = np.load(path)
+        self.titles = data["titles"]
+        self.artists = data["artists"]
+        self.genres = data["genres"]
+        self.indptr = data["indptr"]
+        self.indices = data["indices"]
+        self.scores = data["scores"]
+        self.item_ids = {key: i for i, key in
+                         enumerate(data["item_keys"].tolist())}
+
+    def recommend(self, pairs, n=10) -> list:
+        """
+        Songs most co-liked with the (title, artist) `pairs`, excluding
+        the seeds themselves: neighbour scores are summed across seeds.
+        """
+        seeds = {self.item_ids[item_key(t, a)] for t, a in pairs
+                 if item_key(t, a) in self.item_ids}
+        if not seeds:
+            return []
+        seed_ids = np.fromiter(seeds, dtype=np.int64)
+        starts, ends = self.indptr[seed_ids], self.indptr[seed_ids + 1]
+        if not (ends - starts).sum():
+            return []
+        cols = np.concatenate([self.indices[s:e]
+                               for s, e in zip(starts, ends)])
+        weights = np.concatenate([self.scores[s:e]
+                                  for s, e in zip(starts, ends)])
+
+        items, inverse = np.unique(cols, return_inverse=True)
+        totals = np.bincount(inverse, weights=weights)
+        totals[np.isin(items, seed_ids)] = -np.inf
+
+        top = np.argsort(-totals, kind="stable")[:n]
+        top = top[np.isfinite(totals[top])]
+        return [{"title": str(self.titles[items[i]]),
+                 "artist": str(self.artists[items[i]]),
+                 "genre": str(self.genres[items[i]]),
+                 "score": round(float(totals[i]), 4)} for i in top]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the collaborative filtering index")
+    parser.add_argument("--liked-dir", default=str(LIKED_SONGS_DIR))
+    parser.add_argument("--out", default=str(INDEX_PATH))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes reading libraries (default: CPUs)")
+    parser.add_argument("--full", action="store_true",
+                        help="rebuild instead of updating changed users")
+    args = parser.parse_args()
+
+    summary = update_index(args.liked_dir, args.out, args.workers, args.full)
+    print(f"Indexed {summary['users']} user(s), {summary['items']} song(s), "
+          f"{summary['pairs']} co-liked pair(s); re-read "
+          f"{summary['changed']} library file(s), dropped "
+          f"{summary['removed']} in {summary['seconds']}s.")
+
+
+if __name__ == "__main__":
+    main()
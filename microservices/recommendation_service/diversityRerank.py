@@ -0,0 +1,111 @@
+"""
+Maximal marginal relevance (MMR) re-ranking of recommendation
+candidates.
+
+Greedily picks the candidate with the best
+
+    lambda * relevance - (1 - lambda) * max similarity to those picked
+
+where relevance is popularity scaled to [0, 1] and similarity mixes
+three signals, each in [0, 1]:
+
+- audio features: exp(-d^2 / n_features) over tempo, energy and
+  danceability, standardized against the whole catalog;
+- artist: 1 for the same artist;
+- year: exp(-|year difference| / YEAR_SCALE), 0 when a year is unknown.
+
+Only the running "max similarity to the picks" vector is kept, updated
+with one vectorized row per pick, so k picks from n candidates cost
+O(n k) without an n x n matrix. lambda = 1 is pure relevance, 0 pure
+diversity.
+"""
+import numpy as np
+import pandas as pd
+
+import playlistOrder
+
+DEFAULT_LAMBDA = 0.7
+# Request fields that turn re-ranking on / tune it
+REQUEST_FIELDS = ("diversify", "lambda")
+# Most popular candidates considered for artist and popular requests
+CANDIDATE_POOL = 200
+
+FEATURE_WEIGHT = 0.5
+ARTIST_WEIGHT = 0.3
+YEAR_WEIGHT = 0.2
+YEAR_SCALE = 5.0
+
+
+def parse_lambda(received_data):
+    """
+    The request's MMR lambda, or None if it didn't ask for diversity.
+    Sending "lambda" implies "diversify": true. Raises ValueError.
+    """
+    if not received_data.get("diversify") and "lambda" not in received_data:
+        return None
+    lam = float(received_data.get("lambda", DEFAULT_LAMBDA))
+    if not 0.0 <= lam <= 1.0:
+        raise ValueError("'lambda' must be between 0 and 1")
+    return lam
+
+
+def candidate_arrays(df, positions, artists):
+    """
+    (features, artist_codes, years) for candidates at `positions` in
+    `df` (songRecommenderKNN.df_features). Positions of -1 (not in the
+    catalog) get the catalog-mean features and an unknown year.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    known = positions >= 0
+    safe = np.where(known, positions, 0)
+
+    features = playlistOrder.standardized_features(df, safe)
+    features[~known] = 0.0
+    years = pd.to_numeric(df["year"].to_numpy()[safe], errors="coerce")
+    years = np.where(known, np.nan_to_num(years, nan=-1), -1)
+    codes, _ = pd.factorize(pd.Series(artists, dtype=str).str.casefold())
+    return features, codes, years.astype(np.float64)
+
+
+def similarity_to(i, features, artist_codes, years) -> np.ndarray:
+    """Similarity of every candidate to candidate `i`."""
+    d2 = ((features - features[i]) ** 2).sum(axis=1)
+    sim = FEATURE_WEIGHT * np.exp(-d2 / features.shape[1])
+    sim += ARTIST_WEIGHT * (artist_codes == artist_codes[i])
+    if years[i] >= 0:
+        sim += YEAR_WEIGHT * np.where(
+            years >= 0, np.exp(-np.abs(years - years[i]) / YEAR_SCALE), 0.0)
+    return sim / (FEATURE_WEIGHT + ARTIST_WEIGHT + YEAR_WEIGHT)
+
+
+def mmr_order(relevance, features, artist_codes, years, k,
+              lam=DEFAULT_LAMBDA) -> np.ndarray:
+    """Indexes of the `k` candidates picked by MMR, in pick order."""
+    relevance = np.asarray(relevance, dtype=np.float64)
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 \
+        else np.ones(n)
+
+    picked = np.empty(k, dtype=np.int64)
+    max_sim = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    for step in range(k):
+        score = lam * relevance - (1.0 - lam) * max_sim
+        score[~available] = -np.inf
+        i = int(np.argmax(score))
+        picked[step] = i
+        available[i] = False
+        np.maximum(max_sim, similarity_to(i, features, artist_codes, years),
+                   out=max_sim)
+    return picked
+
+
+def rerank(df, positions, artists, relevance, k, lam=DEFAULT_LAMBDA):
+    """MMR order (indexes into the candidate arrays) for `k` picks."""
+    features, codes, years = candidate_arrays(df, positions, artists)
+    return mmr_order(relevance, features, codes, years, k, lam)
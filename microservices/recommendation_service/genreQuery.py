@@ -2,14 +2,17 @@ import sqlite3
 import io
 import os
 
+# Database files live next to this module, whatever the working directory
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 def createConnection():
     """
     Create a database if not already created, restore from backup
     if needed
     """
-    db_file = 'songsData.db'
-    backup_file = 'songsData_dump.sql'
+    db_file = os.path.join(SERVICE_DIR, 'songsData.db')
+    backup_file = os.path.join(SERVICE_DIR, 'songsData_dump.sql')
     
     # Check if database file exists
     if not os.path.exists(db_file) and os.path.exists(backup_file):
@@ -69,6 +72,22 @@ def returnByGenre(connection, genre, table="songs"):
     return result_arr
 
 
+def returnGenreCandidates(connection, genre, limit=200, table="songs"):
+    """
+    Return the `limit` most popular rows for a genre, without the
+    random pick, so the candidate slice can be cached by the server.
+    """
+    cur = connection.cursor()
+    cur.execute(f"""
+    SELECT *
+    FROM {table}
+    WHERE genre = ?
+    ORDER BY popularity DESC
+    LIMIT ?;
+        """, (genre, limit))
+    return list(cur.fetchall())
+
+
 def formartDict(connection, arr):
     result = []
     for row in arr:
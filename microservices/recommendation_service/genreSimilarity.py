@@ -0,0 +1,175 @@
+"""
+Genre centroids, a genre-by-genre similarity matrix and adjacent-genre
+recommendations.
+
+Each genre's centroid is the mean of its songs' tempo, energy,
+danceability and popularity, standardized against the whole catalog
+(one np.bincount per feature). Similarity is the cosine between
+centroids. Both are saved to genre_similarity.npz with a fingerprint of
+the table they came from, so a restart with the same dataset reads them
+back instead of recomputing.
+
+`recommend_adjacent_genres` takes the requested genre plus its k most
+similar genres and splits the requested number of songs between them in
+proportion to similarity (largest remainder), sampling each genre's
+share from its most popular songs.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from microservices.common.wire import column_records
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(SERVICE_DIR, "genre_similarity.npz")
+
+CENTROID_FEATURES = ["tempo", "energy", "danceability", "popularity"]
+DEFAULT_K = 3
+DEFAULT_COUNT = 10
+# Each genre's share is sampled from this many of its most popular songs
+GENRE_CANDIDATES = 200
+
+RECORD_FIELDS = {
+    "title": "track_name",
+    "artist": "artist_name",
+    "genre": "genre",
+    "popularity": "popularity",
+}
+
+# (DataFrame, model dict) for the table the model belongs to
+_model = None
+
+
+def fingerprint(df) -> np.ndarray:
+    """Cheap identity of a catalog: row count and per-feature sums."""
+    values = df[CENTROID_FEATURES].to_numpy(np.float64)
+    return np.concatenate([[len(df)], values.sum(axis=0)])
+
+
+def compute_centroids(df):
+    """(genres, centroids, counts) with standardized feature centroids."""
+    codes, genres = pd.factorize(df["genre"].astype(str))
+    values = df[CENTROID_FEATURES].to_numpy(np.float64)
+    std = values.std(axis=0)
+    values = (values - values.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+    counts = np.bincount(codes, minlength=len(genres))
+    centroids = np.column_stack([
+        np.bincount(codes, weights=values[:, j], minlength=len(genres))
+        for j in range(values.shape[1])]) / np.maximum(counts, 1)[:, None]
+    return np.asarray(genres, dtype=str), centroids, counts
+
+
+def similarity_matrix(centroids) -> np.ndarray:
+    """Cosine similarity between every pair of centroids."""
+    norms = np.linalg.norm(centroids, axis=1)
+    unit = centroids / np.where(norms > 0, norms, 1.0)[:, None]
+    return np.clip(unit @ unit.T, -1.0, 1.0)
+
+
+def _genre_rows(df, genres):
+    """
+    CSR-style (indptr, rows): each genre's row positions, most popular
+    first, as one lexsort over the whole table.
+    """
+    index = {genre: i for i, genre in enumerate(genres)}
+    codes = df["genre"].astype(str).map(index).fillna(-1) \
+        .to_numpy(np.int64)
+    popularity = pd.to_numeric(df["popularity"],
+                               errors="coerce").fillna(0).to_numpy()
+    known = np.flatnonzero(codes >= 0)
+    rows = known[np.lexsort((-popularity[known], codes[known]))]
+    indptr = np.concatenate(
+        [[0], np.cumsum(np.bincount(codes[known], minlength=len(genres)))])
+    return indptr, rows
+
+
+def load(df, path=CACHE_PATH) -> dict:
+    """
+    The genre model for `df`: read from `path` if it was saved for the
+    same table, otherwise computed and saved there.
+    """
+    global _model
+    if _model is not None and _model[0] is df:
+        return _model[1]
+
+    stamp = fingerprint(df)
+    model = None
+    if os.path.exists(path):
+        data = np.load(path)
+        if data["fingerprint"].shape == stamp.shape and \
+                np.allclose(data["fingerprint"], stamp):
+            model = {name: data[name] for name in
+                     ("genres", "centroids", "counts", "similarity")}
+    if model is None:
+        genres, centroids, counts = compute_centroids(df)
+        model = {"genres": genres, "centroids": centroids, "counts": counts,
+                 "similarity": similarity_matrix(centroids)}
+        try:
+            np.savez(path, fingerprint=stamp, **model)
+        except OSError as e:
+            print(f"Could not cache genre similarity: {e}")
+
+    model["index"] = {str(g).casefold(): i
+                      for i, g in enumerate(model["genres"])}
+    model["indptr"], model["rows"] = _genre_rows(df, model["genres"])
+    _model = (df, model)
+    return model
+
+
+def nearest_genres(model, genre, k=DEFAULT_K):
+    """
+    [(genre_index, similarity)] for `genre` followed by its `k` most
+    similar genres, or [] if the genre is unknown.
+    """
+    g = model["index"].get(str(genre).casefold())
+    if g is None:
+        return []
+    sims = model["similarity"][g].copy()
+    sims[g] = -np.inf
+    k = min(k, len(sims) - 1)
+    nearest = np.argsort(-sims, kind="stable")[:k] if k > 0 else []
+    return [(g, 1.0)] + [(int(i), float(sims[i])) for i in nearest]
+
+
+def allocate(weights, total) -> np.ndarray:
+    """Split `total` picks in proportion to `weights` (largest remainder)."""
+    weights = np.clip(np.asarray(weights, dtype=np.float64), 0, None)
+    if not weights.sum():
+        weights = np.ones(len(weights))
+    exact = weights / weights.sum() * total
+    counts = np.floor(exact).astype(np.int64)
+    short = total - counts.sum()
+    counts[np.argsort(-(exact - counts), kind="stable")[:short]] += 1
+    return counts
+
+
+def recommend_adjacent_genres(df, model, genre, k=DEFAULT_K,
+                              count=DEFAULT_COUNT, seed=None) -> dict:
+    """Songs from `genre` and its k nearest genres; `model` from load(df)."""
+    neighbours = nearest_genres(model, genre, k)
+    if not neighbours:
+        return {"recommendations": [], "genres": [],
+                "note": f"Unknown genre '{genre}'"}
+
+    indexes = np.array([g for g, _ in neighbours])
+    sims = np.array([s for _, s in neighbours])
+    picks = allocate(sims, count)
+    rng = np.random.default_rng(seed)
+
+    chosen, genres = [], []
+    for g, sim, n in zip(indexes, sims, picks):
+        start, end = model["indptr"][g], model["indptr"][g + 1]
+        pool = model["rows"][start:min(end, start + GENRE_CANDIDATES)]
+        n = min(int(n), len(pool))
+        chosen.append(rng.choice(pool, n, replace=False))
+        genres.append({"genre": str(model["genres"][g]),
+                       "similarity": round(float(sim), 4), "picks": n})
+
+    rows = np.concatenate(chosen) if chosen else np.empty(0, np.int64)
+    return {
+        "recommendations": column_records(df.iloc[rows], RECORD_FIELDS,
+                                          ints=("popularity",)),
+        "genres": genres,
+    }
@@ -0,0 +1,195 @@
+"""
+Target-duration playlist generator.
+
+Builds a playlist whose summed duration_ms lands within a tolerance of
+a target ("90 minutes of indie from the 2010s"). The catalog's genre,
+year, duration and popularity columns are kept as NumPy arrays, so
+filtering is a handful of vectorized comparisons. Selection is
+greedy-with-repair:
+
+1. shuffle the matching tracks and take the longest prefix whose
+   cumulative duration stays within target + tolerance (one cumsum and
+   one searchsorted);
+2. while the total is outside the tolerance, apply the single add,
+   remove or swap that brings it closest to the target. The best swap
+   comes from a binary search of the sorted unselected durations for
+   every selected track.
+
+Repair stops when the total is within tolerance, when no move improves
+it, or when the latency budget runs out. The response reports how close
+it got.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from microservices.common.wire import column_records
+
+DEFAULT_TOLERANCE_SECONDS = 60
+DEFAULT_BUDGET_MS = 250
+MAX_BUDGET_MS = 2000
+
+# Cap on shuffled candidates considered per request, to bound the work
+MAX_CANDIDATES = 20000
+
+PLAYLIST_FIELDS = {
+    "title": "track_name",
+    "artist": "artist_name",
+    "genre": "genre",
+    "year": "year",
+    "duration_ms": "duration_ms",
+    "popularity": "popularity",
+}
+
+# (DataFrame, arrays) for the table the arrays were built from
+_catalog = None
+
+
+def warm_up(df):
+    """Build the catalog arrays ahead of the first request."""
+    _get_catalog(df)
+
+
+def _get_catalog(df) -> dict:
+    """NumPy views of the columns used for filtering, built once per table."""
+    global _catalog
+    if _catalog is None or _catalog[0] is not df:
+        codes, genres = pd.factorize(df["genre"].astype(str).str.casefold())
+        _catalog = (df, {
+            "genre_codes": codes,
+            "genre_index": {genre: i for i, genre in enumerate(genres)},
+            "year": pd.to_numeric(df["year"], errors="coerce")
+                      .fillna(-1).to_numpy(np.int64),
+            "duration": pd.to_numeric(df["duration_ms"], errors="coerce")
+                          .fillna(0).to_numpy(np.int64),
+            "popularity": pd.to_numeric(df["popularity"], errors="coerce")
+                            .fillna(0).to_numpy(np.float64),
+        })
+    return _catalog[1]
+
+
+def select_candidates(catalog, genre=None, year_from=None, year_to=None,
+                      min_popularity=None) -> np.ndarray:
+    """Row positions of tracks that pass every given filter."""
+    mask = catalog["duration"] > 0
+    if genre:
+        code = catalog["genre_index"].get(str(genre).casefold())
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        mask &= catalog["genre_codes"] == code
+    if year_from is not None:
+        mask &= catalog["year"] >= int(year_from)
+    if year_to is not None:
+        mask &= catalog["year"] <= int(year_to)
+    if min_popularity is not None:
+        mask &= catalog["popularity"] >= float(min_popularity)
+    return np.flatnonzero(mask)
+
+
+def _best_move(durations, selected, gap):
+    """
+    The add, remove or swap that leaves the smallest |gap|, as
+    (new_abs_gap, kind, i, j), or None if nothing beats the current gap.
+    `gap` is target - total.
+    """
+    best = None
+    sel = np.flatnonzero(selected)
+    uns = np.flatnonzero(~selected)
+
+    if len(uns):
+        j = uns[np.argmin(np.abs(durations[uns] - gap))]
+        best = (abs(gap - durations[j]), "add", None, j)
+    if len(sel):
+        i = sel[np.argmin(np.abs(durations[sel] + gap))]
+        candidate = (abs(gap + durations[i]), "remove", i, None)
+        if best is None or candidate[0] < best[0]:
+            best = candidate
+    if len(sel) and len(uns):
+        # Swapping i out for j changes the total by d[j] - d[i]; look up
+        # the unselected duration nearest d[i] + gap for every i at once
+        order = uns[np.argsort(durations[uns], kind="stable")]
+        sorted_d = durations[order]
+        want = durations[sel] + gap
+        hi = np.clip(np.searchsorted(sorted_d, want), 0, len(order) - 1)
+        lo = np.clip(hi - 1, 0, len(order) - 1)
+        pick = np.where(np.abs(sorted_d[lo] - want) <=
+                        np.abs(sorted_d[hi] - want), lo, hi)
+        residual = np.abs(want - sorted_d[pick])
+        k = int(np.argmin(residual))
+        candidate = (residual[k], "swap", sel[k], order[pick[k]])
+        if best is None or candidate[0] < best[0]:
+            best = candidate
+
+    if best is None or best[0] >= abs(gap):
+        return None
+    return best
+
+
+def fill_to_target(durations, target_ms, tolerance_ms, rng, deadline):
+    """
+    Choose positions in `durations` summing to about `target_ms`.
+    Returns the chosen positions in playlist order.
+    """
+    order = rng.permutation(len(durations))[:MAX_CANDIDATES]
+    d = durations[order]
+
+    cumulative = np.cumsum(d)
+    k = int(np.searchsorted(cumulative, target_ms + tolerance_ms,
+                            side="right"))
+    selected = np.zeros(len(order), dtype=bool)
+    selected[:k] = True
+    gap = target_ms - (int(cumulative[k - 1]) if k else 0)
+
+    while abs(gap) > tolerance_ms and time.perf_counter() < deadline:
+        move = _best_move(d, selected, gap)
+        if move is None:
+            break
+        _, kind, i, j = move
+        if i is not None:
+            selected[i] = False
+            gap += int(d[i])
+        if j is not None:
+            selected[j] = True
+            gap -= int(d[j])
+
+    return order[selected]
+
+
+def generate_playlist(df, target_ms, tolerance_ms=None, genre=None,
+                      year_from=None, year_to=None, min_popularity=None,
+                      budget_ms=DEFAULT_BUDGET_MS, seed=None) -> dict:
+    """Build a playlist from `df` (songRecommenderKNN.df_features)."""
+    start = time.perf_counter()
+    if tolerance_ms is None:
+        tolerance_ms = DEFAULT_TOLERANCE_SECONDS * 1000
+    budget_ms = min(max(budget_ms, 1), MAX_BUDGET_MS)
+
+    # The one-off array build isn't charged to the search budget
+    catalog = _get_catalog(df)
+    deadline = time.perf_counter() + budget_ms / 1000
+    rows = select_candidates(catalog, genre, year_from, year_to,
+                             min_popularity)
+    rng = np.random.default_rng(seed)
+
+    if len(rows):
+        chosen = rows[fill_to_target(catalog["duration"][rows], target_ms,
+                                     tolerance_ms, rng, deadline)]
+    else:
+        chosen = rows
+    total_ms = int(catalog["duration"][chosen].sum())
+
+    response = {
+        "playlist": column_records(df.iloc[chosen], PLAYLIST_FIELDS,
+                                   ints=("year", "duration_ms",
+                                         "popularity")),
+        "target_ms": int(target_ms),
+        "total_ms": total_ms,
+        "difference_ms": total_ms - int(target_ms),
+        "within_tolerance": abs(total_ms - target_ms) <= tolerance_ms,
+        "candidates": int(len(rows)),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    if not len(rows):
+        response["note"] = "No songs match the requested filters."
+    return response
@@ -0,0 +1,129 @@
+"""
+Smooth-transition playlist ordering.
+
+Orders a list of tracks so consecutive songs are close in tempo, energy
+and danceability, treating it as an open travelling-salesman path over
+the features standardized against the whole catalog:
+
+1. nearest neighbour from the first track (keeps the user's opener);
+2. 2-opt: for each edge, compute the gain of reversing the path segment
+   after it against every later edge in one vectorized expression, and
+   apply the best reversal. Passes repeat until nothing improves or the
+   time budget runs out.
+
+All distances come from a single n x n matrix, so ordering 1,000 tracks
+takes tens of milliseconds.
+"""
+import time
+
+import numpy as np
+
+ORDER_FEATURES = ["tempo", "energy", "danceability"]
+DEFAULT_BUDGET_MS = 500
+MAX_BUDGET_MS = 5000
+# The distance matrix is n x n float64 (32 MB at this size)
+MAX_TRACKS = 2000
+
+# (DataFrame, values, mean, std) for the table the arrays came from
+_features = None
+
+
+def _feature_arrays(df):
+    global _features
+    if _features is None or _features[0] is not df:
+        values = df[ORDER_FEATURES].to_numpy(np.float64)
+        std = values.std(axis=0)
+        _features = (df, values, values.mean(axis=0),
+                     np.where(std > 0, std, 1.0))
+    return _features[1:]
+
+
+def feature_values(df, positions) -> np.ndarray:
+    """Raw ORDER_FEATURES values for catalog rows `positions`."""
+    return _feature_arrays(df)[0][positions]
+
+
+def standardized_features(df, positions) -> np.ndarray:
+    values, mean, std = _feature_arrays(df)
+    return (values[positions] - mean) / std
+
+
+def distance_matrix(points) -> np.ndarray:
+    """Pairwise Euclidean distances via |x|^2 + |y|^2 - 2 x.y."""
+    sq = (points * points).sum(axis=1)
+    d2 = sq[:, None] + sq[None, :] - 2.0 * (points @ points.T)
+    np.maximum(d2, 0.0, out=d2)
+    return np.sqrt(d2, out=d2)
+
+
+def path_cost(dist, path) -> float:
+    return float(dist[path[:-1], path[1:]].sum())
+
+
+def nearest_neighbour_path(dist, start=0) -> np.ndarray:
+    n = len(dist)
+    path = np.empty(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=bool)
+    current = start
+    for step in range(n):
+        path[step] = current
+        visited[current] = True
+        if step == n - 1:
+            break
+        row = np.where(visited, np.inf, dist[current])
+        current = int(np.argmin(row))
+    return path
+
+
+def two_opt(dist, path, deadline) -> np.ndarray:
+    """
+    Improve an open path by segment reversals; the first track stays
+    first. Reversing path[i+1..j] replaces edges (i, i+1) and (j, j+1)
+    with (i, j) and (i+1, j+1); when j is the last position there is no
+    (j, j+1) edge.
+    """
+    path = path.copy()
+    n = len(path)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(n - 2):
+            a, b = path[i], path[i + 1]
+            js = np.arange(i + 2, n)
+            c = path[js]
+            nxt = np.append(path[i + 3:], -1)  # path[j+1], -1 past the end
+            has_next = nxt >= 0
+            nxt_safe = np.where(has_next, nxt, 0)
+
+            gain = dist[a, b] - dist[a, c]
+            gain += np.where(has_next,
+                             dist[c, nxt_safe] - dist[b, nxt_safe], 0.0)
+            k = int(np.argmax(gain))
+            if gain[k] > 1e-12:
+                j = js[k]
+                path[i + 1:j + 1] = path[i + 1:j + 1][::-1]
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return path
+
+
+def order_tracks(df, positions, budget_ms=DEFAULT_BUDGET_MS):
+    """
+    Order the catalog rows `positions` (positions in `df`) for smooth
+    transitions. Returns (order, cost_before, cost_after), where `order`
+    indexes into `positions`.
+    """
+    start = time.perf_counter()
+    budget_ms = min(max(budget_ms, 1), MAX_BUDGET_MS)
+    deadline = start + budget_ms / 1000
+
+    dist = distance_matrix(standardized_features(df, positions))
+    identity = np.arange(len(positions))
+    cost_before = path_cost(dist, identity)
+    if len(positions) < 3:
+        # nothing to reorder: the opener stays first
+        return identity, cost_before, cost_before
+
+    path = two_opt(dist, nearest_neighbour_path(dist), deadline)
+    return path, cost_before, path_cost(dist, path)
@@ -0,0 +1,270 @@
+"""
+Nightly precomputed recommendations for every user.
+
+Walks main_program/liked_songs/, and for each user whose library
+changed since the last run computes, on a process pool:
+
+- "artist":  the most popular unliked songs by the user's top artists;
+- "genre":   the most popular unliked songs in the user's top genres;
+- "profile": the unliked songs nearest the centroid of the library's
+  tempo / energy / danceability (standardized against the catalog).
+
+Each worker loads the catalog once and keeps its arrays (popularity
+order, artist and genre codes, standardized features), so every user
+costs a few vectorized passes over them. Results go to a small SQLite
+store, one row per user holding the library mtime it was computed from
+and a zlib-compressed JSON payload. The recommendation server answers
+`recommend_for_user` from that row without touching the catalog.
+
+Run it from this folder (e.g. nightly from cron):
+    python precomputeRecommendations.py           # changed users only
+    python precomputeRecommendations.py --full    # everyone
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from main_program.liked_songs_store import load_liked_songs
+from microservices.common.wire import column_records
+import collaborativeIndex
+import playlistOrder
+import songRecommenderKNN
+
+STORE_PATH = collaborativeIndex.SERVICE_DIR / "precomputed.db"
+KINDS = ("artist", "genre", "profile")
+
+PICKS = 10
+TOP_ARTISTS = 3
+TOP_GENRES = 3
+
+# Catalog arrays for this process; built by _init_worker()
+_catalog = None
+
+
+# ----------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------
+def open_store(path=STORE_PATH) -> sqlite3.Connection:
+    connection = sqlite3.connect(str(path))
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS user_recommendations (
+            username TEXT PRIMARY KEY,
+            library_mtime REAL NOT NULL,
+            computed_at REAL NOT NULL,
+            payload BLOB NOT NULL
+        )""")
+    return connection
+
+
+def _pack(payload) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(",", ":"),
+                                    ensure_ascii=False).encode("utf-8"))
+
+
+def load_recommendations(username, path=STORE_PATH):
+    """The stored row for `username` as a dict, or None."""
+    if not os.path.exists(path):
+        return None
+    connection = sqlite3.connect(str(path))
+    try:
+        row = connection.execute(
+            "SELECT library_mtime, computed_at, payload "
+            "FROM user_recommendations WHERE username = ?",
+            (username,)).fetchone()
+    finally:
+        connection.close()
+    if row is None:
+        return None
+    return {"library_mtime": row[0], "computed_at": row[1],
+            "recommendations": json.loads(zlib.decompress(row[2]))}
+
+
+def library_mtime(username, directory=collaborativeIndex.LIKED_SONGS_DIR):
+    """Latest mtime of the user's snapshot and journal, or None."""
+    mtimes = []
+    for ext in (".json", ".journal"):
+        try:
+            mtimes.append(os.path.getmtime(
+                os.path.join(directory, username + ext)))
+        except OSError:
+            pass
+    return max(mtimes) if mtimes else None
+
+
+# ----------------------------------------------------------------------
+# Per-user computation (runs in the pool workers)
+# ----------------------------------------------------------------------
+def _init_worker(df=None):
+    """Load the catalog (or use `df`) and build its arrays once."""
+    global _catalog
+    df_features = songRecommenderKNN.load_dataset(df)
+    songRecommenderKNN.track_positions([])
+    artist_codes, artists = pd.factorize(
+        df_features["artist_name"].astype(str).str.casefold())
+    genre_codes, genres = pd.factorize(
+        df_features["genre"].astype(str).str.casefold())
+    popularity = pd.to_numeric(df_features["popularity"],
+                               errors="coerce").fillna(0).to_numpy()
+    _catalog = {
+        "df": df_features,
+        "pop_order": np.argsort(-popularity, kind="stable"),
+        "artist_codes": artist_codes, "artists": artists,
+        "genre_codes": genre_codes, "genres": genres,
+        "features": playlistOrder.standardized_features(
+            df_features, np.arange(len(df_features))),
+    }
+
+
+def _records(positions) -> list:
+    return column_records(_catalog["df"].iloc[positions],
+                          songRecommenderKNN.RECORD_FIELDS,
+                          ints=("popularity",))
+
+
+def _popular_matching(codes, wanted, liked, n) -> np.ndarray:
+    """The `n` most popular unliked rows whose code is in `wanted`."""
+    order = _catalog["pop_order"]
+    if not len(wanted):
+        return order[:0]
+    mask = np.isin(codes[order], wanted) & ~liked[order]
+    return order[mask][:n]
+
+
+def _top_codes(values, index, k) -> np.ndarray:
+    top = [value for value, _ in Counter(values).most_common(k)]
+    codes = index.get_indexer(top) if top else np.empty(0, np.int64)
+    return codes[codes >= 0]
+
+
+def recommend_for_library(songs, n=PICKS) -> dict:
+    """{kind: [records]} for one library; _init_worker() must have run."""
+    songs = [s for s in songs if s.get("title") and s.get("artist")]
+    n_rows = len(_catalog["df"])
+    positions = songRecommenderKNN.track_positions(
+        [(s["title"], s["artist"]) for s in songs])
+    liked_rows = positions[positions >= 0]
+    liked = np.zeros(n_rows, dtype=bool)
+    liked[liked_rows] = True
+
+    artists = _top_codes([str(s["artist"]).casefold() for s in songs],
+                         _catalog["artists"], TOP_ARTISTS)
+    genres = _top_codes(
+        [str(s.get("genre")).casefold() for s in songs
+         if s.get("genre") not in (None, "", "Unknown")],
+        _catalog["genres"], TOP_GENRES)
+
+    if len(liked_rows):
+        features = _catalog["features"]
+        centroid = features[liked_rows].mean(axis=0)
+        dist = ((features - centroid) ** 2).sum(axis=1)
+        dist[liked] = np.inf
+        k = min(n, n_rows - int(liked.sum()))
+        nearest = np.argpartition(dist, k - 1)[:k] if k > 0 \
+            else np.empty(0, np.int64)
+        profile = nearest[np.argsort(dist[nearest], kind="stable")]
+    else:
+        profile = np.empty(0, np.int64)
+
+    return {
+        "artist": _records(_popular_matching(
+            _catalog["artist_codes"], artists, liked, n)),
+        "genre": _records(_popular_matching(
+            _catalog["genre_codes"], genres, liked, n)),
+        "profile": _records(profile),
+    }
+
+
+def _compute_user(task):
+    directory, username = task
+    try:
+        songs = load_liked_songs(username, directory, compact=False)
+    except (OSError, ValueError):
+        songs = []
+    return username, recommend_for_library(songs)
+
+
+# ----------------------------------------------------------------------
+# Job
+# ----------------------------------------------------------------------
+def precompute(liked_dir=collaborativeIndex.LIKED_SONGS_DIR,
+               path=STORE_PATH, df=None, workers=None, full=False) -> dict:
+    """
+    Recompute the store for users whose library changed (all users if
+    `full`) and drop users whose library is gone. Returns a summary.
+    """
+    start = time.perf_counter()
+    current = collaborativeIndex.list_libraries(liked_dir)
+    connection = open_store(path)
+    try:
+        stored = dict(connection.execute(
+            "SELECT username, library_mtime FROM user_recommendations"))
+        changed = sorted(u for u, mtime in current.items()
+                         if full or stored.get(u) != mtime)
+        removed = [u for u in stored if u not in current]
+        connection.executemany(
+            "DELETE FROM user_recommendations WHERE username = ?",
+            [(u,) for u in removed])
+
+        tasks = [(str(liked_dir), u) for u in changed]
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(tasks) > 1:
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_init_worker,
+                                       initargs=(df,))
+            results = pool.map(_compute_user, tasks, chunksize=4)
+        else:
+            pool = None
+            if tasks:
+                _init_worker(df)
+            results = map(_compute_user, tasks)
+
+        try:
+            for username, payload in results:
+                connection.execute(
+                    "INSERT OR REPLACE INTO user_recommendations "
+                    "VALUES (?, ?, ?, ?)",
+                    (username, current[username], time.time(),
+                     _pack(payload)))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        connection.commit()
+    finally:
+        connection.close()
+    return {"users": len(current), "computed": len(changed),
+            "removed": len(removed),
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute recommendations for every user")
+    parser.add_argument("--liked-dir",
+                        default=str(collaborativeIndex.LIKED_SONGS_DIR))
+    parser.add_argument("--store", default=str(STORE_PATH))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPUs)")
+    parser.add_argument("--full", action="store_true",
+                        help="recompute every user, not just changed ones")
+    args = parser.parse_args()
+
+    summary = precompute(args.liked_dir, args.store, workers=args.workers,
+                         full=args.full)
+    print(f"Computed recommendations for {summary['computed']} of "
+          f"{summary['users']} user(s), dropped {summary['removed']} "
+          f"in {summary['seconds']}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Bounded LRU response cache with optional TTL for the recommendation
+server. Keys are built from the normalized request payload so that
+equivalent requests ("Adele", " adele ") share one entry.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Fields matched case-insensitively by the recommenders
+CASE_INSENSITIVE_FIELDS = ("artist",)
+
+
+def make_key(payload: dict) -> str:
+    """
+    Build a canonical cache key from a request payload. Strings are
+    stripped, case-insensitive fields are lowercased and keys are sorted.
+    """
+    normalized = {}
+    for field, value in payload.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if field in CASE_INSENSITIVE_FIELDS:
+                value = value.lower()
+        normalized[field] = value
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache. Entries older than `ttl_seconds` are treated
+    as misses; `ttl_seconds=None` keeps entries until they are evicted.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if (self.ttl_seconds is not None and
+                    time.monotonic() - stored_at > self.ttl_seconds):
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store `value`, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
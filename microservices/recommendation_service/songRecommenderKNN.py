@@ -1,61 +1,179 @@
+import os
+import numpy as np
 import pandas as pd
+from dataset_service.track_table import assign_track_ids
+from microservices.common.wire import column_records
 
-# Load and clean Spotify one million songs dataset
-df = pd.read_csv('../../data/spotify_data.csv')
-df_cleaned = df.dropna()
+import diversityRerank
 
-# Extract features of interest for recommendations
-df_features = df_cleaned[
-    ['artist_name',
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "..", "..", "data", "spotify_data.csv")
+
+# Features of interest for recommendations
+FEATURE_COLUMNS = [
+    'artist_name',
     'track_name',
     'genre',
     'popularity',
     'tempo',
     'danceability',
-    'energy']].copy()
+    'energy',
+    'year',
+    'duration_ms']
+
+# Cleaned feature table; populated by load_dataset()
+df_features = None
+
+# Casefolded "title<US>artist" keys of df_features, for bulk lookups
+_track_keys = None
+
+# Dataset track id -> df_features position, for id lookups
+_id_positions = None
+
+
+def load_dataset(df=None):
+    """
+    Load and clean the Spotify one million songs dataset. Pass an
+    already loaded DataFrame to share it instead of reading the CSV.
+
+    Track ids are assigned on the full table, the same one the CLI's
+    TrackTable numbers, and kept in a "track_id" column: rows dropped
+    for missing features must not shift the ids of the rows after them.
+    """
+    global df_features, _track_keys, _id_positions
+    if df is None:
+        df = pd.read_csv(DATA_PATH)
+    df_features = df[FEATURE_COLUMNS].assign(
+        track_id=assign_track_ids(df)).dropna().copy()
+    _track_keys = None
+    _id_positions = None
+    return df_features
+
+
+def _key_strings(titles, artists) -> pd.Index:
+    return pd.Index(pd.Series(titles, dtype=str).str.casefold() + "\x1f" +
+                    pd.Series(artists, dtype=str).str.casefold())
+
+
+def track_positions(pairs) -> np.ndarray:
+    """
+    Row positions in df_features of (title, artist) pairs, matched
+    case-insensitively (first row wins on duplicates); -1 where a pair
+    isn't in the catalog. All pairs are resolved in one vectorized call.
+    """
+    global _track_keys
+    if _track_keys is None:
+        keys = _key_strings(df_features["track_name"].to_numpy(),
+                            df_features["artist_name"].to_numpy())
+        first = ~keys.duplicated()
+        _track_keys = (pd.Index(keys[first]), np.flatnonzero(first))
+    if not pairs:
+        return np.empty(0, dtype=np.int64)
+    unique_keys, positions = _track_keys
+    titles, artists = zip(*pairs)
+    found = unique_keys.get_indexer(_key_strings(titles, artists))
+    return np.where(found >= 0, positions[found], -1)
+
+
+def id_positions(track_ids) -> np.ndarray:
+    """
+    Row positions in df_features of dataset track ids (see
+    dataset_service.track_table), by array indexing; -1 where an id
+    isn't in the table.
+    """
+    global _id_positions
+    if _id_positions is None:
+        ids = df_features["track_id"].to_numpy()
+        _id_positions = np.full(int(ids.max()) + 1 if len(ids) else 0, -1,
+                                dtype=np.int64)
+        first = ~pd.Index(ids).duplicated()  # first row of a track wins
+        _id_positions[ids[first]] = np.flatnonzero(first)
+    track_ids = np.asarray(track_ids, dtype=np.int64)
+    valid = (track_ids >= 0) & (track_ids < len(_id_positions))
+    positions = np.full(track_ids.shape, -1, dtype=np.int64)
+    positions[valid] = _id_positions[track_ids[valid]]
+    return positions
 
 
-def get_more_songs_by_artist(artist_name, max_results=5):
+def positions_for_tracks(tracks) -> np.ndarray:
+    """
+    Positions of {"title", "artist"} dicts in df_features, using each
+    dict's "track_id" when it has one and the title/artist key otherwise.
+    """
+    has_id = np.array([isinstance(t.get("track_id"), int) for t in tracks],
+                      dtype=bool)
+    positions = np.full(len(tracks), -1, dtype=np.int64)
+    if has_id.any():
+        positions[has_id] = id_positions(
+            [t["track_id"] for t, flag in zip(tracks, has_id) if flag])
+    by_key = np.flatnonzero(~has_id)
+    if len(by_key):
+        positions[by_key] = track_positions(
+            [(tracks[i]["title"], tracks[i]["artist"]) for i in by_key])
+    return positions
+
+
+# Output key -> dataframe column for recommendation records
+RECORD_FIELDS = {
+    "title": "track_name",
+    "artist": "artist_name",
+    "genre": "genre",
+    "popularity": "popularity",
+}
+
+
+def _to_records(frame):
+    """Recommendation dicts built column-wise from a slice of df_features."""
+    return column_records(frame, RECORD_FIELDS, ints=("popularity",))
+
+
+def _diversified(positions, n, lam):
+    """
+    MMR-reranked records for the CANDIDATE_POOL most popular of
+    `positions` (row positions in df_features).
+    """
+    popularity = df_features["popularity"].to_numpy()[positions]
+    pool = positions[np.argsort(-popularity, kind="stable")
+                     [:diversityRerank.CANDIDATE_POOL]]
+    order = diversityRerank.rerank(
+        df_features, pool, df_features["artist_name"].to_numpy()[pool],
+        df_features["popularity"].to_numpy()[pool], n, lam)
+    return _to_records(df_features.iloc[pool[order]])
+
+
+def get_more_songs_by_artist(artist_name, max_results=5, diversity=None):
     """
     Return up to `max_results` songs by the same artist.
-    Only matches exact artist names (case-insensitive).
+    Only matches exact artist names, ignoring case and surrounding
+    whitespace like the response cache key does. With a
+    `diversity` lambda the picks are MMR-reranked by popularity against
+    audio features and year.
     """
-    matches = df_features[
-        df_features['artist_name'].str.lower() == artist_name.lower()
-    ]
+    mask = (df_features['artist_name'].str.lower() ==
+            artist_name.strip().lower()).to_numpy()
 
-    if matches.empty:
+    if not mask.any():
         print(f"No songs found for artist '{artist_name}'")
         return {"recommendations": []}
 
-    recommendations = {"recommendations": []}
-
-    for _, row in matches.head(max_results).iterrows():
-        rec = {
-            "title": row['track_name'],
-            "artist": row['artist_name'],
-            "genre": row['genre'],
-            "popularity": int(row['popularity'])
-        }
-        recommendations["recommendations"].append(rec)
+    if diversity is not None:
+        return {"recommendations": _diversified(
+            np.flatnonzero(mask), max_results, diversity)}
+    return {"recommendations": _to_records(
+        df_features[mask].head(max_results))}
 
-    return recommendations
 
-
-def get_top_popular_songs(n=5):
+def get_top_popular_songs(n=5, diversity=None):
     """
-    Return the top N most popular songs.
+    Return the top N most popular songs, or with a `diversity` lambda an
+    MMR-reranked selection from the most popular candidates.
     """
+    if diversity is not None:
+        return {"recommendations": _diversified(
+            np.arange(len(df_features)), n, diversity)}
+
     top_songs = df_features.sort_values(
         by="popularity", ascending=False
     ).head(n)
 
-    recommendations = {"recommendations": []}
-    for _, row in top_songs.iterrows():
-        recommendations["recommendations"].append({
-            "title": row['track_name'],
-            "artist": row['artist_name'],
-            "genre": row['genre'],
-            "popularity": int(row['popularity'])
-        })
-    return recommendations
\ No newline at end of file
+    return {"recommendations": _to_records(top_songs)}
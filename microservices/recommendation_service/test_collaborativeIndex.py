@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from collaborativeIndex import (CollaborativeModel, pair_keys, top_k_csr,
+                                update_index)
+
+
+def _write_library(directory, username, songs):
+    path = directory / f"{username}.json"
+    path.write_text(json.dumps([
+        {"title": t, "artist": a, "genre": "pop"} for t, a in songs]))
+    return path
+
+
+def test_top_k_keeps_strongest_neighbours():
+    # items 0..3; user A likes {0,1,2}, user B likes {0,1}, user C {0,3}
+    keys = np.concatenate([pair_keys([0, 1, 2]), pair_keys([0, 1]),
+                           pair_keys([0, 3])])
+    unique, counts = np.unique(keys, return_counts=True)
+    item_users = np.array([3, 2, 1, 1])
+    indptr, indices, scores = top_k_csr(unique, counts, item_users, k=2)
+
+    assert list(np.diff(indptr)) == [2, 2, 2, 1]
+    # 1 is co-liked with 0 twice; 2 and 3 tie on score, lower id wins
+    assert list(indices[indptr[0]:indptr[1]]) == [1, 2]
+    assert list(indices[indptr[3]:indptr[4]]) == [0]
+    assert scores[indptr[0]] > scores[indptr[0] + 1]
+
+
+def test_recommends_co_liked_songs(tmp_path):
+    liked = tmp_path / "liked"
+    liked.mkdir()
+    _write_library(liked, "a", [("One", "X"), ("Two", "Y"), ("Three", "Z")])
+    _write_library(liked, "b", [("one", "x"), ("Two", "Y")])
+    _write_library(liked, "c", [("Four", "W"), ("Five", "V")])
+    index = tmp_path / "index.npz"
+
+    summary = update_index(liked, index, workers=2)
+    assert summary["users"] == 3 and summary["items"] == 5
+
+    recs = CollaborativeModel(index).recommend([("ONE", "X")], n=5)
+    assert [r["title"] for r in recs] == ["Two", "Three"]
+    assert recs[0]["score"] > recs[1]["score"]
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    liked = tmp_path / "liked"
+    liked.mkdir()
+    rng = np.random.default_rng(0)
+    catalog = [(f"Song {i}", f"Artist {i % 7}") for i in range(60)]
+    for u in range(12):
+        picks = rng.choice(len(catalog), 15, replace=False)
+        _write_library(liked, f"user{u}", [catalog[i] for i in picks])
+    incremental = tmp_path / "incremental.npz"
+    update_index(liked, incremental, workers=1)
+
+    changed = _write_library(liked, "user3", catalog[:10])
+    os.utime(changed, (1, 1))
+    (liked / "user5.json").unlink()
+    summary = update_index(liked, incremental, workers=1)
+    assert (summary["changed"], summary["removed"]) == (1, 1)
+    assert update_index(liked, incremental, workers=1)["changed"] == 0
+
+    full = tmp_path / "full.npz"
+    update_index(liked, full, workers=1, full=True)
+    assert _pair_counts(incremental) == _pair_counts(full)
+
+
+def _pair_counts(path):
+    data = np.load(path)
+    keys = data["item_keys"]
+    return {frozenset((keys[k >> 32], keys[k & 0xFFFFFFFF])): int(c)
+            for k, c in zip(data["pair_keys"], data["pair_counts"])}
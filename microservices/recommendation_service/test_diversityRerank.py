@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import songRecommenderKNN
+from diversityRerank import mmr_order, parse_lambda, rerank
+
+
+def _catalog():
+    # Three near-identical hits by "A", then distinct songs by others
+    return pd.DataFrame({
+        "artist_name": ["A", "A", "A", "B", "C", "D"],
+        "track_name": ["a1", "a2", "a3", "b1", "c1", "d1"],
+        "genre": "pop",
+        "popularity": [90, 89, 88, 70, 60, 50],
+        "tempo": [120, 121, 120, 80, 170, 100],
+        "danceability": [0.8, 0.8, 0.81, 0.3, 0.5, 0.1],
+        "energy": [0.9, 0.9, 0.9, 0.2, 0.6, 0.4],
+        "year": [2020, 2020, 2021, 1985, 2001, 1970],
+        "duration_ms": 200000,
+    })
+
+
+def test_lambda_one_is_popularity_order():
+    df = _catalog()
+    order = rerank(df, np.arange(6), df["artist_name"], df["popularity"],
+                   k=4, lam=1.0)
+    assert list(order) == [0, 1, 2, 3]
+
+
+def test_low_lambda_spreads_artists_and_years():
+    df = _catalog()
+    order = rerank(df, np.arange(6), df["artist_name"], df["popularity"],
+                   k=3, lam=0.3)
+    assert order[0] == 0
+    assert len(set(df["artist_name"].iloc[order])) == 3
+
+
+def test_unmatched_candidates_and_parse_lambda():
+    df = _catalog()
+    order = rerank(df, [0, -1, 1], ["A", "Z", "A"], [5, 4, 3], k=2, lam=0.5)
+    assert list(order) == [0, 1]
+    assert parse_lambda({}) is None
+    assert parse_lambda({"diversify": True}) == 0.7
+    assert parse_lambda({"lambda": "0.2"}) == 0.2
+    assert mmr_order([], np.empty((0, 3)), np.empty(0), np.empty(0), 5) \
+        .size == 0
+
+
+def test_diversified_artist_recommendations(monkeypatch):
+    df = _catalog()
+    df.loc[3:, "artist_name"] = "A"
+    monkeypatch.setattr(songRecommenderKNN, "df_features", df)
+    plain = songRecommenderKNN.get_more_songs_by_artist("a", 3)
+    diverse = songRecommenderKNN.get_more_songs_by_artist("a", 3,
+                                                          diversity=0.3)
+    assert [r["title"] for r in plain["recommendations"]] == \
+        ["a1", "a2", "a3"]
+    titles = [r["title"] for r in diverse["recommendations"]]
+    assert titles[0] == "a1" and "a2" not in titles
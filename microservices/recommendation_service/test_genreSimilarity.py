@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import genreSimilarity
+from genreSimilarity import allocate, load, recommend_adjacent_genres
+
+
+def _catalog():
+    rng = np.random.default_rng(0)
+    # metal and punk are loud and fast, ambient and classical quiet
+    profiles = {"metal": (170, 0.95, 0.4), "punk": (165, 0.9, 0.45),
+                "ambient": (70, 0.1, 0.2), "classical": (75, 0.15, 0.15)}
+    frames = []
+    for genre, (tempo, energy, dance) in profiles.items():
+        n = 30
+        frames.append(pd.DataFrame({
+            "artist_name": [f"{genre} artist {i % 5}" for i in range(n)],
+            "track_name": [f"{genre} {i}" for i in range(n)],
+            "genre": genre,
+            "popularity": rng.integers(0, 100, n),
+            "tempo": tempo + rng.normal(0, 3, n),
+            "energy": energy + rng.normal(0, 0.02, n),
+            "danceability": dance + rng.normal(0, 0.02, n),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_allocate_is_proportional_and_exact():
+    assert list(allocate([1.0, 0.5, 0.5], 10)) == [5, 3, 2]
+    assert allocate([0.9, 0.8, -0.2], 7).sum() == 7
+    assert allocate([0.9, 0.8, -0.2], 7)[2] == 0
+
+
+def test_nearest_genre_and_disk_cache(tmp_path, monkeypatch):
+    df = _catalog()
+    path = tmp_path / "genres.npz"
+    model = load(df, path)
+    assert path.exists()
+
+    result = recommend_adjacent_genres(df, model, "METAL", k=1, count=10,
+                                       seed=1)
+    assert [g["genre"] for g in result["genres"]] == ["metal", "punk"]
+    assert sum(g["picks"] for g in result["genres"]) == 10
+    assert {r["genre"] for r in result["recommendations"]} == \
+        {"metal", "punk"}
+
+    # A fresh process with the same table reads the cached matrix
+    monkeypatch.setattr(genreSimilarity, "_model", None)
+    monkeypatch.setattr(genreSimilarity, "compute_centroids",
+                        lambda df: (_ for _ in ()).throw(AssertionError))
+    cached = load(df.copy(), path)
+    assert np.allclose(cached["similarity"], model["similarity"])
+
+
+def test_unknown_genre(tmp_path):
+    df = _catalog()
+    model = load(df, tmp_path / "genres.npz")
+    result = recommend_adjacent_genres(df, model, "polka")
+    assert result["recommendations"] == [] and "note" in result
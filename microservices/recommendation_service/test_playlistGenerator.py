@@ -0,0 +1,49 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from playlistGenerator import generate_playlist
+
+
+def _catalog(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "track_name": [f"Song{i}" for i in range(n)],
+        "artist_name": [f"Artist{i % 50}" for i in range(n)],
+        "genre": np.where(np.arange(n) % 2 == 0, "indie", "pop"),
+        "year": 2000 + np.arange(n) % 24,
+        "duration_ms": rng.integers(120_000, 360_000, n),
+        "popularity": rng.integers(0, 100, n),
+    })
+
+
+def test_hits_target_within_tolerance_and_filters():
+    df = _catalog()
+    result = generate_playlist(df, 90 * 60_000, tolerance_ms=5_000,
+                               genre="Indie", year_from=2010, year_to=2019,
+                               min_popularity=20, seed=1)
+
+    assert result["within_tolerance"]
+    assert abs(result["difference_ms"]) <= 5_000
+    assert sum(s["duration_ms"] for s in result["playlist"]) == \
+        result["total_ms"]
+    assert all(s["genre"] == "indie" and 2010 <= s["year"] <= 2019
+               and s["popularity"] >= 20 for s in result["playlist"])
+    assert len({s["title"] for s in result["playlist"]}) == \
+        len(result["playlist"])
+
+
+def test_reports_shortfall_when_catalog_too_small():
+    df = _catalog(n=10)
+    result = generate_playlist(df, 600 * 60_000, seed=1)
+    assert not result["within_tolerance"]
+    assert result["total_ms"] == int(df["duration_ms"].sum())
+    assert result["difference_ms"] < 0
+
+
+def test_unknown_genre_returns_empty_playlist():
+    result = generate_playlist(_catalog(), 60_000, genre="polka")
+    assert result["playlist"] == [] and result["candidates"] == 0
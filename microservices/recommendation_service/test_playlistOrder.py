@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from playlistOrder import (distance_matrix, nearest_neighbour_path,
+                           order_tracks, path_cost, two_opt)
+
+
+def _catalog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "tempo": rng.uniform(60, 180, n),
+        "energy": rng.uniform(0, 1, n),
+        "danceability": rng.uniform(0, 1, n),
+    })
+
+
+def test_orders_points_on_a_line():
+    df = pd.DataFrame({"tempo": [100, 140, 120, 80, 160, 60],
+                       "energy": 0.5, "danceability": 0.5})
+    order, before, after = order_tracks(df, np.arange(6))
+    tempos = df["tempo"].to_numpy()[order]
+    assert order[0] == 0 and sorted(order) == list(range(6))
+    assert after < before
+    assert list(tempos) in ([100, 120, 140, 160, 80, 60],
+                            [100, 80, 60, 120, 140, 160])
+
+
+def test_short_lists_keep_their_order_and_cost():
+    df = pd.DataFrame({"tempo": [100, 140, 120], "energy": 0.5,
+                       "danceability": 0.5})
+    order, before, after = order_tracks(df, np.array([0, 1]))
+    assert list(order) == [0, 1]
+    assert before == after > 0
+    order, before, after = order_tracks(df, np.array([], dtype=np.int64))
+    assert len(order) == 0 and before == after == 0.0
+
+
+def test_two_opt_never_worsens_and_keeps_permutation():
+    df = _catalog(300)
+    dist = distance_matrix(df.to_numpy())
+    nn = nearest_neighbour_path(dist)
+    improved = two_opt(dist, nn, time.perf_counter() + 5)
+    assert sorted(improved) == list(range(300))
+    assert improved[0] == nn[0]
+    assert path_cost(dist, improved) <= path_cost(dist, nn)
+
+
+def test_thousand_tracks_are_much_smoother():
+    # Tour quality only; the time budget depends on the machine
+    df = _catalog(50_000)
+    positions = np.random.default_rng(1).choice(50_000, 1000, replace=False)
+    order, before, after = order_tracks(df, positions, budget_ms=800)
+    assert sorted(order) == list(range(1000))
+    assert after < before / 3
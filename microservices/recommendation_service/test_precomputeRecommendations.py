@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import precomputeRecommendations as pre
+
+
+def _catalog():
+    return pd.DataFrame({
+        "artist_name": ["A", "A", "A", "B", "B", "C", "D"],
+        "track_name": ["a1", "a2", "a3", "b1", "b2", "c1", "d1"],
+        "genre": ["pop", "pop", "pop", "rock", "rock", "pop", "jazz"],
+        "popularity": [50, 90, 70, 80, 60, 95, 10],
+        "tempo": [120, 122, 118, 90, 92, 121, 60],
+        "danceability": [0.8, 0.8, 0.8, 0.4, 0.4, 0.79, 0.1],
+        "energy": [0.9, 0.9, 0.9, 0.5, 0.5, 0.88, 0.2],
+        "year": 2000,
+        "duration_ms": 200000,
+    })
+
+
+def _write_library(directory, username, songs):
+    path = directory / f"{username}.json"
+    path.write_text(json.dumps([
+        {"title": t, "artist": a, "genre": g} for t, a, g in songs]))
+    return path
+
+
+def test_recommend_for_library():
+    pre._init_worker(_catalog())
+    recs = pre.recommend_for_library([
+        {"title": "A1", "artist": "a", "genre": "pop"}], n=2)
+
+    assert [r["title"] for r in recs["artist"]] == ["a2", "a3"]
+    assert [r["title"] for r in recs["genre"]] == ["c1", "a2"]
+    assert {r["title"] for r in recs["profile"]} <= {"a2", "a3", "c1"}
+    assert all(r["title"] != "a1" for kind in pre.KINDS
+               for r in recs[kind])
+
+
+def test_precompute_only_changed_users(tmp_path):
+    liked = tmp_path / "liked"
+    liked.mkdir()
+    _write_library(liked, "alice", [("a1", "A", "pop")])
+    _write_library(liked, "bob", [("b1", "B", "rock")])
+    store = tmp_path / "store.db"
+
+    first = pre.precompute(liked, store, df=_catalog(), workers=2)
+    assert (first["users"], first["computed"]) == (2, 2)
+    assert pre.precompute(liked, store, df=_catalog())["computed"] == 0
+
+    bob = _write_library(liked, "bob", [("b2", "B", "rock")])
+    os.utime(bob, (1, 1))
+    (liked / "alice.json").unlink()
+    second = pre.precompute(liked, store, df=_catalog(), workers=1)
+    assert (second["computed"], second["removed"]) == (1, 1)
+
+    assert pre.load_recommendations("alice", store) is None
+    stored = pre.load_recommendations("bob", store)
+    assert stored["library_mtime"] == 1
+    assert [r["title"] for r in stored["recommendations"]["artist"]] == \
+        ["b1"]
@@ -0,0 +1,47 @@
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from responseCache import ResponseCache, make_key
+
+
+def test_make_key_normalizes_artist_case_and_whitespace():
+    a = make_key({"type": "recommend_by_artist", "artist": " Adele "})
+    b = make_key({"artist": "adele", "type": "recommend_by_artist"})
+    assert a == b
+
+
+def test_make_key_keeps_genre_case():
+    a = make_key({"type": "recommend_by_genre", "genre": "Rock"})
+    b = make_key({"type": "recommend_by_genre", "genre": "rock"})
+    assert a != b
+
+
+def test_lru_eviction_and_counters():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+@patch("responseCache.time.monotonic")
+def test_ttl_expiry(mock_clock):
+    cache = ResponseCache(max_entries=4, ttl_seconds=10)
+    mock_clock.return_value = 100.0
+    cache.put("k", "v")
+
+    mock_clock.return_value = 105.0
+    assert cache.get("k") == "v"
+
+    mock_clock.return_value = 111.0
+    assert cache.get("k") is None
+    assert len(cache) == 0
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import songRecommenderKNN
+from dataset_service.track_table import TrackTable
+
+
+def test_track_ids_match_the_cli_when_rows_are_dropped(tmp_path,
+                                                       monkeypatch):
+    monkeypatch.setattr("dataset_service.track_table.ID_MAP_PATH",
+                        str(tmp_path / "ids.csv"))  # never the real map
+    df = pd.DataFrame({
+        "artist_name": ["A", "B", "C"],
+        "track_name": ["a", "b", "c"],
+        "genre": "pop",
+        "popularity": [1, 2, 3],
+        "tempo": [100.0, np.nan, 120.0],  # B is dropped by load_dataset
+        "danceability": 0.5,
+        "energy": 0.5,
+        "year": 2000,
+        "duration_ms": 1000,
+    })
+    cli_id = TrackTable(df).id_for("c", "C")
+    assert cli_id == 2
+
+    features = songRecommenderKNN.load_dataset(df)
+    assert list(features["track_name"]) == ["a", "c"]
+    assert list(songRecommenderKNN.id_positions([cli_id, 1, 0])) == \
+        [1, -1, 0]
+    assert list(songRecommenderKNN.positions_for_tracks([
+        {"title": "c", "artist": "C", "track_id": cli_id},
+        {"title": "A", "artist": "a"}])) == [1, 0]
+
+
+def test_artist_match_ignores_case_and_surrounding_whitespace(tmp_path,
+                                                              monkeypatch):
+    monkeypatch.setattr("dataset_service.track_table.ID_MAP_PATH",
+                        str(tmp_path / "ids.csv"))
+    songRecommenderKNN.load_dataset(pd.DataFrame({
+        "artist_name": ["Adele", "Adele", "Other"],
+        "track_name": ["a", "b", "c"],
+        "genre": "pop", "popularity": [1, 2, 3], "tempo": 100.0,
+        "danceability": 0.5, "energy": 0.5, "year": 2000,
+        "duration_ms": 1000,
+    }))
+    padded = songRecommenderKNN.get_more_songs_by_artist(" ADELE ")
+    assert padded == songRecommenderKNN.get_more_songs_by_artist("adele")
+    assert [r["title"] for r in padded["recommendations"]] == ["a", "b"]
@@ -1,21 +1,19 @@
-import zmq
+from microservices.common.client import get_client
 
-context = zmq.Context()
-socket = context.socket(zmq.REQ)
-socket.connect("tcp://localhost:5555")
-
-def send_request(payload, timeout=5000):  # timeout in milliseconds
-    socket.setsockopt(zmq.RCVTIMEO, timeout)
-    socket.setsockopt(zmq.SNDTIMEO, timeout)
-
-    socket.send_json(payload)
-    try:
-        response = socket.recv_json()
-        return response
-    except zmq.error.Again:
-        raise TimeoutError(f"No response from microservice "
-                           f"within {timeout} ms")
+ADDRESS = "tcp://localhost:5555"
 
 
+def send_request(payload, timeout=5000):  # timeout in milliseconds
+    """
+    Send a request to the recommendation microservice over the shared
+    persistent connection. Raises TimeoutError if it doesn't respond.
+    """
+    return get_client(ADDRESS).request(payload, timeout_ms=timeout)
 
 
+def send_batch(payloads, timeout=5000):
+    """
+    Send several recommendation requests in one round trip. Returns the
+    responses in the same order as `payloads`.
+    """
+    return get_client(ADDRESS).request_batch(payloads, timeout_ms=timeout)
@@ -1,67 +1,362 @@
 """
 ZeroMQ Server
 """
-import zmq
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from microservices.common.broker import parse_server_args
+from microservices.common.runtime import run_service
 import songRecommenderKNN
 import genreQuery
+import playlistGenerator
+import playlistOrder
+import collaborativeIndex
+import diversityRerank
+import genreSimilarity
+import precomputeRecommendations
+from main_program.liked_songs_store import load_liked_songs
+from responseCache import ResponseCache, make_key
 
+# Number of songs returned for a genre request, picked at random from
+# the cached top-N candidate slice
+GENRE_PICKS = 10
+GENRE_CANDIDATES = 200
+
+# Per-request-type cache policy:
+#   "response"   - the full response is deterministic and cached as-is
+#   "candidates" - only the candidate slice is cached; the final pick is
+#                  randomized on every request
+CACHE_POLICIES = {
+    "recommend_by_artist": "response",
+    "recommend_popular": "response",
+    "recommend_by_genre": "candidates",
+}
+
+response_cache = ResponseCache(max_entries=512, ttl_seconds=3600)
+
+
+def _genre_candidates(genre):
+    connection = genreQuery.createConnection()
+    try:
+        return genreQuery.returnGenreCandidates(
+            connection, genre, limit=GENRE_CANDIDATES)
+    finally:
+        genreQuery.closeConnection(connection)
+
+
+def compute_recommendations(received_data):
+    """Build the response for one request, bypassing the cache."""
+    request_type = received_data.get("type")
+    diversity = diversityRerank.parse_lambda(received_data)
+
+    if request_type == "recommend_by_artist":
+        artist = received_data.get("artist", "")
+        print(f"Artist of interest: {artist}")
+        return songRecommenderKNN.get_more_songs_by_artist(
+            artist, diversity=diversity)
+
+    if request_type == "recommend_popular":
+        print("Recommending top popular songs...")
+        return songRecommenderKNN.get_top_popular_songs(diversity=diversity)
+
+    print(f"Unknown request type: {request_type}")
+    return {"error": "Invalid request type"}
+
+
+def _pick_genre_rows(rows, diversity=None):
+    """
+    GENRE_PICKS rows from the candidate slice: a random sample, or the
+    MMR picks when the request asked for diversity.
+    """
+    if diversity is None or not rows:
+        return random.sample(rows, min(GENRE_PICKS, len(rows)))
+    positions = songRecommenderKNN.track_positions(
+        [(row[1], row[0]) for row in rows])
+    order = diversityRerank.rerank(
+        songRecommenderKNN.df_features, positions,
+        [row[0] for row in rows], [row[2] for row in rows],
+        GENRE_PICKS, diversity)
+    return [rows[i] for i in order]
+
+
+def handle_request(received_data):
+    """Answer a request, going through the response cache if allowed."""
+    request_type = received_data.get("type")
+
+    if request_type == "cache_stats":
+        return {"cache": response_cache.stats()}
+
+    try:
+        diversity = diversityRerank.parse_lambda(received_data)
+    except (TypeError, ValueError) as e:
+        return {"error": f"Invalid diversity parameters: {e}"}
+
+    policy = CACHE_POLICIES.get(request_type)
+    if policy is None:
+        return compute_recommendations(received_data)
+
+    if policy == "candidates":
+        # The slice is the same however the songs are then picked from it
+        key = make_key({field: value for field, value in received_data.items()
+                        if field not in diversityRerank.REQUEST_FIELDS})
+        rows = response_cache.get(key)
+        if rows is None:
+            # stripped like the key, so " Rock " and "Rock" agree
+            genre = str(received_data.get("genre", "")).strip()
+            print(f"Genre of interest: {genre}")
+            rows = _genre_candidates(genre)
+            response_cache.put(key, rows)
+        return genreQuery.formartDict(None,
+                                      _pick_genre_rows(rows, diversity))
+
+    key = make_key(received_data)
+    recommendations = response_cache.get(key)
+    if recommendations is None:
+        recommendations = compute_recommendations(received_data)
+        if "error" not in recommendations:
+            response_cache.put(key, recommendations)
+    return recommendations
+
+
+def _optional_number(received_data, field, cast=int):
+    value = received_data.get(field)
+    return None if value in (None, "") else cast(value)
 
-def main():
-    context = zmq.Context()
-    socket = context.socket(zmq.REP)
-    socket.bind("tcp://*:5555")
 
-    print("ZeroMQ Server started on port 5555... Press Ctrl+C to stop.")
+def generate_playlist(received_data):
+    """
+    Build a playlist close to a target length, e.g.
+    {"type": "generate_playlist", "target_minutes": 90, "genre": "indie",
+     "year_from": 2010, "year_to": 2019}
+    Optional: "target_seconds", "tolerance_seconds" (default 60),
+    "min_popularity", "budget_ms" (default 250) and "seed".
+    """
+    try:
+        if "target_seconds" in received_data:
+            target_ms = float(received_data["target_seconds"]) * 1000
+        else:
+            target_ms = float(received_data.get("target_minutes", 0)) * 60000
+        tolerance = _optional_number(received_data, "tolerance_seconds",
+                                     float)
+        budget_ms = _optional_number(received_data, "budget_ms", float)
+        options = {
+            "genre": received_data.get("genre") or None,
+            "year_from": _optional_number(received_data, "year_from"),
+            "year_to": _optional_number(received_data, "year_to"),
+            "min_popularity": _optional_number(received_data,
+                                               "min_popularity", float),
+            "seed": _optional_number(received_data, "seed"),
+        }
+    except (TypeError, ValueError) as e:
+        return {"error": f"Invalid playlist parameters: {e}"}
+
+    if target_ms <= 0:
+        return {"error": "Missing or non-positive target duration"}
+
+    return playlistGenerator.generate_playlist(
+        songRecommenderKNN.df_features, int(target_ms),
+        tolerance_ms=None if tolerance is None else tolerance * 1000,
+        budget_ms=budget_ms or playlistGenerator.DEFAULT_BUDGET_MS,
+        **options)
+
+
+def order_playlist(received_data):
+    """
+    Reorder tracks for smooth tempo/energy/danceability transitions:
+    {"type": "order_playlist", "tracks": [{"title": ..., "artist": ...}]}
+    A track's "track_id", when present, is used instead of its name.
+    Tracks not in the catalog are returned unchanged under "unmatched".
+    """
+    start = time.perf_counter()
+    tracks = received_data.get("tracks")
+    if not isinstance(tracks, list) or not all(
+            isinstance(t, dict) and t.get("title") and t.get("artist")
+            for t in tracks):
+        return {"error": "'tracks' must be a list of {title, artist}"}
+    if len(tracks) > playlistOrder.MAX_TRACKS:
+        return {"error": f"At most {playlistOrder.MAX_TRACKS} tracks "
+                         f"can be ordered at once"}
+
+    try:
+        budget_ms = float(received_data.get(
+            "budget_ms", playlistOrder.DEFAULT_BUDGET_MS))
+    except (TypeError, ValueError):
+        return {"error": "Invalid 'budget_ms'"}
+
+    df = songRecommenderKNN.df_features
+    positions = songRecommenderKNN.positions_for_tracks(tracks)
+    matched = np.flatnonzero(positions >= 0)
+    order, cost_before, cost_after = playlistOrder.order_tracks(
+        df, positions[matched], budget_ms)
+
+    features = playlistOrder.feature_values(df, positions[matched])
+    playlist = []
+    for k in order:
+        song = dict(tracks[matched[k]])
+        song.update(zip(playlistOrder.ORDER_FEATURES,
+                        features[k].tolist()))
+        playlist.append(song)
+
+    return {
+        "playlist": playlist,
+        "unmatched": [tracks[i] for i in np.flatnonzero(positions < 0)],
+        "cost_before": round(cost_before, 4),
+        "cost_after": round(cost_after, 4),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+# (index mtime, CollaborativeModel), reloaded when the offline job rewrites it
+_collaborative = None
+
 
+def _collaborative_model():
+    global _collaborative
     try:
-        while True:
-            try:
-                received_data = socket.recv_json()
-                print(f"\n Received request: {received_data}")
+        mtime = os.path.getmtime(collaborativeIndex.INDEX_PATH)
+    except OSError:
+        return None
+    if _collaborative is None or _collaborative[0] != mtime:
+        _collaborative = (mtime, collaborativeIndex.CollaborativeModel(
+            collaborativeIndex.INDEX_PATH))
+    return _collaborative[1]
 
-                request_type = received_data.get("type")
 
-                if request_type == "recommend_by_artist":
-                    artist = received_data.get("artist", "")
-                    print(f"Artist of interest: {artist}")
-                    recommendations = (
-                        songRecommenderKNN.get_more_songs_by_artist(artist)
-                    )
+def recommend_collaborative(received_data):
+    """
+    Songs most often liked together with the seeds, from the offline
+    co-occurrence index: {"type": "recommend_collaborative",
+    "username": "alice"} seeds from alice's library, or pass
+    "tracks": [{"title": ..., "artist": ...}]. Optional "count" (10).
+    """
+    try:
+        count = int(received_data.get("count", 10))
+    except (TypeError, ValueError):
+        return {"error": "Invalid 'count'"}
+
+    tracks = received_data.get("tracks")
+    username = received_data.get("username")
+    if tracks is not None:
+        if not isinstance(tracks, list) or not all(
+                isinstance(t, dict) and t.get("title") and t.get("artist")
+                for t in tracks):
+            return {"error": "'tracks' must be a list of {title, artist}"}
+        seeds = [(t["title"], t["artist"]) for t in tracks]
+    elif username:
+        songs = load_liked_songs(username,
+                                 str(collaborativeIndex.LIKED_SONGS_DIR),
+                                 compact=False)
+        seeds = [(s["title"], s["artist"]) for s in songs
+                 if s.get("title") and s.get("artist")]
+    else:
+        return {"error": "Provide 'username' or 'tracks'"}
+
+    model = _collaborative_model()
+    if model is None:
+        return {"error": "Collaborative index not built yet; run "
+                         "collaborativeIndex.py"}
+    return {"recommendations": model.recommend(seeds, max(count, 0))}
+
 
+def recommend_for_user(received_data):
+    """
+    Answer from the nightly precomputed store:
+    {"type": "recommend_for_user", "username": "alice"} returns
+    {"recommendations": {"artist": [...], "genre": [...], "profile": [...]}};
+    add "kind" for just one list. "stale" is true when the library has
+    changed since the results were computed.
+    """
+    username = received_data.get("username")
+    if not username:
+        return {"error": "Missing 'username'"}
+    kind = received_data.get("kind")
+    if kind is not None and kind not in precomputeRecommendations.KINDS:
+        return {"error": f"'kind' must be one of "
+                         f"{', '.join(precomputeRecommendations.KINDS)}"}
 
-                elif request_type == "recommend_popular":
-                    print("Recommending top popular songs...")
-                    recommendations = (
-                        songRecommenderKNN.get_top_popular_songs()
-                    )
+    stored = precomputeRecommendations.load_recommendations(username)
+    if stored is None:
+        return {"error": f"No precomputed recommendations for '{username}'"}
+    mtime = precomputeRecommendations.library_mtime(username)
+    recommendations = stored["recommendations"]
+    return {
+        "recommendations": recommendations[kind] if kind else recommendations,
+        "computed_at": stored["computed_at"],
+        "stale": mtime is not None and mtime != stored["library_mtime"],
+    }
+
+
+def recommend_adjacent_genres(received_data):
+    """
+    Songs from a genre and its nearest genres by audio profile, e.g.
+    {"type": "recommend_adjacent_genres", "genre": "indie", "k": 3}.
+    Optional "count" (default 10) and "seed". Each genre's share of the
+    songs is proportional to its similarity to the requested genre.
+    """
+    genre = received_data.get("genre")
+    if not genre:
+        return {"error": "Missing 'genre'"}
+    try:
+        k = int(received_data.get("k", genreSimilarity.DEFAULT_K))
+        count = int(received_data.get("count",
+                                      genreSimilarity.DEFAULT_COUNT))
+        seed = _optional_number(received_data, "seed")
+    except (TypeError, ValueError) as e:
+        return {"error": f"Invalid parameters: {e}"}
+    if k < 0 or count < 0:
+        return {"error": "'k' and 'count' must not be negative"}
 
-                elif request_type == "recommend_by_genre":
-                    genre = received_data.get("genre", "")
-                    print(f"Genre of interest: {genre}")
-                    connection = genreQuery.createConnection()
-                    rows = genreQuery.returnByGenre(connection, genre)
-                    recommendations = genreQuery.formartDict(connection, rows)
-                    genreQuery.closeConnection(connection)
+    df = songRecommenderKNN.df_features
+    return genreSimilarity.recommend_adjacent_genres(
+        df, genreSimilarity.load(df), genre, k, count, seed)
 
-                else:
-                    print(f"Unknown request type: {request_type}")
-                    recommendations = {"error": "Invalid request type"}
 
-                print(f"Sending recommendations: {recommendations}")
-                socket.send_json(recommendations)
+def _handle_and_log(received_data):
+    print(f"\n Received request: {received_data}")
+    recommendations = handle_request(received_data)
+    print(f"Sending recommendations: {recommendations}")
+    return recommendations
 
-            except Exception as e:
-                print(f"Error processing request: {e}")
-                socket.send_json({"error": str(e)})
 
-    except KeyboardInterrupt:
-        print("\n Server manually stopped.")
+HANDLERS = {
+    request_type: _handle_and_log
+    for request_type in list(CACHE_POLICIES) + ["cache_stats"]
+}
+# Randomized or specific to the caller's tracks, so never cached
+HANDLERS["generate_playlist"] = generate_playlist
+HANDLERS["order_playlist"] = order_playlist
+HANDLERS["recommend_collaborative"] = recommend_collaborative
+HANDLERS["recommend_for_user"] = recommend_for_user
+HANDLERS["recommend_adjacent_genres"] = recommend_adjacent_genres
 
+
+def build_handlers(df=None) -> dict:
+    """
+    Load the recommender's data (from `df` if given, so the gateway can
+    share its table) and return the request handlers.
+    """
+    df_features = songRecommenderKNN.load_dataset(df)
+    playlistGenerator.warm_up(df_features)
+    genreSimilarity.load(df_features)
+    songRecommenderKNN.track_positions([])  # builds the lookup keys
+    return HANDLERS
+
+
+def main():
+    args = parse_server_args("Music Recommendation Microservice")
+
+    try:
+        run_service(build_handlers(), 5555, args,
+                    name="ZeroMQ Recommendation Server", verbose=False)
     finally:
-        print("Closing socket and terminating context...")
-        socket.close()
-        context.term()
-        print("Server shutdown complete.")
+        stats = response_cache.stats()
+        print(f"Cache hits: {stats['hits']}, misses: {stats['misses']}")
 
 
 if __name__ == "__main__":
@@ -3,9 +3,14 @@ ZeroMQ Server — Song By Year (Microservice C)
 Listens on tcp://*:5557 and returns ONE random song for a requested year.
 """
 
-import zmq
+import sys
+from pathlib import Path
 import pandas as pd
 
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from microservices.common.broker import parse_server_args
+from microservices.common.runtime import run_service
+
 PORT = 5557
 CSV_PATH = "spotify_data.csv"
 
@@ -38,13 +43,20 @@ def _int_or_none(val):
     except Exception:
         return None
 
-# ---- Load data once ----
-df = pd.read_csv(CSV_PATH)
-df = df.dropna(subset=["artist_name", "track_name", "genre", "year"])
-# Optional: ensure year numeric
-df["year"] = pd.to_numeric(df["year"], errors="coerce")
+# ---- Data preparation ----
+# Columns this service reads; anything else is dropped to save memory
+COLUMNS = ["artist_name", "track_name", "genre", "year", "duration",
+           "popularity"]
+
+def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    if "duration" not in df.columns and "duration_ms" in df.columns:
+        df = df.rename(columns={"duration_ms": "duration"})
+    df = df[[c for c in COLUMNS if c in df.columns]]
+    df = df.dropna(subset=["artist_name", "track_name", "genre", "year"])
+    # Optional: ensure year numeric
+    return df.assign(year=pd.to_numeric(df["year"], errors="coerce"))
 
-def pick_one_song_by_year(year: int) -> dict | None:
+def pick_one_song_by_year(df: pd.DataFrame, year: int) -> dict | None:
     subset = df[df["year"] == year]
     if subset.empty:
         return None
@@ -59,47 +71,32 @@ def pick_one_song_by_year(year: int) -> dict | None:
         "popularity": _int_or_none(row.get("popularity")),
     }
 
-def main():
-    context = zmq.Context()
-    sock = context.socket(zmq.REP)
-    sock.bind(f"tcp://*:{PORT}")
-    print(f"Song-by-Year Server listening on port {PORT}... (Ctrl+C to stop)")
+def build_handlers(df: pd.DataFrame) -> dict:
+    """Request handlers for this service, keyed by request type."""
 
-    try:
-        while True:
-            try:
-                req = sock.recv_json()
-                if req.get("type") != "get_song_by_year":
-                    sock.send_json({"error": "Invalid request type"})
-                    continue
-
-                year = req.get("year")
-                # Be tolerant: if client sent numpy/int-like, coerce
-                try:
-                    year = int(year)
-                except Exception:
-                    sock.send_json({"error": "Invalid 'year' value"})
-                    continue
-
-                song = pick_one_song_by_year(year)
-                if song is None:
-                    sock.send_json({"songs": []})
-                else:
-                    # Wrap in list for compatibility with your handler
-                    sock.send_json({"songs": [song]})
-
-            except Exception as e:
-                # If anything slips through, return an error rather
-                # than crash
-                sock.send_json({"error": str(e)})
-
-    except KeyboardInterrupt:
-        print("\nServer stopping...")
-    finally:
-        sock.close(0)
-        context.term()
-        print("Server stopped.")
+    def get_song_by_year(req):
+        year = req.get("year")
+        # Be tolerant: if client sent numpy/int-like, coerce
+        try:
+            year = int(year)
+        except Exception:
+            return {"error": "Invalid 'year' value"}
+
+        song = pick_one_song_by_year(df, year)
+        if song is None:
+            return {"songs": []}
+        # Wrap in list for compatibility with your handler
+        return {"songs": [song]}
+
+    return {"get_song_by_year": get_song_by_year}
+
+
+def main():
+    args = parse_server_args("Song-by-Year Microservice")
+    # ---- Load data once ----
+    df = prepare_dataframe(pd.read_csv(CSV_PATH))
+    run_service(build_handlers(df), PORT, args, name="Song-by-Year Server",
+                verbose=False)
 
 if __name__ == "__main__":
     main()
-
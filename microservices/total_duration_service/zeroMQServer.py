@@ -4,10 +4,17 @@ Listens on tcp://*:5558 and returns the total duration for
 a user's liked songs.
 """
 
-import json
-import re
+import sys
 from pathlib import Path
-import zmq
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from microservices.common.broker import parse_server_args
+from microservices.common.runtime import run_service
+from main_program import library_db
+from main_program.durations import parse_duration_to_seconds
+from main_program.liked_songs_store import (
+    journal_path, load_liked_songs, snapshot_path
+)
 
 PORT = 5558
 
@@ -15,70 +22,9 @@ PORT = 5558
 def project_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
-def liked_songs_path(username: str) -> Path:
-    # OLD: return project_root() / "liked_songs" / f"{username}.json"
-    return project_root() / "main_program" / "liked_songs" / f"{username}.json"
-
-
-_duration_re_ms = re.compile(r"^\s*(\d+)\s*ms\s*$", re.IGNORECASE)
-_duration_re_colon = re.compile(r"^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*$")
-
-
-def parse_duration_to_seconds(value) -> int | None:
-    """
-    Parse common duration formats into total seconds.
-    Returns None if the value is missing or cannot be parsed.
-
-    Supported:
-      - "242667 ms"  -> 242.667s
-      - "3:30"       -> 210s
-      - "01:02:03"   -> 3723s
-      - 242667       -> assume milliseconds (>= 1000) else seconds
-      - "210"        -> assume seconds
-    """
-    if value is None:
-        return None
-
-    # If it's already numeric
-    if isinstance(value, (int, float)):
-        # Heuristic: large numbers are probably milliseconds
-        if value >= 1000:
-            return int(round(value / 1000))
-        return int(value)
-
-    if not isinstance(value, str):
-        return None
-
-    s = value.strip()
-    if not s or s.lower() == "unknown":
-        return None
-
-    # "123456 ms"
-    m = _duration_re_ms.match(s)
-    if m:
-        ms = int(m.group(1))
-        return ms // 1000
-
-    # "mm:ss" or "hh:mm:ss"
-    m = _duration_re_colon.match(s)
-    if m:
-        hh = m.group(3)
-        if hh is not None:
-            parts = s.split(":")
-            parts = [int(p) for p in parts]
-            if len(parts) == 3:
-                h, m_, sec = parts
-                return h * 3600 + m_ * 60 + sec
-        mm = int(m.group(1))
-        ss = int(m.group(2))
-        return mm * 60 + ss
-
-    # Plain integer string — assume seconds
-    if s.isdigit():
-        val = int(s)
-        return val
-
-    return None
+def liked_songs_dir() -> Path:
+    # OLD: return project_root() / "liked_songs"
+    return project_root() / "main_program" / "liked_songs"
 
 
 def humanize_seconds(total: int) -> str:
@@ -101,8 +47,12 @@ def compute_total_duration(username: str) -> dict:
     Load liked songs for the user and compute total duration.
     Returns a dict ready to send via JSON.
     """
-    path = liked_songs_path(username)
-    if not path.exists():
+    if library_db.enabled():
+        return compute_total_duration_sqlite(username)
+
+    directory = liked_songs_dir()
+    if not (Path(snapshot_path(username, directory)).exists() or
+            Path(journal_path(username, directory)).exists()):
         return {
             "total_seconds": 0,
             "readable": "0 sec",
@@ -112,7 +62,8 @@ def compute_total_duration(username: str) -> dict:
         }
 
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        # Snapshot plus journal; compaction is left to the CLI
+        data = load_liked_songs(username, str(directory), compact=False)
     except Exception as e:
         return {"error": f"Failed to read liked songs: {e}"}
 
@@ -143,44 +94,39 @@ def compute_total_duration(username: str) -> dict:
     }
 
 
-def main():
-    context = zmq.Context()
-    socket = context.socket(zmq.REP)
-    socket.bind(f"tcp://*:{PORT}")
-    print(f"Total Duration Server listening on "
-          f"port {PORT}... (Ctrl+C to stop)")
-
+def compute_total_duration_sqlite(username: str) -> dict:
+    """Same result as compute_total_duration, from one indexed SUM."""
     try:
-        while True:
-            try:
-                req = socket.recv_json()
-                print(f"Received request: {req}")  # Debugging line
+        if not library_db.has_user_library(username):
+            return {
+                "total_seconds": 0,
+                "readable": "0 sec",
+                "count_songs": 0,
+                "skipped": 0,
+                "note": f"No liked songs for user '{username}'."
+            }
+        result = library_db.total_duration(username)
+    except Exception as e:
+        return {"error": f"Failed to read liked songs: {e}"}
 
-                if req.get("type") != "get_total_duration":
-                    socket.send_json({"error": "Invalid request type"})
-                    continue
+    result["readable"] = humanize_seconds(result["total_seconds"])
+    return result
 
-                username = req.get("username", "").strip()
-                if not username:
-                    socket.send_json({"error": "Missing 'username'"})
-                    continue
 
-                result = compute_total_duration(username)
-                socket.send_json(result)
+def get_total_duration(req):
+    username = req.get("username", "").strip()
+    if not username:
+        return {"error": "Missing 'username'"}
+    return compute_total_duration(username)
 
-            except Exception as e:
-                # Never crash the loop on bad input — report error
-                socket.send_json({"error": str(e)})
 
-    except KeyboardInterrupt:
-        print("\nShutting down server...")
+HANDLERS = {"get_total_duration": get_total_duration}
 
-    finally:
-        socket.close(0)
-        context.term()
-        print("Server stopped.")
+
+def main():
+    args = parse_server_args("Total Duration Microservice")
+    run_service(HANDLERS, PORT, args, name="Total Duration Server")
 
 
 if __name__ == "__main__":
     main()
-